@@ -3,13 +3,22 @@ from src.utils import ratelimit_error
 from src.config import title, description, version, config
 from src.v1.routes import update as update_v1_routes
 from src.v1.routes import product as product_v1_routes
+from src.v1.routes import notification as notification_v1_routes
 #from src.v2.routes import events as events_v2_routes
+from src.v1.src.depop.web_req import close_client as close_depop_client
+from src.v1.src.depop.cookies import cookie_store
+from src.v1.src.ebay.tokens import close_http_client as close_ebay_http_client
+from src.v1.src.ebay.notifications import start_notification_worker, stop_notification_worker
+from src.v1.src.token_manager import start_token_manager, stop_token_manager
+from src.v1.src.product.session_pool import session_pool
+from src.v1.src.product.tls_client.async_sessions import shutdown_executor as shutdown_tls_executor
 
 # External Imports
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
 from slowapi import Limiter
 
 import uvicorn
@@ -18,11 +27,27 @@ import uvicorn
 # Initialize Limiter
 limiter = Limiter(key_func=get_remote_address)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_notification_worker()
+    start_token_manager()
+    yield
+    await stop_token_manager()
+    await stop_notification_worker()
+    # Close the shared HTTP clients and sessions, and write any cookies which haven't been flushed yet
+    await close_depop_client()
+    await close_ebay_http_client()
+    await cookie_store.flush()
+    session_pool.close_idle()
+    shutdown_tls_executor()
+
+
 # Initialize FastAPI application
 app = FastAPI(
     title=title,
     description=description,
     version=version,
+    lifespan=lifespan,
 )
 
 # Attach the limiter to the FastAPI app
@@ -45,6 +70,7 @@ app.add_middleware(
 # V1 Routes
 app.include_router(update_v1_routes.router, prefix="/v1/update", tags=["update v1"])
 app.include_router(product_v1_routes.router, prefix="/v1/product", tags=["product v1"])
+app.include_router(notification_v1_routes.router, prefix="/v1/notification", tags=["notification v1"])
 #app.include_router(events_v2_routes.router, prefix="/v2/event", tags=["event v1"])
 
 
@@ -0,0 +1,46 @@
+# Local Imports
+from src.config import config, status_config
+from ..src.ebay.notifications import (
+    parse_ebay_notification,
+    verify_ebay_notification_signature,
+    enqueue_ebay_notification,
+)
+
+# External Imports
+from slowapi.util import get_remote_address
+from fastapi import HTTPException, Request, APIRouter
+from slowapi import Limiter
+
+# Initialize router and rate limiter
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+
+@router.get("/")
+@limiter.limit("1/second")
+async def root(request: Request):
+    return config
+
+
+# eBay platform notifications endpoint
+@router.post("/ebay")
+@limiter.limit("50/second")
+async def ebay_notification(request: Request):
+    if (status_config["api"].get("ebay")) != "active":
+        return config
+
+    notification = parse_ebay_notification(await request.body())
+    if notification is None:
+        raise HTTPException(status_code=400, detail="Malformed notification")
+
+    if not verify_ebay_notification_signature(notification):
+        raise HTTPException(status_code=401, detail="Invalid notification signature")
+
+    # Acknowledge straight away, eBay retries notifications which aren't answered quickly
+    try:
+        await enqueue_ebay_notification(notification)
+    except RuntimeError as error:
+        # Not acknowledging means eBay sends the notification again later
+        raise HTTPException(status_code=503, detail=str(error))
+
+    return {"success": True}
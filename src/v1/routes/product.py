@@ -1,14 +1,18 @@
 # Local Imports
 from src.config import config, status_config
 from ..src.handlers import fetch_and_check_user
-from ..src.constants import sale_key
+from ..src.constants import sale_key, product_batch_max_urls, PRODUCT_METRICS_ADMIN_UIDS
 from ..src.db_firebase import get_db
-from ..src.product.extract import extract_meta, parse_product_data
-from ..src.product.send_request import http_request
+from ..src.models import ProductBatchRequest
+from ..src.product.cache import retrieve_product_data
+from ..src.product.batch import stream_product_results
+from ..src.product.send_request import ProductFetchError
+from ..src.product.circuit_breaker import circuit_breaker_metrics
 
 # External Imports
 from slowapi.util import get_remote_address
 from fastapi import HTTPException, Request, APIRouter
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter
 
 import traceback
@@ -17,6 +21,8 @@ import traceback
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
+# Status returned for each ProductFetchError code, anything else is the marketplace failing (502)
+product_error_statuses = {"circuit_open": 503, "not_found": 404}
 
 
 @router.get("/")
@@ -25,6 +31,27 @@ async def root(request: Request):
     return config
 
 
+@router.get("/metrics")
+@limiter.limit("1/second")
+async def metrics(request: Request):
+    store_type = request.query_params.get("store")
+    if not store_type:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Arguments not fully provided",
+        )
+
+    # The breakers cover every user's requests, so only admins can see them
+    user = await authorise_product_request(request, store_type)
+    if user.id not in PRODUCT_METRICS_ADMIN_UIDS:
+        raise HTTPException(
+            status_code=403,
+            detail="Unauthorized: Product metrics are only available to admins",
+        )
+
+    return {"circuitBreakers": circuit_breaker_metrics()}
+
+
 @router.get("/retrieve")
 @limiter.limit("3/second")
 async def retrieve_product(request: Request):
@@ -33,14 +60,36 @@ async def retrieve_product(request: Request):
     
     url = request.query_params.get("url")
     store_type = request.query_params.get("store")
-    auth_header = request.headers.get("Authorization")
 
     if (not url or not store_type): 
         raise HTTPException(
             status_code=500,
             detail=f"Arguments not fully provided",
         )
-    
+
+    await authorise_product_request(request, store_type)
+
+    try:
+        product = await retrieve_product_data(url)
+        if product is None:
+            return {}
+
+        return product
+
+    except ProductFetchError as error:
+        # Fail fast with the reason, and when it is worth trying again
+        raise HTTPException(
+            status_code=product_error_statuses.get(error.code, 502),
+            detail=error.to_dict(),
+            headers={"Retry-After": str(error.retry_after)} if error.retry_after else None,
+        )
+
+    except Exception as error:
+        print(traceback.format_exc())
+
+
+async def authorise_product_request(request: Request, store_type: str):
+    auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(
             status_code=403,
@@ -57,33 +106,49 @@ async def retrieve_product(request: Request):
             status_code=403,
             detail=f"Invalid or expired token",
         )
+
+    # The user is looked up by the uid in the query, which must be the token's
+    if uid != request.query_params.get("uid"):
+        raise HTTPException(
+            status_code=403,
+            detail="Unauthorized: The token doesn't belong to this user",
+        )
     
-    user_ref, user, limits = await fetch_and_check_user(
+    user_ref, user, limits, error = await fetch_and_check_user(
         request, store_type, sale_key
     )
+    if error:
+        raise error
 
     if not (user and user_ref and limits and db):
         print(traceback.format_exc())
         raise HTTPException(
             status_code=500, detail=f"Unknown error occured updating {sale_key}"
         )
-    
-    connected_accounts = user.connectedAccounts
 
-    # Get the connected account dynamically based on the store_type
-    connected_account = getattr(connected_accounts, store_type, None)
-    
+    return user
 
-    try:
-        html = http_request(url)
-        if html is None:
-            return {}
 
-        meta = extract_meta(html)
-        if meta is None:
-            return {}
-    
-        return parse_product_data(meta, url)
+@router.post("/retrieve/batch")
+@limiter.limit("1/second")
+async def retrieve_product_batch(request: Request, body: ProductBatchRequest):
+    if (status_config["api"].get("product")) != "active":
+        return config
 
-    except Exception as error:
-        print(traceback.format_exc())
\ No newline at end of file
+    store_type = request.query_params.get("store")
+    if (not body.urls or not store_type):
+        raise HTTPException(
+            status_code=500,
+            detail=f"Arguments not fully provided",
+        )
+
+    if len(body.urls) > product_batch_max_urls:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {product_batch_max_urls} urls",
+        )
+
+    await authorise_product_request(request, store_type)
+
+    # One JSON object per line, written as each url completes
+    return StreamingResponse(stream_product_results(body.urls), media_type="application/x-ndjson")
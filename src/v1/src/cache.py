@@ -0,0 +1,138 @@
+# External Imports
+from collections import OrderedDict
+
+import threading
+import asyncio
+import sqlite3
+import json
+import time
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache whose entries expire after a fixed time.
+
+    If a sqlite_path is given, entries are also written to a SQLite table so they survive
+    restarts and are shared between worker processes, with the in-memory LRU in front of it.
+    Values must be JSON serialisable.
+
+    Code running on the event loop should use aget/aset, which only touch SQLite from a
+    worker thread. get/set do the SQLite work inline and are for code which isn't async.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: int,
+        sqlite_path: str | None = None,
+        table: str = "cache",
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+
+        # key -> (expires_at, value)
+        self._store: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # The memory lock is never held while SQLite is in use, it has its own
+        self._db = None
+        self._db_lock = threading.Lock()
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str):
+        """Return the cached value, or None if it is missing or has expired."""
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        return self._load(key)
+
+    def set(self, key: str, value, ttl_seconds: int | None = None):
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._set_memory(key, value, expires_at)
+
+        if self._db is not None:
+            self._write(key, value, expires_at)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._store.pop(key, None)
+
+        if self._db is not None:
+            self._remove(key)
+
+    async def aget(self, key: str):
+        """get, reading SQLite off the event loop when the entry isn't in memory."""
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        return await asyncio.to_thread(self._load, key)
+
+    async def aset(self, key: str, value, ttl_seconds: int | None = None):
+        """set, writing SQLite off the event loop."""
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._set_memory(key, value, expires_at)
+
+        if self._db is not None:
+            await asyncio.to_thread(self._write, key, value, expires_at)
+
+    async def adelete(self, key: str):
+        with self._lock:
+            self._store.pop(key, None)
+
+        if self._db is not None:
+            await asyncio.to_thread(self._remove, key)
+
+    def _get_memory(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if entry[0] > now:
+                self._store.move_to_end(key)
+                return entry[1]
+            del self._store[key]
+            return None
+
+    def _set_memory(self, key: str, value, expires_at: float):
+        self._store[key] = (expires_at, value)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_size:
+            self._store.popitem(last=False)
+
+    def _load(self, key: str):
+        with self._db_lock:
+            row = self._db.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+
+        # Promote the persisted entry into memory
+        value = json.loads(row[0])
+        with self._lock:
+            self._set_memory(key, value, row[1])
+        return value
+
+    def _write(self, key: str, value, expires_at: float):
+        data = json.dumps(value)
+        with self._db_lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at),
+            )
+            self._db.commit()
+
+    def _remove(self, key: str):
+        with self._db_lock:
+            self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._db.commit()
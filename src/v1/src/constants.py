@@ -8,17 +8,109 @@ load_dotenv()
 history_limits = {"Free - member": 50, "Standard - member": 100, "Pro - member": 500, "Enterprise 1 - member": 700, "Enterprise 2 - member": 800, "Enterprise 3 - member": 900, "Enterprise 4 - member": 1000}
 
 
-# Path to the cookiejar file
-COOKIEJAR_PATH = "cookies.pkl"
+# Path to the cookie store (SQLite) and how often changed cookies are written to it
+COOKIEJAR_PATH = os.getenv("COOKIEJAR_PATH", "cookies.db")
+cookie_flush_interval_seconds = 5
 
 
-# eBay Limits
-max_ebay_order_limit_per_page = 200
-max_ebay_listing_limit_per_page = 200
+# Entries per page when sweeping a user's whole eBay active list
+max_ebay_listing_page_size = 200
 
-# Depop Limits
-max_depop_order_limit_per_page = 200
-max_depop_listing_limit_per_page = 200
+# Max new eBay orders built at once (each may need a GetItem call)
+max_concurrent_new_orders = 5
+
+# Cache of eBay listing details looked up for orders
+ebay_listing_cache_size = 2000
+ebay_listing_cache_ttl_seconds = 60 * 60 * 6
+EBAY_LISTING_CACHE_PATH = os.getenv("EBAY_LISTING_CACHE_PATH")
+
+# eBay incremental listing sync (GetSellerEvents)
+ebay_seller_events_max_window_hours = 48
+ebay_seller_events_overlap_minutes = 5
+ebay_full_listing_sweep_interval_hours = int(
+    os.getenv("EBAY_FULL_LISTING_SWEEP_INTERVAL_HOURS", 24)
+)
+
+# Overlap used when resuming an order sync from the last fetched date
+ebay_order_watermark_overlap_minutes = 10
+# How far back GetOrders accepts a ModTimeFrom
+ebay_order_mod_time_window_days = 30
+
+# eBay platform notifications
+ebay_notification_max_age_minutes = 10
+ebay_order_notification_events = ["FixedPriceTransaction", "AuctionCheckoutComplete", "EndOfAuction"]
+ebay_listing_notification_events = ["ItemSold", "ItemRevised", "ItemClosed"]
+# Where eBay delivers notifications, set on the application when an account is subscribed
+EBAY_NOTIFICATION_URL = os.getenv("EBAY_NOTIFICATION_URL")
+# How long shutdown waits for queued notifications to be applied
+ebay_notification_drain_seconds = 5
+
+# Background token refresh
+token_refresh_margin_seconds = int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", 600))
+token_refresh_jitter_seconds = 60
+token_refresh_max_concurrency = 5
+token_refresh_retry_seconds = 60
+token_manager_interval_seconds = 15
+# Only users seen recently are kept refreshed, anyone else is refreshed on their next request
+token_tracking_ttl_seconds = int(os.getenv("TOKEN_TRACKING_TTL_SECONDS", 60 * 60))
+token_tracking_max_users = 1000
+
+# Depop HTTP client
+depop_header_profile_count = 20
+depop_max_connections = 20
+depop_max_keepalive_connections = 10
+depop_keepalive_expiry_seconds = 30
+depop_timeout_seconds = 10.0
+# Requests in flight to one Depop host, shared by every shop being synced
+depop_max_requests_per_host = int(os.getenv("DEPOP_MAX_REQUESTS_PER_HOST", 8))
+DEPOP_API_URL = os.getenv("DEPOP_API_URL", "https://webapi.depop.com")
+# Overlap used when comparing sold orders against the last order sync's watermark
+depop_order_watermark_overlap_minutes = 10
+
+# Product scraping tls_client sessions
+product_client_identifier = "chrome112"
+product_request_timeout_seconds = 15
+# Product metadata is read from the <head>, anything past this is never parsed
+product_head_max_bytes = 512 * 1024
+# Domains which answered a range request with the whole page get compressed full pages for this
+# long, before a range is tried again
+product_range_retry_seconds = 60 * 60 * 24
+product_domain_cache_size = 4096
+
+# Product metadata cache, entries are served as-is while fresh, then served and refreshed in the
+# background until they are too stale to use
+product_cache_size = 5000
+product_cache_fresh_seconds = 60 * 60
+product_cache_max_stale_seconds = 60 * 60 * 24
+PRODUCT_CACHE_PATH = os.getenv("PRODUCT_CACHE_PATH")
+# Query parameters which only track where a link came from, and never change the product
+product_tracking_params = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga"}
+product_tracking_param_prefixes = ("utm_", "_trk", "trk")
+
+# Per-domain circuit breaker for product fetches
+product_breaker_window_seconds = 60
+product_breaker_min_requests = 5
+product_breaker_failure_rate = 0.5
+product_breaker_open_seconds = 30
+product_breaker_half_open_probes = 1
+product_breaker_failure_statuses = {403, 429, 500, 502, 503, 504}
+# Users allowed to see every domain's breaker state at /v1/product/metrics, comma separated uids
+PRODUCT_METRICS_ADMIN_UIDS = set(filter(None, os.getenv("PRODUCT_METRICS_ADMIN_UIDS", "").split(",")))
+# Urls which just failed are answered from here, rather than fetched again straight away
+product_negative_cache_size = 2000
+product_negative_cache_seconds = 60
+
+# Batch product retrieval
+product_batch_max_urls = 100
+product_batch_max_concurrency = 16
+product_batch_max_per_domain = 4
+
+# Reused tls_client sessions for product fetches
+product_session_pool_max_size = 32
+product_session_pool_max_per_key = 4
+product_session_idle_seconds = 90
+product_session_max_age_seconds = 60 * 10
+product_session_max_requests = 500
 
 # DB Keys & Collections
 inventory_key = "inventory"
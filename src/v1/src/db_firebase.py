@@ -87,12 +87,39 @@ class FirebaseDB:
         db: AsyncClient = await self.get_db_client()
         return db.collection("users").document(uid)
 
+    async def query_user_ref_by_ebay_user_id(
+        self, ebay_user_id: str
+    ) -> AsyncDocumentReference | None:
+        """
+        Retrieve a user reference by the eBay user id of their connected account.
+        """
+        db: AsyncClient = await self.get_db_client()
+        query = (
+            db.collection("users")
+            .where(filter=FieldFilter("connectedAccounts.ebay.ebayUserId", "==", ebay_user_id))
+            .limit(1)
+        )
+        docs = await query.get()
+        return docs[0].reference if docs else None
+
+    @handle_firestore_errors
+    async def set_ebay_user_id(self, user_ref: AsyncDocumentReference, ebay_user_id: str):
+        """Set the eBay user id of the user's connected account, used to match notifications."""
+        await user_ref.update({"connectedAccounts.ebay.ebayUserId": ebay_user_id})
+
     @handle_firestore_errors
     async def update_user_token(
-        self, user_ref: AsyncDocumentReference, token_data: EbayTokenData
+        self,
+        user_ref: AsyncDocumentReference,
+        token_data: EbayTokenData,
+        store_type: StoreType = "ebay",
+        previous_token: tuple[str, int] | None = None,
     ):
         """
-        Update the eBay access token and its expiry for a specific user identified by uid.
+        Update the <store_type> access token and its expiry for a specific user identified by uid.
+
+        If the token is replaced before it expires, previous_token (access_token, expiry_timestamp)
+        is kept so clients still holding it are accepted until it expires.
         """
         new_access_token = token_data.access_token
         expires_in = token_data.expires_in  # Time in seconds
@@ -111,12 +138,15 @@ class FirebaseDB:
                 expiry_time.timestamp()
             )  # Convert to Unix timestamp in seconds
 
-            await user_ref.update(
-                {
-                    "connectedAccounts.ebay.ebayAccessToken": new_access_token,
-                    "connectedAccounts.ebay.ebayTokenExpiry": expiry_timestamp,
-                }
-            )
+            fields = {
+                f"connectedAccounts.{store_type}.{store_type}AccessToken": new_access_token,
+                f"connectedAccounts.{store_type}.{store_type}TokenExpiry": expiry_timestamp,
+            }
+            if previous_token:
+                fields[f"connectedAccounts.{store_type}.{store_type}PreviousAccessToken"] = previous_token[0]
+                fields[f"connectedAccounts.{store_type}.{store_type}PreviousTokenExpiry"] = previous_token[1]
+
+            await user_ref.update(fields)
 
             return {"success": True, "message": "Token and expiry updated successfully"}
         except Exception as e:
@@ -133,6 +163,28 @@ class FirebaseDB:
         """Set the last fetched date for inventory or orders."""
         await user_ref.update({f"store.storeMeta.{store_type}.lastFetchedDate.{data_type}": date})
 
+    @handle_firestore_errors
+    async def set_last_full_sweep_date(
+        self,
+        user_ref: AsyncDocumentReference,
+        data_type: str,
+        date: str,
+        store_type: StoreType,
+    ):
+        """Set the date of the last full (non-incremental) sweep for inventory or orders."""
+        await user_ref.update({f"store.storeMeta.{store_type}.lastFullSweep.{data_type}": date})
+
+    @handle_firestore_errors
+    async def set_high_watermark(
+        self,
+        user_ref: AsyncDocumentReference,
+        data_type: str,
+        date: str,
+        store_type: StoreType,
+    ):
+        """Set the latest modification time synced for inventory or orders."""
+        await user_ref.update({f"store.storeMeta.{store_type}.highWatermark.{data_type}": date})
+
     @handle_firestore_errors
     async def set_offset(
         self,
@@ -340,6 +392,50 @@ class FirebaseDB:
         except Exception as error:
             return {"success": False, "message": str(error)}
 
+    @handle_firestore_errors
+    async def remove_items(
+        self, uid: str, item_ids: list[str], item_type: ItemType, store_type: StoreType
+    ):
+        """
+        Remove many items from the <store_type> sub-collection using batched writes.
+        """
+        try:
+            db: AsyncClient = await self.get_db_client()
+            col_ref = db.collection(item_type).document(uid).collection(store_type)
+
+            # Firestore allows a maximum of 500 writes per batch
+            batch_size = 500
+            for i in range(0, len(item_ids), batch_size):
+                batch = db.batch()
+                for item_id in item_ids[i : i + batch_size]:
+                    batch.delete(col_ref.document(item_id))
+                await batch.commit()
+
+            return {"success": True, "message": f"{len(item_ids)} {item_type} removed successfully"}
+
+        except Exception as error:
+            print(traceback.format_exc())
+            return {"success": False, "message": str(error)}
+
+    @handle_firestore_errors
+    async def get_automatic_item_ids(
+        self, uid: str, item_type: ItemType, store_type: StoreType
+    ) -> set[str]:
+        """
+        Retrieve the ids of every automatically added item in the <store_type> sub-collection,
+        without reading the documents' fields.
+        """
+        db: AsyncClient = await self.get_db_client()
+        query = (
+            db.collection(item_type)
+            .document(uid)
+            .collection(store_type)
+            .where(filter=FieldFilter("recordType", "==", "automatic"))
+            .select([])
+        )
+
+        return {doc.id async for doc in query.stream()}
+
     @handle_firestore_errors
     async def get_items_by_ids(
         self,
@@ -1,5 +1,9 @@
+# Local Imports
+from ..constants import DEPOP_API_URL
+
+
 def sold_url(shop_id: str, limit: int = 24, offset_id: str = None):
-    url = f"https://webapi.depop.com/api/v2/shop/{shop_id}/filteredProducts/sold/?lang=en&limit={limit}&force_fee_calculation=false"
+    url = f"{DEPOP_API_URL}/api/v2/shop/{shop_id}/filteredProducts/sold/?lang=en&limit={limit}&force_fee_calculation=false"
 
     if offset_id:
         url += f"&offset_id={offset_id}"
@@ -7,7 +11,7 @@ def sold_url(shop_id: str, limit: int = 24, offset_id: str = None):
     return url
 
 def inventory_url(shop_id: str, limit: int = 24, offset_id: str = None):
-    url = f"https://webapi.depop.com/api/v3/shop/{shop_id}/products/?limit={limit}&force_fee_calculation=false"
+    url = f"{DEPOP_API_URL}/api/v3/shop/{shop_id}/products/?limit={limit}&force_fee_calculation=false"
 
     if offset_id:
         url += f"&after={offset_id}"
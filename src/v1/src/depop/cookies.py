@@ -0,0 +1,106 @@
+# Local Imports
+from ..constants import COOKIEJAR_PATH, cookie_flush_interval_seconds
+
+# External Imports
+import traceback
+import threading
+import asyncio
+import sqlite3
+import json
+
+
+class CookieStore:
+    """
+    Per-domain cookies kept in memory and flushed to SQLite in the background.
+
+    Each flush writes the changed domains in a single transaction, so the file is never left
+    half written, and SQLite's locking makes it safe to share between worker processes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._cookies: dict[str, dict[str, str]] = {}
+        self._dirty: set[str] = set()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cookies (domain TEXT PRIMARY KEY, cookies TEXT)"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, domain: str) -> dict[str, str]:
+        """Return the cookies for a domain, loading them from disk the first time it is used."""
+        if domain not in self._cookies:
+            self._load(domain)
+        return dict(self._cookies[domain])
+
+    async def aget(self, domain: str) -> dict[str, str]:
+        """get, reading SQLite off the event loop the first time a domain is used."""
+        if domain not in self._cookies:
+            await asyncio.to_thread(self._load, domain)
+        return dict(self._cookies[domain])
+
+    def _load(self, domain: str):
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT cookies FROM cookies WHERE domain = ?", (domain,)
+                ).fetchone()
+            cookies = json.loads(row[0]) if row else {}
+        except Exception:
+            print(traceback.format_exc())
+            cookies = {}
+
+        # Cookies set while this was loading are newer than the ones on disk
+        self._cookies.setdefault(domain, cookies)
+
+    def update(self, domain: str, cookies: dict[str, str]):
+        """Replace the cookies for a domain, they are written to disk on the next flush."""
+        if self._cookies.get(domain) == cookies:
+            return
+
+        self._cookies[domain] = dict(cookies)
+        self._dirty.add(domain)
+        self._start_flushing()
+
+    def _start_flushing(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while self._dirty:
+            await asyncio.sleep(cookie_flush_interval_seconds)
+            await self.flush()
+
+    async def flush(self):
+        """Write the changed domains to disk."""
+        if not self._dirty:
+            return
+
+        rows = [(domain, json.dumps(self._cookies[domain])) for domain in self._dirty]
+        self._dirty.clear()
+
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            print(traceback.format_exc())
+            # Try again on the next flush
+            self._dirty.update(domain for domain, _ in rows)
+
+    def _write(self, rows: list[tuple[str, str]]):
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO cookies (domain, cookies) VALUES (?, ?)", rows
+                )
+
+
+cookie_store = CookieStore(COOKIEJAR_PATH)
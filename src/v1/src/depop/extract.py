@@ -1,4 +1,10 @@
+# Local Imports
 from ..models import OrderStatus
+from ..utils import parse_iso_date
+
+# External Imports
+from datetime import datetime
+
 
 def extract_quantity(listing: dict):
     # Step 1: Extract quantity data
@@ -76,3 +82,15 @@ def extract_image(item: dict):
         image = []
 
     return image
+
+
+def extract_modified_times(orders: list[dict]) -> list[datetime | None]:
+    """
+    Return when each order was last modified, or None where Depop didn't say.
+    """
+    modified_times = []
+    for order in orders:
+        modified = order.get("date_updated")
+        modified_times.append(parse_iso_date(modified) if modified else None)
+
+    return modified_times
@@ -1,104 +1,152 @@
 # Local Imports
 from ..constants import (
-    max_depop_listing_limit_per_page,
-    max_depop_order_limit_per_page,
     inventory_key,
     sale_key,
+    sale_id_key,
     history_limits,
+    depop_order_watermark_overlap_minutes,
     MAX_WHILE_LOOP_DEPTH,
 )
 from ..db_firebase import FirebaseDB
+from ..pagination import PaginationPolicy
 from .contants import inventory_url, sold_url
 from ..models import IUser, IdKey, OrderStatus
-from .web_req import tls_client_request
+from .web_req import httpx_request
 from .extract import (
     extract_quantity,
     extract_price,
     extract_shipping,
     extract_history,
     extract_image,
+    extract_modified_times,
 )
 from ..utils import (
     format_date_to_iso,
+    parse_iso_date,
     was_order_created_in_current_month,
     fetch_user_member_sub,
+    fetch_user_inventory_and_orders_count,
 )
 
 # External Imports
-from datetime import datetime, timezone
+from google.cloud.firestore_v1 import AsyncDocumentReference
+from datetime import datetime, timezone, timedelta
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
 
 import traceback
+import asyncio
 
 # --------------------------------------------------------------- #
+# Depop Pagination                                                #
+# --------------------------------------------------------------- #
 
 
-async def fetch_depop_listings(limit: int, db: FirebaseDB, user: IUser, **kwargs):
-    # Step 1: Extract kwargs
-    id_key = kwargs.get("id_key")
-    page, offset_id = 1, user.store.depop.offset.inventory
+async def fetch_page_from_depop(url: str):
+    try:
+        response: dict | None = await httpx_request(url)
+        if response is None:
+            # Ending the pages here would look like the end of the list to the caller
+            raise Exception(f"fetch_page_from_depop(): Failed to fetch {url}")
 
-    # Step 2: Calculate the number of item slots the user has left
-    available_slots = limit - user.store.depop.numListings.automatic
-    while_loop_count = 0
+        items: list[dict] = response.get("products", [])
+        meta: dict = response.get("meta", {})
 
-    items = []
+        return items, meta
+    except Exception as error:
+        print(traceback.format_exc())
+        raise error
+
+
+async def iterate_depop_pages(
+    fetch_page: Callable, shop_id: str, next_page_size: Callable[[], int]
+) -> AsyncIterator[tuple[list[dict], dict]]:
+    """
+    Yield each page of a Depop shop list, following the last_offset_id cursor.
+
+    The next page is requested as soon as the cursor is known, so it downloads while the caller
+    processes the current page. If the caller stops early the prefetched request is cancelled.
+    """
+    task = asyncio.create_task(fetch_page(next_page_size(), shop_id, None))
     try:
-        while available_slots > 0:
-            if while_loop_count >= MAX_WHILE_LOOP_DEPTH:
-                raise Exception("Max while loop depth reached")
-            while_loop_count += 1
-
-            # Step 3: Query depop for the users listings
-            listings, meta = await fetch_listings_from_depop(
-                limit, user.connectedAccounts.depop.shopId, offset_id
-            )
-            if not (listings and meta):
-                break
-
-            # Step 4: Process the listings
-            items, new_items_count, available_slots = await process_listings(
-                listings, user, db, available_slots, id_key
-            )
-
-            # Step 5: Update offset
+        for _ in range(MAX_WHILE_LOOP_DEPTH):
+            items, meta = await task
+            task = None
+            if not items:
+                return
+
+            # Step 1: Start fetching the next page before handing this one over
             offset_id = meta.get("last_offset_id")
+            if offset_id and not meta.get("end"):
+                task = asyncio.create_task(fetch_page(next_page_size(), shop_id, offset_id))
 
-            # Step 6: If there are no more listings or slots, break the loop
-            if meta.get("end") or available_slots <= 0:
-                break
+            yield items, meta
 
-            # Step 7: Move to the next page
-            page += 1
+            if task is None:
+                return
 
-        return {"content": items, "new": new_items_count}
+        print("iterate_depop_pages(): Max while loop depth reached")
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
 
-    except Exception as error:
-        print(traceback.format_exc())
-        raise error
 
+# --------------------------------------------------------------- #
+# Depop Listing Processing                                        #
+# --------------------------------------------------------------- #
 
-async def fetch_listings_from_depop(limit: int, shop_id: str, offset_id: str):
-    max_per_page = (
-        max_depop_listing_limit_per_page
-        if limit > max_depop_listing_limit_per_page
-        else limit
-    )
 
+async def fetch_depop_listings(
+    limit: int, db: FirebaseDB, user: IUser, user_ref: AsyncDocumentReference, **kwargs
+):
+    # Step 1: Extract kwargs
+    id_key = kwargs.get("id_key")
+    new_items_count = 0
+
+    if user.store.storeMeta.get("depop") is None:
+        return
+
+    # Step 2: Calculate the number of item slots the user has left
+    user_count = await fetch_user_inventory_and_orders_count(user, user_ref, db)
+    available_slots = limit - user_count["automaticListings"]
+    pagination = PaginationPolicy.for_provider("depop", inventory_key)
+
+    items = []
     try:
-        url = inventory_url(shop_id, max_per_page, offset_id)
-        response: dict | None = await tls_client_request(url)
-        if response is None:
-            return
+        if available_slots <= 0:
+            return {"content": items, "new": new_items_count}
+
+        # Step 3: Query depop for the users listings, a page at a time
+        pages = iterate_depop_pages(
+            fetch_listings_from_depop,
+            user.connectedAccounts.depop.shopId,
+            lambda: pagination.next_page_size(available_slots),
+        )
+        async with aclosing(pages):
+            async for listings, meta in pages:
+                # Step 4: Process the listings
+                page_items, page_new_count, available_slots = await process_listings(
+                    listings, user, db, available_slots, id_key
+                )
+                items.extend(page_items)
+                new_items_count += page_new_count
+                pagination.record_page(len(listings), page_new_count)
 
-        items: list[dict] = response.get("products", [])
-        meta: dict = response.get("meta", {})
+                # Step 5: If there are no more slots, stop (the prefetched page is cancelled)
+                if available_slots <= 0:
+                    break
+
+        return {"content": items, "new": new_items_count}
 
-        return items, meta
     except Exception as error:
         print(traceback.format_exc())
         raise error
 
 
+async def fetch_listings_from_depop(page_size: int, shop_id: str, offset_id: str | None):
+    return await fetch_page_from_depop(inventory_url(shop_id, page_size, offset_id))
+
+
 async def process_listings(
     listings: list[dict],
     user: IUser,
@@ -122,28 +170,27 @@ async def process_listings(
             if listing.get("sold") == True:
                 continue
 
-            # Step 4: Check if the quantity is zero, if it is then ignore this listing
+            # Step 4: Get the db listing from the map
+            db_listing: dict = db_listings_map.get(str(listing["id"]))
+
+            # Step 5: Check if the quantity is zero, if it is then remove or ignore this listing
             quantity = extract_quantity(listing)
-            if quantity == 0 and db_listing is not None:
-                db.remove_item(user.id, listing["ItemID"], inventory_key, "depop")
-            elif quantity == 0:
+            if quantity == 0:
+                if db_listing is not None:
+                    await db.remove_item(user.id, str(listing["id"]), inventory_key, "depop")
                 continue
 
-            # Step 5: Get the db listing from the map
-            db_listing: dict = db_listings_map.get(str(listing["id"]))
-
             if db_listing is None:
-                # Step 5: If the db listing doesn't exist then this is a new listing, so increment the below values
+                # Step 6: If the db listing doesn't exist then this is a new listing, so increment the below values
                 new_items_count += 1
                 available_slots -= 1
-
-            # Step 6: Extract the largest image
+            # Step 7: Extract the largest image
             image = extract_image(listing)
 
-            # Step 7: Extract prices
+            # Step 8: Extract prices
             original_price, discounted_price = extract_price(listing.get("pricing"))
 
-            # Step 8: Create the listing dictionary
+            # Step 9: Create the listing dictionary
             item = {
                 "currency": listing.get("pricing", {}).get("currency_name"),
                 "dateListed": (
@@ -173,10 +220,10 @@ async def process_listings(
             }
 
             if check_for_listing_changes(item, db_listing):
-                # Step 9: If the item is different from the db listing then append the listing data to items so it gets update/added
+                # Step 10: If the item is different from the db listing then append the listing data to items so it gets update/added
                 items.append(item)
 
-            # Step 10: If no more available slots, stop processing
+            # Step 11: If no more available slots, stop processing
             if available_slots <= 0:
                 return items, new_items_count, available_slots
 
@@ -214,72 +261,115 @@ def check_for_listing_changes(new_listing: dict, db_listing: dict):
 
 
 # --------------------------------------------------------------- #
+# Depop Order Processing                                          #
+# --------------------------------------------------------------- #
 
 
-async def fetch_depop_orders(limit: int, db: FirebaseDB, user: IUser, **kwargs):
+async def fetch_depop_orders(
+    limit: int, db: FirebaseDB, user: IUser, user_ref: AsyncDocumentReference, **kwargs
+):
     # Step 1: Extract kwargs
-    new_items_count, old_items_count, page, offset_id = (
-        0,
-        0,
-        1,
-        user.store.depop.offset.orders,
-    )
+    new_items_count, old_items_count = 0, 0
+
+    if user.store.storeMeta.get("depop") is None:
+        return
 
     # Step 2: Fetch the history limit if this is the first lookup
     first_lookup = False
-    if user.store.depop.lastFetchedDate.orders is None:
+    store_meta = user.store.storeMeta["depop"]
+    if store_meta.lastFetchedDate.orders is None:
         first_lookup = True
         user_sub = fetch_user_member_sub(user)
         limit = history_limits.get(user_sub.name)
 
-    # Step 4: Calculate the number of item slots the user has left
-    available_slots = limit - user.store.depop.numOrders.automatic
+    # Step 3: Calculate the number of item slots the user has left
+    user_count = await fetch_user_inventory_and_orders_count(user, user_ref, db)
+    available_slots = limit - user_count["automaticOrders"]
+    pagination = PaginationPolicy.for_provider("depop", sale_key)
+
+    # Orders modified at or before this were read by an earlier sync, stepping back slightly
+    # so changes made while that sync was running aren't missed
+    watermark = store_meta.highWatermark.orders if store_meta.highWatermark else None
+    watermark_dt = parse_iso_date(watermark) if watermark else None
+    stop_dt = (
+        watermark_dt - timedelta(minutes=depop_order_watermark_overlap_minutes)
+        if watermark_dt
+        else None
+    )
+    high_watermark_dt = watermark_dt
+    reached_watermark = False
 
     items = []
-    while_loop_count = 0
     try:
-        while available_slots > 0:
-            if while_loop_count >= MAX_WHILE_LOOP_DEPTH:
-                raise Exception("Max while loop depth reached")
-            while_loop_count += 1
-
-            # Step 4: Query depop for the users orders
-            orders, meta = await fetch_orders_from_depop(
-                limit, user.connectedAccounts.depop.shopId, offset_id
-            )
-            if not (orders and meta):
-                break
-
-            # Step 5: Process the orders
-            (
-                items,
-                new_items_count,
-                old_items_count,
-                available_slots,
-            ) = await process_orders(
-                orders,
-                user,
-                db,
-                new_items_count,
-                old_items_count,
-                available_slots,
-                first_lookup,
-            )
-
-            # Step 6: Update offset
-            offset_id = meta.get("last_offset_id")
-
-            # Step 7: If there are no more orders or slots, break the loop
-            if meta.get("end") or available_slots <= 0:
-                break
-
-            # Step 8: Move to the next page
-            page += 1
+        if available_slots <= 0:
+            return {"content": items, "new": new_items_count, "old": old_items_count}
+
+        # Step 4: Query depop for the users orders, most recently updated first
+        pages = iterate_depop_pages(
+            fetch_orders_from_depop,
+            user.connectedAccounts.depop.shopId,
+            lambda: pagination.next_page_size(available_slots),
+        )
+        async with aclosing(pages):
+            async for orders, meta in pages:
+                # Step 5: Process the orders
+                previous_count = new_items_count + old_items_count
+                (
+                    page_items,
+                    new_items_count,
+                    old_items_count,
+                    available_slots,
+                ) = await process_orders(
+                    orders,
+                    user,
+                    db,
+                    new_items_count,
+                    old_items_count,
+                    available_slots,
+                    first_lookup,
+                )
+                items.extend(page_items)
+                page_new_count = new_items_count + old_items_count - previous_count
+                pagination.record_page(len(orders), page_new_count)
+
+                # Step 6: Move the high watermark up to the latest modification on this page
+                modified_times = extract_modified_times(orders)
+                known_times = [modified for modified in modified_times if modified]
+                if known_times and (high_watermark_dt is None or max(known_times) > high_watermark_dt):
+                    high_watermark_dt = max(known_times)
+
+                # Step 7: Stop once there are no slots left, or after the last page
+                if available_slots <= 0:
+                    break
+                if meta.get("end") or not meta.get("last_offset_id"):
+                    reached_watermark = True
+                    break
+
+                # Step 8: Stop once every order on the page was last modified before the watermark.
+                # This relies on the sold list being ordered by date_updated, so a refund or
+                # cancellation moves an older order back above the watermark. Orders without a
+                # date_updated never end the sync early.
+                if stop_dt and not first_lookup and all(
+                    modified is not None and modified <= stop_dt for modified in modified_times
+                ):
+                    reached_watermark = True
+                    break
+
+        # If the slots ran out first, or the pages stopped before the end of the list, the orders
+        # after the last page read weren't seen, so the watermark stays where it was and the next
+        # sync reads them
+        if not reached_watermark:
+            high_watermark_dt = watermark_dt
 
         return {
             "content": items,
             "new": new_items_count,
             "old": old_items_count,
+            "watermark": (
+                format_date_to_iso(high_watermark_dt)
+                if high_watermark_dt and high_watermark_dt != watermark_dt
+                else None
+            ),
         }
 
     except Exception as error:
@@ -287,26 +377,8 @@ async def fetch_depop_orders(limit: int, db: FirebaseDB, user: IUser, **kwargs):
         raise error
 
 
-async def fetch_orders_from_depop(limit: int, shop_id: str, offset_id: str):
-    max_per_page = (
-        max_depop_order_limit_per_page
-        if limit > max_depop_order_limit_per_page
-        else limit
-    )
-
-    try:
-        url = sold_url(shop_id, max_per_page, offset_id)
-        response: dict | None = await tls_client_request(url)
-        if response is None:
-            return
-
-        items: list[dict] = response.get("products", [])
-        meta: dict = response.get("meta", {})
-
-        return items, meta
-    except Exception as error:
-        print(traceback.format_exc())
-        raise error
+async def fetch_orders_from_depop(page_size: int, shop_id: str, offset_id: str | None):
+    return await fetch_page_from_depop(sold_url(shop_id, page_size, offset_id))
 
 
 async def process_orders(
@@ -320,12 +392,14 @@ async def process_orders(
 ):
     items = []
     try:
-        print("Orders length", len(orders))
+        # Step 1: Retrieve every order on the page from the database in one query
+        order_ids = [str(order["id"]) for order in orders if "id" in order]
+        db_orders_map = await db.get_items_by_ids(
+            user.id, order_ids, sale_key, "depop", sale_id_key
+        )
+
         for order in orders:
-            # Step 1: Retrieve the order from the database
-            res = await db.retrieve_item(user.id, str(order["id"]), sale_key, "depop")
-            db_transaction = res.get("item")
-            print("order", order["id"], db_transaction is None)
+            db_transaction = db_orders_map.get(str(order["id"]))
 
             if db_transaction is None:
                 # Step 2: Handle if the order doesn't exist in the database
@@ -445,7 +519,8 @@ async def handle_modified_order(
     order: dict,
     db_transaction: dict,
 ):
-    updated_order = db_transaction.copy()
+    updated_order = {**db_transaction, "sale": dict(db_transaction.get("sale") or {})}
+    changed = False
 
     try:
         new_quantity = 1
@@ -460,9 +535,15 @@ async def handle_modified_order(
 
         if new_sale_price != old_sale_price:
             updated_order["sale"]["price"] = new_sale_price
+            changed = True
 
-        if order.get("status") != db_transaction.get("status"):
+        # Sold products don't always include a status, so only compare when one is given
+        if order.get("status") and order.get("status") != db_transaction.get("status"):
             updated_order["status"] = order.get("status")
+            changed = True
+
+        # Unchanged orders are skipped rather than rewritten
+        return updated_order if changed else None
 
     except Exception as error:
         print(traceback.format_exc())
@@ -1,14 +1,41 @@
 # Local Imports
-from ..constants import COOKIEJAR_PATH
+from ..constants import (
+    depop_header_profile_count,
+    depop_max_connections,
+    depop_max_keepalive_connections,
+    depop_keepalive_expiry_seconds,
+    depop_timeout_seconds,
+    depop_max_requests_per_host,
+)
+from .cookies import cookie_store
 
 # External Imports
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from urllib.parse import urlparse
 from fake_headers import Headers
 
-import pickle
+import asyncio
+import random
 import httpx
-import json
-import os
+
+
+# Shared client for every Depop request, so paginated fetches reuse the same connection
+client: httpx.AsyncClient | None = None
+
+# One semaphore per host, so syncing many shops at once can't flood Depop
+host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def generate_header_profile() -> dict:
+    profile: dict = Headers(headers=True).generate()
+    # Connection is a HTTP/1.1 only header, and br responses can't be decoded without brotli
+    profile.pop("Connection", None)
+    profile["Accept-Encoding"] = "gzip, deflate"
+    return profile
+
+
+# Random header profiles, generated once rather than on every request
+header_profiles = [generate_header_profile() for _ in range(depop_header_profile_count)]
 
 
 def headers(gen=False):
@@ -16,7 +43,7 @@ def headers(gen=False):
     Generate random headers
     """
     if gen is True:
-        return Headers(headers=True).generate()
+        return dict(random.choice(header_profiles))
     return {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/png,image/svg+xml,*/*;q=0.8",
@@ -37,25 +64,41 @@ def headers(gen=False):
     }
 
 
-def load_cookies():
-    """
-    Load cookies from the local cookiejar file.
-    """
-    if os.path.exists(COOKIEJAR_PATH) and os.path.getsize(COOKIEJAR_PATH) > 0:
-        try:
-            with open(COOKIEJAR_PATH, "rb") as f:
-                return pickle.load(f)
-        except EOFError:
-            return {}
-    return {}
+def create_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=depop_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=depop_max_connections,
+            max_keepalive_connections=depop_max_keepalive_connections,
+            keepalive_expiry=depop_keepalive_expiry_seconds,
+        ),
+        # Cookies only come from the cookie store, the client's own jar would keep every response's
+        # cookies and send them with requests for other shops
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        transport=transport,
+    )
 
 
-def save_cookies(cookies):
-    """
-    Save cookies to the local cookiejar file.
-    """
-    with open(COOKIEJAR_PATH, "wb") as f:
-        pickle.dump(cookies, f)
+def get_client() -> httpx.AsyncClient:
+    global client
+    if client is None or client.is_closed:
+        client = create_client()
+    return client
+
+
+async def close_client():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+
+
+def get_host_semaphore(domain: str) -> asyncio.Semaphore:
+    semaphore = host_semaphores.get(domain)
+    if semaphore is None:
+        semaphore = host_semaphores[domain] = asyncio.Semaphore(depop_max_requests_per_host)
+    return semaphore
 
 
 def get_domain(url):
@@ -96,28 +139,35 @@ async def check_response_status(status_code, url):
 
 
 async def httpx_request(url):
-    response = None
     try:
-        cookies_store = load_cookies()
         domain = get_domain(url)
-        domain_cookies = cookies_store.get(domain, {})
-
-        with httpx.AsyncClient(
-            cookies=domain_cookies,
-            timeout=10.0,
-        ) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            # Persist any set‑cookie headers
-            cookies_store[domain] = resp.cookies.jar.get_dict()
-            # Save updated cookies to file
-            save_cookies(cookies_store)
-            return resp.json()
-
-        return json.loads(response)
+        domain_cookies = await cookie_store.aget(domain)
+
+        # Send the stored cookies for this domain rather than the shared client's cookie jar
+        request_headers = headers(gen=True)
+        if domain_cookies:
+            request_headers["Cookie"] = "; ".join(
+                f"{name}={value}" for name, value in domain_cookies.items()
+            )
+
+        async with get_host_semaphore(domain):
+            resp = await get_client().get(url, headers=request_headers)
+        resp.raise_for_status()
+
+        # Keep any set‑cookie headers, they are written to disk in the background
+        if resp.cookies:
+            cookie_store.update(
+                domain,
+                {
+                    **domain_cookies,
+                    **{cookie.name: cookie.value for cookie in resp.cookies.jar},
+                },
+            )
+
+        return resp.json()
 
     except Exception as error:
-        print("Failed tls_client_request: %s", error)
+        print("Failed httpx_request: %s", error)
 
 
 async def httpx_fetch(url, session):
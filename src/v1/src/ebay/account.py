@@ -0,0 +1,96 @@
+# Local Imports
+from ..db_firebase import FirebaseDB
+from ..constants import (
+    ebay_order_notification_events,
+    ebay_listing_notification_events,
+    EBAY_NOTIFICATION_URL,
+)
+from ..models import IUser
+
+# External Imports
+from google.cloud.firestore_v1 import AsyncDocumentReference
+from ebaysdk.trading import Connection as Trading
+from dotenv import load_dotenv
+
+import traceback
+import asyncio
+import os
+
+
+load_dotenv()
+
+
+def get_trading_api(oauth_token: str) -> Trading:
+    return Trading(
+        appid=os.getenv("CLIENT_ID"),
+        devid=os.getenv("DEV_ID"),
+        certid=os.getenv("CLIENT_SECRET"),
+        token=oauth_token,
+        config_file=None,
+    )
+
+
+def fetch_ebay_user_id(oauth_token: str) -> str | None:
+    """
+    Return the eBay user id of the account the token belongs to.
+    """
+    response = get_trading_api(oauth_token).execute("GetUser", {})
+    return response.dict().get("User", {}).get("UserID")
+
+
+def subscribe_to_ebay_notifications(oauth_token: str):
+    """
+    Ask eBay to send the account's order and listing notifications to this application.
+    """
+    params = {
+        "UserDeliveryPreferenceArray": {
+            "NotificationEnable": [
+                {"EventType": event, "EventEnable": "Enable"}
+                for event in ebay_order_notification_events + ebay_listing_notification_events
+            ]
+        }
+    }
+
+    # The delivery url is set for the whole application, and is only sent if it's configured
+    if EBAY_NOTIFICATION_URL:
+        params["ApplicationDeliveryPreferences"] = {
+            "ApplicationEnable": "Enable",
+            "ApplicationURL": EBAY_NOTIFICATION_URL,
+            "DeviceType": "Platform",
+        }
+
+    get_trading_api(oauth_token).execute("SetNotificationPreferences", params)
+
+
+async def register_ebay_account(
+    db: FirebaseDB, user_ref: AsyncDocumentReference, user: IUser
+) -> IUser:
+    """
+    Store the eBay user id of a connected account and subscribe it to notifications.
+
+    Notifications only identify the seller by their eBay user id, so this has to run once
+    for each connected account before its notifications can be applied. The id is stored
+    last, so if subscribing fails it is tried again on the next sync.
+    """
+    account = user.connectedAccounts.ebay
+    if account is None or account.ebayUserId:
+        return user
+
+    try:
+        # Step 1: Find the eBay user id of the account (the Trading API calls are blocking)
+        ebay_user_id = await asyncio.to_thread(fetch_ebay_user_id, account.ebayAccessToken)
+        if not ebay_user_id:
+            return user
+
+        # Step 2: Subscribe the account to the notifications we apply
+        await asyncio.to_thread(subscribe_to_ebay_notifications, account.ebayAccessToken)
+
+        # Step 3: Store the id so notifications can be matched to this user
+        await db.set_ebay_user_id(user_ref, ebay_user_id)
+        account.ebayUserId = ebay_user_id
+
+    except Exception:
+        # A failed registration shouldn't fail the sync it is part of
+        print(traceback.format_exc())
+
+    return user
@@ -1,5 +1,6 @@
 # Local Imports
-from ..utils import format_date_to_iso
+from ..utils import format_date_to_iso, parse_iso_date
+from ..constants import ebay_order_mod_time_window_days
 
 # External Imports
 from datetime import datetime, timezone, timedelta
@@ -120,6 +121,101 @@ def extract_shipping_cost(order):
         return shipping_fees
 
 
+def extract_seller_event_listing(listing: dict) -> dict:
+    """
+    Normalise an item returned by GetSellerEvents into the shape GetMyeBaySelling's ActiveList uses,
+    so both can be passed through the same listing processing.
+    """
+    selling_status: dict = listing.get("SellingStatus", {})
+    current_price: dict = selling_status.get("CurrentPrice", {})
+
+    # GetSellerEvents doesn't return QuantityAvailable, so derive it (ended listings have nothing available)
+    quantity = int(listing.get("Quantity", 0))
+    quantity_sold = int(selling_status.get("QuantitySold", 0))
+    is_active = selling_status.get("ListingStatus", "Active") == "Active"
+    listing["QuantityAvailable"] = max(quantity - quantity_sold, 0) if is_active else 0
+
+    if not listing.get("BuyItNowPrice"):
+        listing["BuyItNowPrice"] = {"_currencyID": current_price.get("_currencyID")}
+    listing.setdefault("PictureDetails", {}).setdefault("GalleryURL", None)
+
+    return listing
+
+
+def extract_notification_orders(notification: dict) -> list[dict]:
+    """
+    Normalise the GetItemTransactions payload of an order notification (e.g. FixedPriceTransaction)
+    into the GetOrders order shape, one order per transaction.
+    """
+    item: dict = notification.get("Item", {})
+    transactions = notification.get("TransactionArray", {}).get("Transaction", [])
+    if not isinstance(transactions, list):
+        transactions = [transactions]
+
+    orders = []
+    for transaction in transactions:
+        containing_order: dict = transaction.get("ContainingOrder", {})
+        status: dict = transaction.get("Status", {})
+        transaction_price: dict = transaction.get("TransactionPrice", {})
+        currency = transaction_price.get("_currencyID")
+
+        quantity_sold = int(transaction.get("QuantityPurchased", 1))
+        subtotal = {
+            "_currencyID": currency,
+            "value": str(quantity_sold * float(transaction_price.get("value", "0.0"))),
+        }
+        amount_paid = transaction.get("AmountPaid") or subtotal
+
+        # Transactions in this payload only carry the item id, so add the details from the notification item
+        transaction["Item"] = {
+            "ItemID": item.get("ItemID"),
+            "Title": item.get("Title"),
+            "Site": item.get("Site", "eBay"),
+            **transaction.get("Item", {}),
+        }
+
+        orders.append(
+            {
+                "OrderID": containing_order.get("OrderID") or transaction.get("OrderLineItemID"),
+                "OrderStatus": containing_order.get(
+                    "OrderStatus",
+                    "Completed" if status.get("CompleteStatus") == "Complete" else "Active",
+                ),
+                "Subtotal": subtotal,
+                "Total": amount_paid,
+                "AmountPaid": amount_paid,
+                "CheckoutStatus": {
+                    "LastModifiedTime": status.get("LastTimeModified") or notification.get("Timestamp"),
+                },
+                "CreatedTime": transaction.get("CreatedDate"),
+                "BuyerUserID": transaction.get("Buyer", {}).get("UserID"),
+                "ShippingDetails": transaction.get("ShippingDetails", {}),
+                "ShippedTime": transaction.get("ShippedTime"),
+                "MonetaryDetails": transaction.get("MonetaryDetails", {}),
+                "TransactionArray": {"Transaction": [transaction]},
+            }
+        )
+
+    return orders
+
+
+def extract_latest_modified_time(orders: list[dict]) -> datetime | None:
+    """
+    Return the latest CheckoutStatus.LastModifiedTime in a page of orders.
+    """
+    latest = None
+    for order in orders:
+        modified = order.get("CheckoutStatus", {}).get("LastModifiedTime")
+        if not modified:
+            continue
+
+        modified_dt = parse_iso_date(modified)
+        if latest is None or modified_dt > latest:
+            latest = modified_dt
+
+    return latest
+
+
 def extract_time_key(time_from: str) -> str:
     """
     Determine whether to use 'CreateTimeFrom' or 'ModTimeFrom' based on the provided 'time_from'.
@@ -127,7 +223,7 @@ def extract_time_key(time_from: str) -> str:
     time_from_dt = datetime.fromisoformat(time_from.replace("Z", "")).replace(
         tzinfo=timezone.utc
     )
-    if datetime.now(timezone.utc) - time_from_dt < timedelta(days=30):
+    if datetime.now(timezone.utc) - time_from_dt < timedelta(days=ebay_order_mod_time_window_days):
         return "ModTimeFrom"
     return "CreateTimeFrom"
 
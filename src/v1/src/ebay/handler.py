@@ -1,22 +1,37 @@
 # Local Imports
 from ..db_firebase import FirebaseDB
+from ..cache import TTLCache
+from ..pagination import PaginationPolicy
 from ..constants import (
     history_limits,
-    max_ebay_order_limit_per_page,
-    max_ebay_listing_limit_per_page,
+    ebay_seller_events_max_window_hours,
+    ebay_seller_events_overlap_minutes,
+    ebay_full_listing_sweep_interval_hours,
+    max_concurrent_new_orders,
+    max_ebay_listing_page_size,
+    ebay_order_watermark_overlap_minutes,
+    ebay_order_mod_time_window_days,
+    ebay_listing_cache_size,
+    ebay_listing_cache_ttl_seconds,
+    EBAY_LISTING_CACHE_PATH,
     inventory_key,
+    inventory_id_key,
     sale_key,
+    sale_id_key,
     MAX_WHILE_LOOP_DEPTH,
 )
 from .extract import (
     extract_refund_data,
     extract_shipping_details,
     extract_time_key,
-    extract_taxes
+    extract_taxes,
+    extract_seller_event_listing,
+    extract_latest_modified_time,
 )
-from ..models import IUser, OrderStatus, IdKey
+from ..models import IUser, OrderStatus, IdKey, StoreEntry
 from ..utils import (
     format_date_to_iso,
+    parse_iso_date,
     fetch_user_member_sub,
     was_order_created_in_current_month,
     fetch_user_inventory_and_orders_count,
@@ -29,12 +44,21 @@ from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 
 import traceback
+import asyncio
 import os
 
 
 load_dotenv()
 
 
+# Listing details fetched from eBay for orders whose listing isn't stored, keyed by ItemID
+listing_details_cache = TTLCache(
+    ebay_listing_cache_size,
+    ebay_listing_cache_ttl_seconds,
+    EBAY_LISTING_CACHE_PATH,
+    "ebay_listing_details",
+)
+
 # --------------------------------------------------- #
 # eBay Inventory Processing                           #
 # --------------------------------------------------- #
@@ -53,43 +77,173 @@ async def fetch_ebay_listings(
     # Step 2: Calculate the number of item slots the user has left
     available_slots = limit - user_count["automaticListings"]
 
+    # Step 3: If the last sync was recent enough, only fetch the listings which changed since then
+    mod_time_from = get_listings_mod_time_from(user.store.storeMeta.get("ebay"))
+    if mod_time_from:
+        return await fetch_ebay_listing_events(
+            oauth_token, mod_time_from, db, user, available_slots, id_key
+        )
+
     items = []
-    force_update = False
+    new_items_count = 0
     while_loop_count = 0
+    seen_ids: set[str] = set()
+    active_ids: set[str] = set()
+    total_pages, total_entries = None, None
+    sweep_complete = False
     try:
-        while available_slots > 0:
+        # The whole active list is walked, even once the slots run out, so listings which have
+        # ended or been removed can be found. Use the largest pages to keep the number of calls down.
+        while True:
             if while_loop_count >= MAX_WHILE_LOOP_DEPTH:
-                raise Exception("Max while loop depth reached")
+                # The active list is incomplete, so skip reconciling rather than failing the sync
+                print("fetch_ebay_listings(): Max while loop depth reached")
+                break
             while_loop_count += 1
 
-            # Step 3: Query eBay for users listings
-            listings, total_pages = await fetch_listings_from_ebay(
-                oauth_token, limit, page
+            # Step 4: Query eBay for users listings
+            listings, pagination = await fetch_listings_from_ebay(
+                oauth_token, max_ebay_listing_page_size, page
             )
 
-            if not listings or not isinstance(listings, list):
+            if isinstance(listings, dict):
+                listings = [listings]
+
+            # An empty page or an error means the active list can't be trusted to be complete
+            if not listings or pagination["has_errors"]:
                 break
 
-            # Step 4: Process the listings
-            items, new_items_count, available_slots, force_update = (
-                await process_listings(listings, user, db, available_slots, id_key)
+            # Listings ending part way through shift the later pages, which shows up as a change in the totals
+            if total_pages is None:
+                total_pages, total_entries = pagination["total_pages"], pagination["total_entries"]
+            elif (total_pages, total_entries) != (pagination["total_pages"], pagination["total_entries"]):
+                break
+
+            # Step 5: Record every listing seen, and the ones which are still active
+            seen_ids.update(listing["ItemID"] for listing in listings if "ItemID" in listing)
+            active_ids.update(
+                listing["ItemID"]
+                for listing in listings
+                if "ItemID" in listing and int(listing.get("QuantityAvailable", 0)) > 0
             )
 
-            # Step 5: If there are no more pages or available slots, break the loop
-            if (total_pages and page >= int(total_pages)) or available_slots <= 0:
+            # Step 6: Process the listings while there are slots left
+            if available_slots > 0:
+                page_items, page_new_items_count, available_slots, _ = (
+                    await process_listings(listings, user, db, available_slots, id_key)
+                )
+                items.extend(page_items)
+                new_items_count += page_new_items_count
+
+            # Step 7: If this was the last page, the sweep is complete if every listing eBay counted was seen
+            if not total_pages or page >= total_pages:
+                sweep_complete = bool(total_pages) and len(seen_ids) == total_entries
                 break
 
-            # Step 6: Move to the next page
+            # Step 8: Move to the next page
             page += 1
 
-        return {"content": items, "new": new_items_count, "force_update": force_update}
+        # Step 9: Remove stored listings which are no longer active on eBay, only once the sweep is known to
+        # be complete. Anything less would delete listings which were simply on a page that wasn't read.
+        if sweep_complete:
+            new_items_count -= await reconcile_listings(db, user, active_ids)
+        else:
+            print(
+                f"fetch_ebay_listings(): Incomplete sweep ({len(seen_ids)} of {total_entries} listings), "
+                "not reconciling"
+            )
+
+        # lastFetchedDate always moves forward, but an incomplete sweep isn't recorded so the next
+        # sync sweeps again rather than going incremental
+        return {
+            "content": items,
+            "new": new_items_count,
+            "force_update": True,
+            "full_sweep": sweep_complete,
+        }
 
     except Exception as error:
         print(traceback.format_exc())
         raise error
 
 
-async def fetch_listings_from_ebay(oauth_token: str, limit: int, page: int):
+async def reconcile_listings(db: FirebaseDB, user: IUser, active_ids: set[str]) -> int:
+    """
+    Delete the automatically added eBay listings which weren't in the active list, e.g. because
+    they ended or were deleted on eBay. Returns the number of listings removed.
+    """
+    # Step 1: Diff the stored ids against the active ids
+    stored_ids = await db.get_automatic_item_ids(user.id, inventory_key, "ebay")
+    stale_ids = stored_ids - active_ids
+    if not stale_ids:
+        return 0
+
+    # Step 2: Remove the stale listings in bulk
+    res = await db.remove_items(user.id, list(stale_ids), inventory_key, "ebay")
+    if not res.get("success"):
+        raise Exception(res.get("message"))
+
+    return len(stale_ids)
+
+
+def get_listings_mod_time_from(store_meta: StoreEntry | None) -> str | None:
+    """
+    Return the ModTimeFrom to use for an incremental listing sync, or None if a full sweep is required.
+
+    A full sweep is required if the store has never been swept, the last full sweep is older than
+    the sweep interval, or the last sync is outside the window GetSellerEvents can cover.
+    """
+    if store_meta is None or not store_meta.lastFetchedDate or not store_meta.lastFullSweep:
+        return None
+
+    last_fetched = store_meta.lastFetchedDate.inventory
+    last_full_sweep = store_meta.lastFullSweep.inventory
+    if not last_fetched or not last_full_sweep:
+        return None
+
+    current_time = datetime.now(timezone.utc)
+    last_fetched_dt = parse_iso_date(last_fetched)
+    last_full_sweep_dt = parse_iso_date(last_full_sweep)
+
+    if current_time - last_full_sweep_dt >= timedelta(hours=ebay_full_listing_sweep_interval_hours):
+        return None
+
+    # Step back slightly so listings modified while the last sync was running aren't missed
+    mod_time_from = last_fetched_dt - timedelta(minutes=ebay_seller_events_overlap_minutes)
+    if current_time - mod_time_from >= timedelta(hours=ebay_seller_events_max_window_hours):
+        return None
+
+    return format_date_to_iso(mod_time_from)
+
+
+async def fetch_ebay_listing_events(
+    oauth_token: str,
+    mod_time_from: str,
+    db: FirebaseDB,
+    user: IUser,
+    available_slots: int,
+    id_key: IdKey,
+):
+    try:
+        # Step 1: Query eBay for the listings modified since the last sync
+        listings = await fetch_listing_events_from_ebay(oauth_token, mod_time_from)
+        if not listings:
+            return {"content": [], "new": 0, "force_update": True}
+
+        # Step 2: Process the listings, ended listings are reported with no quantity available so they get removed
+        items, new_items_count, _, _ = await process_listings(
+            listings, user, db, available_slots, id_key
+        )
+
+        # Always force the update so lastFetchedDate moves forward, even if nothing changed
+        return {"content": items, "new": new_items_count, "force_update": True}
+
+    except Exception as error:
+        print(traceback.format_exc())
+        raise error
+
+
+async def fetch_listing_events_from_ebay(oauth_token: str, mod_time_from: str):
     api = Trading(
         appid=os.getenv("CLIENT_ID"),
         devid=os.getenv("DEV_ID"),
@@ -98,10 +252,30 @@ async def fetch_listings_from_ebay(oauth_token: str, limit: int, page: int):
         config_file=None,
     )
 
-    max_per_page = (
-        max_ebay_listing_limit_per_page
-        if limit > max_ebay_listing_limit_per_page
-        else limit
+    params = {
+        "ModTimeFrom": mod_time_from,
+        "ModTimeTo": format_date_to_iso(datetime.now(timezone.utc)),
+        "DetailLevel": "ReturnAll",
+    }
+
+    response = api.execute("GetSellerEvents", params)
+    response_dict: dict = response.dict()
+
+    item_array = response_dict.get("ItemArray") or {}
+    items = item_array.get("Item", [])
+    if not isinstance(items, list):
+        items = [items]
+
+    return [extract_seller_event_listing(item) for item in items]
+
+
+async def fetch_listings_from_ebay(oauth_token: str, page_size: int, page: int):
+    api = Trading(
+        appid=os.getenv("CLIENT_ID"),
+        devid=os.getenv("DEV_ID"),
+        certid=os.getenv("CLIENT_SECRET"),
+        token=oauth_token,
+        config_file=None,
     )
 
     params = {
@@ -109,7 +283,7 @@ async def fetch_listings_from_ebay(oauth_token: str, limit: int, page: int):
             "Include": True,
             "Sort": "TimeLeft",
             "Pagination": {
-                "EntriesPerPage": max_per_page,
+                "EntriesPerPage": page_size,
                 "PageNumber": page,
             },
         }
@@ -120,9 +294,13 @@ async def fetch_listings_from_ebay(oauth_token: str, limit: int, page: int):
 
     items = response_dict.get("ActiveList", {}).get("ItemArray", {}).get("Item", [])
     pagenation = response_dict.get("ActiveList", {}).get("PaginationResult", {})
-    total_pages: str | None = pagenation.get("TotalNumberOfPages")
 
-    return items, total_pages
+    return items, {
+        "total_pages": int(pagenation.get("TotalNumberOfPages") or 0),
+        "total_entries": int(pagenation.get("TotalNumberOfEntries") or 0),
+        # ebaysdk raises on a failed call, but a warning can come back alongside partial results
+        "has_errors": bool(response_dict.get("Errors")) or response_dict.get("Ack") not in (None, "Success"),
+    }
 
 
 async def process_listings(
@@ -188,7 +366,7 @@ async def process_listings(
 
             # Step 8: If no more available slots, stop processing
             if available_slots <= 0:
-                return items, new_items_count, available_slots
+                return items, new_items_count, available_slots, force_update
 
         return items, new_items_count, available_slots, force_update
 
@@ -240,6 +418,8 @@ def fetch_listing_details_from_ebay(item_id: str, oauth_token: str):
         image_path = item.get("PictureDetails", {}).get("PictureURL")
         if image_path is None or len(image_path) == 0:
             image = None
+        elif isinstance(image_path, str):
+            image = image_path
         else:
             image = image_path[0]
 
@@ -251,6 +431,62 @@ def fetch_listing_details_from_ebay(item_id: str, oauth_token: str):
     return {}
 
 
+async def get_listing_details(item_id: str, oauth_token: str) -> dict:
+    """
+    Return the eBay listing details for an item, using the cache before calling GetItem.
+    """
+    details = await listing_details_cache.aget(item_id)
+    if details is None:
+        # GetItem is a blocking call, so run it off the event loop
+        details = await asyncio.to_thread(
+            fetch_listing_details_from_ebay, item_id, oauth_token
+        )
+
+        # A failed lookup returns nothing, it isn't cached so the next order tries again
+        if details:
+            await listing_details_cache.aset(item_id, details)
+
+    # Return a copy, callers add order specific fields to it
+    return dict(details)
+
+
+async def prefetch_listing_details(
+    db: FirebaseDB, uid: str, oauth_token: str, item_ids: list[str]
+) -> dict[str, dict | None]:
+    """
+    Look up the listings for a page of orders at once: the stored ones in a single query,
+    and the rest from the cache or eBay, each only once however many orders reference it.
+
+    Returns the listing for every id looked up, None if it couldn't be found.
+    """
+    # Step 1: Remove duplicate ids, keeping their order
+    item_ids = list(dict.fromkeys(item_id for item_id in item_ids if item_id))
+    if not item_ids:
+        return {}
+
+    # Step 2: Read the stored listings
+    listings: dict[str, dict | None] = await db.get_items_by_ids(
+        uid, item_ids, inventory_key, "ebay", inventory_id_key
+    )
+
+    # Step 3: Fetch the listings which aren't stored concurrently
+    semaphore = asyncio.Semaphore(max_concurrent_new_orders)
+
+    async def fetch(item_id: str):
+        async with semaphore:
+            try:
+                listings[item_id] = await get_listing_details(item_id, oauth_token) or None
+            except Exception:
+                print(traceback.format_exc())
+                listings[item_id] = None
+
+    await asyncio.gather(
+        *(fetch(item_id) for item_id in item_ids if item_id not in listings)
+    )
+
+    return listings
+
+
 # --------------------------------------------------- #
 # eBay Order Processing                               #
 # --------------------------------------------------- #
@@ -266,6 +502,11 @@ async def fetch_ebay_orders(
     if user.store.storeMeta.get("ebay") is None:
         return
 
+    # The latest LastModifiedTime stored by a previous sync
+    watermark = user.store.storeMeta["ebay"].highWatermark.orders
+    watermark_dt = parse_iso_date(watermark) if watermark else None
+    high_watermark_dt = watermark_dt
+
     # Step 2: Determine the time to start fetch orders
     time_from = user.store.storeMeta["ebay"].lastFetchedDate.orders
     if not time_from:
@@ -273,8 +514,22 @@ async def fetch_ebay_orders(
         user_sub = fetch_user_member_sub(user)
         limit = history_limits.get(user_sub.name)
 
-    # Step 3: If time from is older then a certain time, then search for orders using CreateTimeFrom else use ModTimeFrom
-    key = extract_time_key(time_from)
+        # Step 3: If time from is older then a certain time, then search for orders using CreateTimeFrom else use ModTimeFrom
+        key = extract_time_key(time_from)
+    else:
+        # Resume from the high watermark if there is one, stepping back slightly so orders modified
+        # while the last sync was running aren't missed
+        overlap = timedelta(minutes=ebay_order_watermark_overlap_minutes)
+        resume_dt = (watermark_dt or parse_iso_date(time_from)) - overlap
+
+        # Step 3: A resumed sync always filters by ModTimeFrom, so refunds and cancellations of older
+        # orders are picked up. eBay only accepts a ModTimeFrom within its window, so a quiet seller's
+        # old watermark is clamped to the start of it rather than switching to CreateTimeFrom.
+        earliest_dt = (
+            datetime.now(timezone.utc) - timedelta(days=ebay_order_mod_time_window_days) + overlap
+        )
+        time_from = format_date_to_iso(max(resume_dt, earliest_dt))
+        key = "ModTimeFrom"
 
     user_count = await fetch_user_inventory_and_orders_count(user, user_ref, db)
 
@@ -283,22 +538,25 @@ async def fetch_ebay_orders(
 
     items = []
     while_loop_count = 0
+    reached_last_page = False
+    pagination = PaginationPolicy.for_provider("ebay", sale_key)
     try:
         while available_slots > 0:
             if while_loop_count >= MAX_WHILE_LOOP_DEPTH:
                 raise Exception("Max while loop depth reached")
             while_loop_count += 1
 
-            # Step 5: Query eBay for the users orders
+            # Step 5: Query eBay for the users orders, the page size is chosen on the first page and kept
             orders, has_more_orders = await fetch_orders_from_ebay(
-                oauth_token, time_from, key, limit, page
+                oauth_token, time_from, key, pagination.next_page_size(available_slots), page
             )
 
             if not orders:
+                reached_last_page = True
                 break
 
             # Step 6: Process the orders
-            (items, new_items_count, old_items_count, available_slots) = (
+            (page_items, new_items_count, old_items_count, available_slots) = (
                 await process_orders(
                     orders,
                     db,
@@ -309,18 +567,46 @@ async def fetch_ebay_orders(
                     available_slots,
                 )
             )
-
-            # Step 7: If there are no more orders or slots, break the loop
-            if not has_more_orders or available_slots <= 0:
+            items.extend(page_items)
+
+            # Step 7: Move the high watermark up to the latest modification on this page
+            page_watermark_dt = extract_latest_modified_time(orders)
+            if page_watermark_dt and (
+                high_watermark_dt is None or page_watermark_dt > high_watermark_dt
+            ):
+                high_watermark_dt = page_watermark_dt
+
+            # Step 8: If there are no more orders or slots, break the loop.
+            # GetOrders sorts by creation time, not LastModifiedTime, so a page of orders at or below the
+            # watermark says nothing about the pages after it: an older order further on may have been
+            # refunded or cancelled since. The sync can't stop on a page's contents, instead a resumed
+            # sync is bounded by ModTimeFrom at the watermark, so eBay only returns orders modified since
+            # and a routine sync is usually a single page.
+            if not has_more_orders:
+                reached_last_page = True
+                break
+            if available_slots <= 0:
                 break
 
-            # Step 8: Move to the next page
+            # Step 9: Move to the next page
             page += 1
 
+        # Only move the watermark once every page has been read, if the slots ran out first the
+        # orders left unread may have been modified before the latest one seen
+        if not reached_last_page:
+            high_watermark_dt = watermark_dt
+
         return {
             "content": items,
             "new": new_items_count,
             "old": old_items_count,
+            # Move lastFetchedDate forward even if none of the fetched orders changed
+            "force_update": while_loop_count > 0,
+            "watermark": (
+                format_date_to_iso(high_watermark_dt)
+                if high_watermark_dt and high_watermark_dt != watermark_dt
+                else None
+            ),
         }
 
     except Exception as error:
@@ -329,7 +615,7 @@ async def fetch_ebay_orders(
 
 
 async def fetch_orders_from_ebay(
-    oauth_token: str, time_from: str, key: str, limit: int, page: int
+    oauth_token: str, time_from: str, key: str, page_size: int, page: int
 ):
     """
     Fetch orders from the eBay API with pagination.
@@ -354,18 +640,13 @@ async def fetch_orders_from_ebay(
         config_file=None,
     )
 
-    # Set the maximum limit per page if the users subscription limit is greater then this limit
-    max_per_page = (
-        max_ebay_order_limit_per_page
-        if limit > max_ebay_order_limit_per_page
-        else limit
-    )
-
     params = {
         "OrderStatus": "All",
         key: time_from,
+        # Newest first by creation time, so the newest orders get the slots when they run out
+        "SortingOrder": "Descending",
         "Pagination": {
-            "EntriesPerPage": max_per_page,
+            "EntriesPerPage": page_size,
             "PageNumber": page,
         },
     }
@@ -392,8 +673,9 @@ async def process_orders(
     old_items_count: int,
     available_slots: int,
 ):
-    items = []
     try:
+        # Step 1: Flatten the orders into (order, transaction) pairs, keeping eBay's order
+        pairs = []
         for order in orders:
             transactions: list[dict] = order.get("TransactionArray", {}).get(
                 "Transaction", []
@@ -402,42 +684,77 @@ async def process_orders(
                 transactions = [transactions]
 
             for transaction in transactions:
-                # Step 1: Retrieve the order from the database
-                res = await db.retrieve_item(
-                    uid, transaction.get("TransactionID"), sale_key, "ebay"
+                pairs.append((order, transaction))
+
+        # Step 2: Retrieve every transaction on the page from the database in one query
+        transaction_ids = [
+            str(transaction["TransactionID"])
+            for _, transaction in pairs
+            if transaction.get("TransactionID")
+        ]
+        db_transactions_map = await db.get_items_by_ids(
+            uid, transaction_ids, sale_key, "ebay", sale_id_key
+        )
+
+        results: list[dict | None] = [None] * len(pairs)
+        new_indexes: list[int] = []
+        for index, (order, transaction) in enumerate(pairs):
+            db_transaction = db_transactions_map.get(str(transaction.get("TransactionID")))
+
+            if db_transaction is None:
+                new_indexes.append(index)
+            else:
+                # Step 3: Handle if the order does exist in the database, this doesn't use a slot
+                results[index] = await handle_modified_order(
+                    order, transaction, db_transaction
                 )
-                db_transaction = res.get("item")
-
-                if db_transaction is None:
-                    # Step 2: Handle if the order doesn't exist in the database
-                    item = await handle_new_order(
-                        db, uid, oauth_token, order, transaction
-                    )
-                    if not item:
-                        continue
-
-                    # Step 3: Determine if the item is new or old
-                    if was_order_created_in_current_month(item):
-                        new_items_count += 1
-                    else:
-                        old_items_count += 1
-
-                    # Step 4: This item is new with available space so append it to items
-                    items.append(item)
-                    available_slots -= 1
 
+        # Step 4: Look up the listings the new orders need in one go
+        listings = await prefetch_listing_details(
+            db,
+            uid,
+            oauth_token,
+            [
+                pairs[index][1].get("Item", {}).get("ItemID")
+                for index in new_indexes[:max(available_slots, 0)]
+            ],
+        )
+
+        # Step 5: Build the new orders concurrently, only starting as many as there are slots left.
+        # If some fail to build, their slots are handed to the next new orders in line.
+        semaphore = asyncio.Semaphore(max_concurrent_new_orders)
+        cutoff = len(pairs)
+        position = 0
+        while position < len(new_indexes) and available_slots > 0:
+            batch = new_indexes[position : position + available_slots]
+            position += len(batch)
+
+            built = await asyncio.gather(
+                *(
+                    build_new_order(semaphore, db, uid, oauth_token, *pairs[index], listings)
+                    for index in batch
+                )
+            )
+
+            for index, item in zip(batch, built):
+                if not item:
+                    continue
+
+                # Step 6: Determine if the item is new or old
+                if was_order_created_in_current_month(item):
+                    new_items_count += 1
                 else:
-                    # Step 5: Handle of the order does exist in the database
-                    item = await handle_modified_order(
-                        order, transaction, db_transaction
-                    )
-                    if item:
-                        # Step 6: This item isn't new so don't increase the order count, but add the item so it gets updated
-                        items.append(item)
-
-                # Step 7: If no more available slots, stop processing
+                    old_items_count += 1
+
+                results[index] = item
+                available_slots -= 1
+
+                # Step 7: If no more available slots, nothing after this order is processed
                 if available_slots <= 0:
-                    return (items, new_items_count, old_items_count, available_slots)
+                    cutoff = index + 1
+
+        # Step 8: Collect the items in the order eBay returned them
+        items = [item for item in results[:cutoff] if item]
 
         return (items, new_items_count, old_items_count, available_slots)
 
@@ -446,12 +763,26 @@ async def process_orders(
         raise error
 
 
+async def build_new_order(
+    semaphore: asyncio.Semaphore,
+    db: FirebaseDB,
+    uid: str,
+    oauth_token: str,
+    order: dict,
+    transaction: dict,
+    listings: dict[str, dict | None] | None = None,
+):
+    async with semaphore:
+        return await handle_new_order(db, uid, oauth_token, order, transaction, listings)
+
+
 async def handle_new_order(
     db: FirebaseDB,
     uid: str,
     oauth_token: str,
     order: dict,
     transaction: dict,
+    listings: dict[str, dict | None] | None = None,
 ):
     try:
         # Order
@@ -473,7 +804,9 @@ async def handle_new_order(
             refund = extract_refund_data(order, is_cancelled)
 
         # Listing
-        listing_data: dict = await get_listing_for_order(db, uid, item_id, oauth_token)
+        listing_data: dict = await get_listing_for_order(
+            db, uid, item_id, oauth_token, listings
+        )
 
         # Shipping
         shipping = extract_shipping_details(
@@ -533,7 +866,7 @@ async def handle_modified_order(
 ) -> dict:
     """
     Compare the existing database transaction to the newly modified order,
-    apply updates if needed, and return the updated order.
+    apply updates if needed, and return the updated order (or None if nothing changed).
     """
     try:
         order_status = order["OrderStatus"]
@@ -587,9 +920,12 @@ async def handle_modified_order(
             updated_order["sale"]["quantity"] = quantity_sold
             changes_found = True
 
-        # Update history and last modified date if anything changed
-        if changes_found:
-            updated_order["lastModified"] = modification_date
+        # Nothing to write if the order hasn't changed
+        if not changes_found:
+            return None
+
+        # Update history and last modified date
+        updated_order["lastModified"] = modification_date
 
         return updated_order
 
@@ -603,23 +939,28 @@ async def get_listing_for_order(
     uid: str,
     item_id: str,
     oauth_token: str,
+    listings: dict[str, dict | None] | None = None,
 ) -> dict:
     """
     Retrieve and format listing data for a given order.
 
-    If listing data is not found in the database, fetch details from eBay.
-    If the order is completed, decrease the listing quantity.
+    Listings already looked up by prefetch_listing_details are used as they are. Otherwise
+    the listing is read from the database, and if it isn't stored the details come from eBay.
 
     Returns:
         A dictionary containing the listing details.
     """
     data = {}
     try:
-        listing_res = await db.retrieve_item(uid, item_id, inventory_key, "ebay")
-        listing_data = listing_res.get("item")
+        if listings is not None and item_id in listings:
+            # Copy it, orders for the same listing share the prefetched entry
+            listing_data = dict(listings[item_id] or {})
+        else:
+            listing_res = await db.retrieve_item(uid, item_id, inventory_key, "ebay")
+            listing_data = listing_res.get("item")
 
-        if not listing_data:
-            listing_data = fetch_listing_details_from_ebay(item_id, oauth_token)
+            if not listing_data:
+                listing_data = await get_listing_details(item_id, oauth_token)
 
         if listing_data:
             purchase_info: dict = listing_data.get("purchase", {})
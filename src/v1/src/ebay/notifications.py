@@ -0,0 +1,281 @@
+# Local Imports
+from ..db_firebase import FirebaseDB, get_db
+from ..constants import (
+    ebay_notification_max_age_minutes,
+    ebay_notification_drain_seconds,
+    ebay_order_notification_events,
+    ebay_listing_notification_events,
+    inventory_key,
+    sale_key,
+    inventory_id_key,
+    sale_id_key,
+)
+from ..handlers import add_and_update_store, update_db
+from ..models import IUser
+from ..utils import (
+    fetch_user_member_sub,
+    fetch_users_limits,
+    fetch_user_inventory_and_orders_count,
+    parse_iso_date,
+)
+from .extract import extract_notification_orders, extract_seller_event_listing
+from .handler import process_orders, process_listings
+from .tokens import ensure_valid_ebay_token
+
+# External Imports
+from datetime import datetime, timezone, timedelta
+from xml.etree import ElementTree
+from dotenv import load_dotenv
+
+import traceback
+import asyncio
+import hashlib
+import base64
+import hmac
+import os
+
+
+load_dotenv()
+
+
+# Notifications waiting to be applied, and the task applying them, started and stopped with the app
+notification_queue: asyncio.Queue | None = None
+notification_worker: asyncio.Task | None = None
+
+
+# --------------------------------------------------- #
+# eBay Notification Parsing                           #
+# --------------------------------------------------- #
+
+
+def strip_namespace(tag: str) -> str:
+    return tag.split("}", 1)[-1]
+
+
+def element_to_dict(element: ElementTree.Element):
+    """
+    Convert an XML element into the same dict shape ebaysdk's response.dict() returns,
+    i.e. attributes are prefixed with "_" and text alongside attributes is stored under "value".
+    """
+    children = list(element)
+    attributes = {f"_{strip_namespace(key)}": value for key, value in element.attrib.items()}
+    text = element.text.strip() if element.text else None
+
+    if not children:
+        if attributes:
+            return {**attributes, "value": text}
+        return text
+
+    data = attributes
+    for child in children:
+        key = strip_namespace(child.tag)
+        value = element_to_dict(child)
+
+        # Repeated elements are collected into a list
+        if key in data:
+            if not isinstance(data[key], list):
+                data[key] = [data[key]]
+            data[key].append(value)
+        else:
+            data[key] = value
+
+    return data
+
+
+def parse_ebay_notification(body: bytes) -> dict | None:
+    """
+    Parse the SOAP envelope of an eBay platform notification.
+    """
+    try:
+        root = ElementTree.fromstring(body)
+
+        signature = None
+        payload = None
+        for element in root.iter():
+            tag = strip_namespace(element.tag)
+            if tag == "NotificationSignature":
+                signature = (element.text or "").strip()
+            elif tag == "Body":
+                children = list(element)
+                payload = element_to_dict(children[0]) if children else None
+
+        if not payload:
+            return None
+
+        return {
+            "signature": signature,
+            "event": payload.get("NotificationEventName"),
+            "timestamp": payload.get("Timestamp"),
+            "recipient": payload.get("RecipientUserID"),
+            "payload": payload,
+        }
+
+    except ElementTree.ParseError:
+        print(traceback.format_exc())
+        return None
+
+
+def verify_ebay_notification_signature(notification: dict) -> bool:
+    """
+    Check the notification was sent by eBay for this application.
+
+    eBay signs each notification with Base64(MD5(Timestamp + DevID + AppID + CertID)),
+    and the timestamp must be recent so old notifications can't be replayed.
+    """
+    signature = notification.get("signature")
+    timestamp = notification.get("timestamp")
+    if not signature or not timestamp:
+        return False
+
+    try:
+        sent_at = parse_iso_date(timestamp)
+    except ValueError:
+        return False
+
+    if abs(datetime.now(timezone.utc) - sent_at) > timedelta(minutes=ebay_notification_max_age_minutes):
+        return False
+
+    raw = f"{timestamp}{os.getenv('DEV_ID')}{os.getenv('CLIENT_ID')}{os.getenv('CLIENT_SECRET')}"
+    expected = base64.b64encode(hashlib.md5(raw.encode("utf-8")).digest()).decode("utf-8")
+
+    return hmac.compare_digest(expected, signature)
+
+
+# --------------------------------------------------- #
+# eBay Notification Processing                        #
+# --------------------------------------------------- #
+
+
+def start_notification_worker():
+    global notification_queue, notification_worker
+
+    if notification_queue is None:
+        notification_queue = asyncio.Queue()
+
+    if notification_worker is None or notification_worker.done():
+        notification_worker = asyncio.create_task(process_notification_queue())
+
+
+async def stop_notification_worker():
+    """
+    Give the worker a moment to apply the notifications already queued, then cancel it.
+    """
+    global notification_queue, notification_worker
+
+    if notification_worker is None:
+        return
+
+    try:
+        await asyncio.wait_for(notification_queue.join(), ebay_notification_drain_seconds)
+    except asyncio.TimeoutError:
+        print(f"stop_notification_worker(): {notification_queue.qsize()} notifications not applied")
+
+    notification_worker.cancel()
+    try:
+        await notification_worker
+    except asyncio.CancelledError:
+        pass
+
+    notification_queue, notification_worker = None, None
+
+
+def notification_worker_running() -> bool:
+    return notification_worker is not None and not notification_worker.done()
+
+
+async def enqueue_ebay_notification(notification: dict):
+    """
+    Queue a verified notification to be applied in the background.
+    """
+    if not notification_worker_running():
+        raise RuntimeError("The notification worker isn't running")
+
+    await notification_queue.put(notification)
+
+
+async def process_notification_queue():
+    while True:
+        notification = await notification_queue.get()
+        try:
+            await apply_ebay_notification(notification, get_db())
+        except Exception:
+            print(traceback.format_exc())
+        finally:
+            notification_queue.task_done()
+
+
+async def apply_ebay_notification(notification: dict, db: FirebaseDB):
+    """
+    Apply a notification using the same processing and database writes as a polled sync.
+    """
+    event = notification.get("event")
+    payload: dict = notification.get("payload", {})
+
+    if event in ebay_order_notification_events:
+        item_type, id_key = sale_key, sale_id_key
+    elif event in ebay_listing_notification_events:
+        item_type, id_key = inventory_key, inventory_id_key
+    else:
+        return
+
+    # Step 1: Find the user the notification is for
+    user_ref = await db.query_user_ref_by_ebay_user_id(notification.get("recipient"))
+    if user_ref is None:
+        print(f"apply_ebay_notification(): No user found for {notification.get('recipient')}")
+        return
+
+    user_snapshot = await user_ref.get()
+    user = add_and_update_store(IUser(**user_snapshot.to_dict()), "ebay")
+
+    # Step 2: Make sure the stored token can still be used, refreshing it if it has expired
+    token_res = await ensure_valid_ebay_token(db, user_ref, user)
+    if not token_res.get("success"):
+        print(f"apply_ebay_notification(): {token_res.get('error')}")
+        return
+    user: IUser = token_res.get("user")
+
+    # Step 3: Calculate the number of item slots the user has left
+    member_subscription = fetch_user_member_sub(user)
+    if not member_subscription:
+        return
+
+    limits: dict = fetch_users_limits(member_subscription.name, item_type)
+    user_count = await fetch_user_inventory_and_orders_count(user, user_ref, db)
+    oauth_token = user.connectedAccounts.ebay.ebayAccessToken
+
+    # Step 4: Process the notification like a page of polled items
+    force_update = False
+    if item_type == sale_key:
+        available_slots = limits["automatic"] - user_count["automaticOrders"]
+        items, new_items_count, old_items_count, _ = await process_orders(
+            extract_notification_orders(payload),
+            db,
+            user.id,
+            oauth_token,
+            0,
+            0,
+            available_slots,
+        )
+    else:
+        available_slots = limits["automatic"] - user_count["automaticListings"]
+        listing = extract_seller_event_listing(payload.get("Item", {}))
+        items, new_items_count, _, force_update = await process_listings(
+            [listing], user, db, available_slots, id_key
+        )
+        old_items_count = 0
+
+    # Step 5: Write the changes, leaving lastFetchedDate alone so the next polled sync doesn't skip anything
+    await update_db(
+        items,
+        new_items_count,
+        old_items_count,
+        None,
+        user,
+        user_ref,
+        db,
+        item_type,
+        "ebay",
+        id_key,
+        force_update,
+        set_last_fetched=False,
+    )
@@ -8,11 +8,39 @@ from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException, Request
 
 import traceback
-import requests
+import asyncio
 import base64
+import httpx
 import os
 
 
+# Shared HTTP client, so token refreshes reuse pooled connections to eBay
+http_client: httpx.AsyncClient | None = None
+
+# Refreshes currently running, keyed by uid, so concurrent callers share a single refresh
+refreshes_in_flight: dict[str, asyncio.Task] = {}
+
+# Tokens refreshed by this process, keyed by uid: (access_token, expiry_timestamp)
+token_cache: dict[str, tuple[str, int]] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
 # --------------------------------------------------- #
 # eBay Token Refresh                                  #
 # --------------------------------------------------- #
@@ -38,47 +66,132 @@ async def check_and_refresh_ebay_token(
                 status_code=401, detail="Unauthorized: No valid token provided"
             )
 
-        # Step 2: Check access token is the same as the one stored in the database
-        if account.ebayAccessToken != token:
+        # Step 2: Check the access token is the one stored in the database, or the one it replaced.
+        # Tokens are refreshed in the background before they expire, so clients may still hold the old one.
+        if not is_current_ebay_token(account, token):
             return HTTPException(
                 status_code=401, detail="Unauthorized: Invalid token provided"
             )
 
-        # Step 3: Check if the token is store as milliseconds (If true convert to seconds)
+        # Step 3: Make sure the token hasn't expired, refreshing it if it has
+        return await ensure_valid_ebay_token(db, user_ref, user)
+    except Exception as e:
+        print(traceback.format_exc())
+        return {"success": False, "error": f"check_and_refresh_ebay_token(): {str(e)}"}
+
+
+def is_current_ebay_token(account: IEbay, token: str) -> bool:
+    if token == account.ebayAccessToken:
+        return True
+
+    previous_expiry = account.ebayPreviousTokenExpiry or 0
+    if len(str(previous_expiry)) > 10:
+        previous_expiry = int(previous_expiry) // 1000
+
+    return (
+        account.ebayPreviousAccessToken is not None
+        and token == account.ebayPreviousAccessToken
+        and previous_expiry > int(datetime.now(timezone.utc).timestamp())
+    )
+
+
+async def ensure_valid_ebay_token(
+    db: FirebaseDB, user_ref: AsyncDocumentReference, user: IUser
+):
+    """
+    Make sure the user's eBay access token is usable, refreshing it if it has expired.
+    Used by anything calling eBay on the user's behalf outside of a request, e.g. notifications.
+    """
+    account = user.connectedAccounts.ebay
+
+    try:
+        # Step 1: Check if the token is store as milliseconds (If true convert to seconds)
         if len(str(account.ebayTokenExpiry)) > 10:
             account.ebayTokenExpiry = (
                 int(account.ebayTokenExpiry) // 1000
             )  # Convert ms to seconds
 
-        # Step 4: Check if the users eBay token has expired
+        # Step 2: Check if the users eBay token has expired
         current_time = datetime.now(timezone.utc)
         current_timestamp = int(current_time.timestamp())
         if account.ebayTokenExpiry > current_timestamp:
             return {"success": True, "user": user}
 
-        # Step 5: Refresh the eBay access token using the refresh token
-        token_data = await refresh_ebay_access_token(
-            account.ebayRefreshToken, os.getenv("CLIENT_ID"), os.getenv("CLIENT_SECRET")
+        # Step 3: Use a token this process has already refreshed, if it hasn't expired
+        cached_token = token_cache.get(user.id)
+        if cached_token and cached_token[1] > current_timestamp:
+            user.connectedAccounts.ebay.ebayAccessToken = cached_token[0]
+            user.connectedAccounts.ebay.ebayTokenExpiry = cached_token[1]
+            return {"success": True, "user": user}
+
+        # Step 4: Refresh the eBay access token, joining a refresh already in flight for this user
+        token_data = await refresh_ebay_token_once(
+            user.id, account.ebayRefreshToken, db, user_ref,
+            (account.ebayAccessToken, account.ebayTokenExpiry),
         )
         if token_data.data is None:
             return {"success": False, "error": token_data.error}
 
-        # Step 6: Store the new token and expiry date in the database
-        await db.update_user_token(user_ref, token_data.data)
-
-        # Step 7: Get the current time and calculate the expiration timestamp
-        expiry_time = current_time + timedelta(seconds=token_data.data.expires_in)
-        expiry_timestamp = int(expiry_time.timestamp())  # Convert to Unix timestamp in seconds
-
-        # Step 8: Update user token data
-        user.connectedAccounts.ebay.ebayAccessToken = token_data.data.access_token
+        # Step 5: Update user token data
+        access_token, expiry_timestamp = token_cache[user.id]
+        user.connectedAccounts.ebay.ebayAccessToken = access_token
         user.connectedAccounts.ebay.ebayRefreshToken = token_data.data.refresh_token
         user.connectedAccounts.ebay.ebayTokenExpiry = expiry_timestamp
 
         return {"success": True, "user": user}
     except Exception as e:
         print(traceback.format_exc())
-        return {"success": False, "error": f"check_and_refresh_ebay_token(): {str(e)}"}
+        return {"success": False, "error": f"ensure_valid_ebay_token(): {str(e)}"}
+
+
+async def refresh_ebay_token_once(
+    uid: str,
+    refresh_token: str,
+    db: FirebaseDB,
+    user_ref: AsyncDocumentReference,
+    previous_token: tuple[str, int] | None = None,
+) -> RefreshEbayTokenData:
+    """
+    Refresh a user's eBay token, collapsing concurrent refreshes for the same user into one.
+    Every caller receives the result of the single refresh, which is written to the database once.
+    previous_token (access_token, expiry_timestamp) is the token being replaced.
+    """
+    task = refreshes_in_flight.get(uid)
+    if task is None:
+        task = asyncio.create_task(
+            refresh_and_store_ebay_token(uid, refresh_token, db, user_ref, previous_token)
+        )
+        refreshes_in_flight[uid] = task
+        task.add_done_callback(lambda _: refreshes_in_flight.pop(uid, None))
+
+    # Shield the shared refresh so a cancelled caller doesn't cancel it for everyone else
+    return await asyncio.shield(task)
+
+
+async def refresh_and_store_ebay_token(
+    uid: str,
+    refresh_token: str,
+    db: FirebaseDB,
+    user_ref: AsyncDocumentReference,
+    previous_token: tuple[str, int] | None = None,
+) -> RefreshEbayTokenData:
+    current_time = datetime.now(timezone.utc)
+
+    # Step 1: Refresh the eBay access token using the refresh token
+    token_data = await refresh_ebay_access_token(
+        refresh_token, os.getenv("CLIENT_ID"), os.getenv("CLIENT_SECRET")
+    )
+    if token_data.data is None:
+        return token_data
+
+    # Step 2: Store the new token and expiry date in the database
+    await db.update_user_token(user_ref, token_data.data, "ebay", previous_token)
+
+    # Step 3: Cache the token until it expires
+    expiry_time = current_time + timedelta(seconds=token_data.data.expires_in)
+    token_cache[uid] = (token_data.data.access_token, int(expiry_time.timestamp()))
+
+    return token_data
 
 
 async def refresh_ebay_access_token(
@@ -101,7 +214,7 @@ async def refresh_ebay_access_token(
 
     try:
         # Make the POST request to eBay's token endpoint
-        response = requests.post(url, headers=headers, data=data)
+        response = await get_http_client().post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             data = response.json()
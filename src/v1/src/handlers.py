@@ -22,12 +22,14 @@ from .utils import (
 from .constants import inventory_key, sale_key
 
 # Depop
-# from .depop.handler import fetch_depop_listings, fetch_depop_orders
+from .depop.handler import fetch_depop_listings, fetch_depop_orders
 
 # eBay
 from .ebay.handler import fetch_ebay_listings, fetch_ebay_orders
 from .ebay.tokens import check_and_refresh_ebay_token
+from .ebay.account import register_ebay_account
 from .stockx.tokens import check_and_refresh_stock_token
+from .token_manager import track_user_token
 
 # External Imports
 from google.cloud.firestore_v1 import AsyncDocumentReference
@@ -39,8 +41,8 @@ import traceback
 fetch_functions = {
     "ebay-inventory": fetch_ebay_listings,
     "ebay-orders": fetch_ebay_orders,
-    #    "depop-inventory": fetch_depop_listings,
-    #    "depop-orders": fetch_depop_orders,
+    "depop-inventory": fetch_depop_listings,
+    "depop-orders": fetch_depop_orders,
 }
 
 
@@ -145,6 +147,10 @@ def add_and_update_store(user: IUser, store_type: StoreType) -> IUser:
     # Ensure offset and lastFetchedDate exist
     if store_meta.lastFetchedDate is None:
         store_meta.lastFetchedDate = ILastFetchedDate(inventory=None, orders=None)
+    if store_meta.lastFullSweep is None:
+        store_meta.lastFullSweep = ILastFetchedDate(inventory=None, orders=None)
+    if store_meta.highWatermark is None:
+        store_meta.highWatermark = ILastFetchedDate(inventory=None, orders=None)
     if store_meta.offset is None:
         store_meta.offset = IOffset(inventory=None, orders=None)
 
@@ -161,11 +167,21 @@ async def handle_store(
     try: 
         match store_type:
             case "ebay":
-                return await check_and_refresh_ebay_token(request, db, user_ref, user)
+                res = await check_and_refresh_ebay_token(request, db, user_ref, user)
             case "stockx": 
-                return await check_and_refresh_stock_token(db, user_ref, user)
+                res = await check_and_refresh_stock_token(db, user_ref, user)
             case _:
                 return {"success": True, "user": user}
+
+        # Hand the token to the background manager so it is refreshed before it next expires
+        if isinstance(res, dict) and res.get("success"):
+            track_user_token(store_type, res.get("user"), user_ref)
+
+            # Newly connected eBay accounts are registered for notifications with their fresh token
+            if store_type == "ebay":
+                res["user"] = await register_ebay_account(db, user_ref, res.get("user"))
+
+        return res
     except Exception as error:
         return {"success": False, "error": error}
 
@@ -211,6 +227,19 @@ async def update_items(
             force_update,
         )
 
+        # Step 5: Record when a full sweep last completed so incremental syncs know when to fall back
+        if res.get("full_sweep"):
+            await db.set_last_full_sweep_date(
+                user_ref,
+                item_type,
+                format_date_to_iso(datetime.now(timezone.utc)),
+                store_type,
+            )
+
+        # Step 6: Store the latest modification time seen, so the next sync knows where it can stop
+        if res.get("watermark"):
+            await db.set_high_watermark(user_ref, item_type, res.get("watermark"), store_type)
+
         return {"success": True}
     except Exception as error:
         print(traceback.format_exc())
@@ -229,6 +258,7 @@ async def update_db(
     store_type: StoreType,
     id_key: IdKey,
     force_update: bool,
+    set_last_fetched: bool = True,
 ):
     try:
         if not items and not force_update:
@@ -239,13 +269,14 @@ async def update_db(
         if not res.get("success"):
             raise Exception(res.get("message"))
 
-        # Step 2: Add the date the items were added
-        await db.set_last_fetched_date(
-            user_ref,
-            item_type,
-            format_date_to_iso(datetime.now(timezone.utc)),
-            store_type,
-        )
+        # Step 2: Add the date the items were added (pushed updates leave the sync cursor untouched)
+        if set_last_fetched:
+            await db.set_last_fetched_date(
+                user_ref,
+                item_type,
+                format_date_to_iso(datetime.now(timezone.utc)),
+                store_type,
+            )
 
         if offset:
             # Step 3: Add offset if it is provided
@@ -7,7 +7,7 @@ CurrencyType = Literal["USD", "GBP", "EUR", "AUD", "CAD"]
 EmailVerification = Literal["unverified", "verifying", "verified"]
 ItemType = Literal["inventory", "orders"]
 IdKey = Literal["transactionId", "itemId"]
-StoreType = Literal["ebay", "shopify", "amazon", "depop"]
+StoreType = Literal["ebay", "shopify", "amazon", "depop", "stockx"]
 OrderStatus = Literal[
     "Active",
     "Cancelled",
@@ -28,6 +28,9 @@ class SuccessOrError(BaseModel):
     success: bool
     error: str
 
+class ProductBatchRequest(BaseModel):
+    urls: List[str]
+
 class RefreshEbayTokenData(BaseModel):
     data: Optional[EbayTokenData]
     error: Optional[str]
@@ -176,6 +179,9 @@ class IEbay(BaseModel):
     ebayAccessToken: str
     ebayRefreshToken: str
     ebayTokenExpiry: int
+    ebayPreviousAccessToken: Optional[str] = None
+    ebayPreviousTokenExpiry: Optional[int] = None
+    ebayUserId: Optional[str] = None
     error: Optional[str] = None
     error_description: Optional[str] = None
 
@@ -183,6 +189,8 @@ class IStockX(BaseModel):
     stockxAccessToken: str
     stockxRefreshToken: str
     stockxTokenExpiry: int
+    stockxPreviousAccessToken: Optional[str] = None
+    stockxPreviousTokenExpiry: Optional[int] = None
     error: Optional[str] = None
     error_description: Optional[str] = None
 
@@ -228,6 +236,8 @@ class INumOrders(BaseModel):
 
 class StoreEntry(BaseModel):
     lastFetchedDate: Optional[ILastFetchedDate] = None
+    lastFullSweep: Optional[ILastFetchedDate] = None
+    highWatermark: Optional[ILastFetchedDate] = None
     offset: Optional[IOffset] = None
 
 class IStore(BaseModel):
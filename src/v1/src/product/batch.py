@@ -0,0 +1,94 @@
+# Local Imports
+from ..constants import product_batch_max_concurrency, product_batch_max_per_domain
+from .cache import canonicalise_url, retrieve_product_data
+from .send_request import ProductFetchError
+
+# External Imports
+from urllib.parse import urlsplit
+from typing import AsyncIterator
+
+import traceback
+import asyncio
+import json
+
+
+# Shared by every batch, so concurrent batches can't flood a marketplace between them
+global_semaphore: asyncio.Semaphore | None = None
+domain_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def get_global_semaphore() -> asyncio.Semaphore:
+    global global_semaphore
+    if global_semaphore is None:
+        global_semaphore = asyncio.Semaphore(product_batch_max_concurrency)
+    return global_semaphore
+
+
+def get_domain_semaphore(domain: str) -> asyncio.Semaphore:
+    semaphore = domain_semaphores.get(domain)
+    if semaphore is None:
+        semaphore = domain_semaphores[domain] = asyncio.Semaphore(product_batch_max_per_domain)
+    return semaphore
+
+
+async def retrieve_product_group(key: str, urls: list[str]) -> list[dict]:
+    """
+    Retrieve one product and return a result for each url which pointed at it.
+    """
+    # Wait for the domain first, so urls queued behind a busy marketplace don't hold global slots
+    try:
+        async with get_domain_semaphore(urlsplit(key).netloc):
+            async with get_global_semaphore():
+                # The key is only used for caching, the first url as given is the one fetched
+                product = await retrieve_product_data(urls[0])
+
+        if product is None:
+            return [
+                {"url": url, "success": False, "error": "Product data could not be retrieved"}
+                for url in urls
+            ]
+        return [{"url": url, "success": True, "product": {**product, "url": url}} for url in urls]
+
+    except ProductFetchError as error:
+        return [
+            {"url": url, "success": False, "error": error.message, "details": error.to_dict()}
+            for url in urls
+        ]
+
+    except Exception as error:
+        print(traceback.format_exc())
+        return [{"url": url, "success": False, "error": str(error)} for url in urls]
+
+
+async def retrieve_products(urls: list[str]) -> AsyncIterator[dict]:
+    """
+    Retrieve many products concurrently, yielding each url's result as soon as it is ready.
+
+    Urls which canonicalise to the same product are only fetched once.
+    """
+    groups: dict[str, list[str]] = {}
+    for url in dict.fromkeys(urls):
+        try:
+            groups.setdefault(canonicalise_url(url), []).append(url)
+        except ValueError:
+            yield {"url": url, "success": False, "error": "Invalid url"}
+
+    tasks = [asyncio.create_task(retrieve_product_group(key, group)) for key, group in groups.items()]
+    try:
+        for task in asyncio.as_completed(tasks):
+            for result in await task:
+                yield result
+    finally:
+        # The client may have disconnected part way through
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def stream_product_results(urls: list[str]) -> AsyncIterator[str]:
+    """
+    The results of retrieve_products as NDJSON, one line per url written as each one completes.
+    Failed urls get a line with success False and the error, rather than ending the stream.
+    """
+    async for result in retrieve_products(urls):
+        yield json.dumps(result) + "\n"
@@ -0,0 +1,177 @@
+# Local Imports
+from ..cache import TTLCache
+from ..constants import (
+    product_cache_size,
+    product_cache_fresh_seconds,
+    product_cache_max_stale_seconds,
+    product_tracking_params,
+    product_tracking_param_prefixes,
+    product_negative_cache_size,
+    product_negative_cache_seconds,
+    PRODUCT_CACHE_PATH,
+)
+from .extract import extract_meta, parse_product_data
+from .send_request import fetch_page, ProductFetchError
+
+# External Imports
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import traceback
+import asyncio
+import time
+
+
+# Entries are kept until they are too stale to serve, freshness is checked against "fetchedAt"
+product_cache = TTLCache(
+    product_cache_size,
+    product_cache_max_stale_seconds,
+    PRODUCT_CACHE_PATH,
+    table="products",
+)
+
+# Recent failures, so a url which just failed gets the same error back instead of another request
+negative_cache = TTLCache(product_negative_cache_size, product_negative_cache_seconds)
+
+# Fetches currently running, keyed by canonical url, so concurrent callers share a single fetch and parse
+fetches_in_flight: dict[str, asyncio.Task] = {}
+
+
+def canonicalise_url(url: str) -> str:
+    """
+    Normalise a product url so the same product is cached once, however the link was shared.
+    """
+    parts = urlsplit(url.strip())
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in product_tracking_params
+        and not key.lower().startswith(product_tracking_param_prefixes)
+    )
+
+    return urlunsplit(
+        (
+            parts.scheme.lower() or "https",
+            parts.netloc.lower(),
+            parts.path or "/",
+            urlencode(query),
+            "",
+        )
+    )
+
+
+async def retrieve_product_data(url: str) -> dict | None:
+    """
+    Return the product data for a url, from the cache where possible.
+
+    Fresh entries are returned as they are. Stale entries are returned straight away and
+    revalidated in the background, and missing entries are fetched.
+
+    Raises a ProductFetchError if the page couldn't be fetched, or failed within the last
+    product_negative_cache_seconds.
+    """
+    key = canonicalise_url(url)
+    entry: dict | None = await product_cache.aget(key)
+
+    if entry is None:
+        failure = negative_cache.get(key)
+        if failure is not None:
+            raise ProductFetchError.from_dict(failure)
+
+        # Shield the shared fetch so a cancelled caller doesn't cancel it for everyone else
+        entry = await asyncio.shield(fetch_product_entry_once(key, url))
+        if entry is None:
+            return None
+
+    elif time.time() - entry.get("fetchedAt", 0) > product_cache_fresh_seconds:
+        # Revalidate in the background, unless a fetch for this url is already running
+        fetch_product_entry_once(key, url, entry)
+
+    # The entry is shared by every link to this product, so return the url that was asked for
+    return {**entry["data"], "url": url}
+
+
+def fetch_product_entry_once(key: str, url: str, entry: dict | None = None) -> asyncio.Task:
+    """
+    Return the running fetch for a canonical url, starting one for url if there isn't one.
+    """
+    task = fetches_in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(load_product_entry(key, url, entry))
+        fetches_in_flight[key] = task
+        task.add_done_callback(lambda done: forget_fetch(key, done))
+    return task
+
+
+def forget_fetch(key: str, task: asyncio.Task):
+    fetches_in_flight.pop(key, None)
+    # Every waiter may have been cancelled, mark the error as retrieved so it isn't logged as unhandled
+    if not task.cancelled():
+        task.exception()
+
+
+async def load_product_entry(key: str, url: str, entry: dict | None = None) -> dict | None:
+    try:
+        return await refresh_product_data(key, url, entry)
+
+    except ProductFetchError as error:
+        if entry is not None:
+            # A failed background refresh keeps serving the stale entry until it expires. The
+            # error is still raised, for a caller which found the entry gone and joined this fetch
+            print(f"load_product_entry(): {error.message}")
+            raise
+
+        # An open breaker already answers quickly, it isn't the url's fault
+        if error.code != "circuit_open":
+            negative_cache.set(key, error.to_dict())
+        raise
+
+
+async def refresh_product_data(key: str, url: str, entry: dict | None = None) -> dict | None:
+    """
+    Fetch and parse a product page and cache the result under its canonical url (key).
+
+    The url as it was given is fetched, since some sites need the parameters canonicalising drops.
+
+    If there is a cached entry the request is conditional, and a 304 just renews that entry.
+    Fetch failures are raised as a ProductFetchError.
+    """
+    try:
+        entry = entry or {}
+        page = await fetch_page(
+            url,
+            head_only=True,
+            etag=entry.get("etag"),
+            last_modified=entry.get("lastModified"),
+        )
+        if page is None:
+            return None
+
+        # Step 1: Build the new entry, reusing the cached data if the page hasn't changed
+        if page["not_modified"] and entry.get("data"):
+            data = entry["data"]
+        elif page["html"]:
+            meta = extract_meta(page["html"])
+            if not meta:
+                return None
+            data = parse_product_data(meta, url)
+        else:
+            return None
+
+        new_entry = {
+            "data": data,
+            "etag": page.get("etag"),
+            "lastModified": page.get("last_modified"),
+            "fetchedAt": time.time(),
+        }
+
+        # Step 2: Cache the entry
+        await product_cache.aset(key, new_entry)
+        return new_entry
+
+    except ProductFetchError:
+        raise
+
+    except Exception:
+        print(traceback.format_exc())
+        return None
@@ -0,0 +1,131 @@
+# Local Imports
+from ..constants import (
+    product_breaker_window_seconds,
+    product_breaker_min_requests,
+    product_breaker_failure_rate,
+    product_breaker_open_seconds,
+    product_breaker_half_open_probes,
+)
+
+# External Imports
+from collections import deque
+from typing import Literal
+
+import time
+
+
+BreakerState = Literal["closed", "open", "half-open"]
+
+
+class CircuitBreaker:
+    """
+    Tracks how requests to one domain are going, and stops sending them while it is failing.
+
+    closed: requests go through, and the breaker opens if too many in the recent window failed.
+    open: requests are refused straight away until the cooldown has passed.
+    half-open: a few probe requests go through, one success closes the breaker and a failure reopens it.
+    """
+
+    def __init__(self, domain: str) -> None:
+        self.domain = domain
+        self.state: BreakerState = "closed"
+        self.opened_at: float | None = None
+        self.probes_in_flight = 0
+
+        # (time, failed) for each request in the recent window
+        self.outcomes: deque[tuple[float, bool]] = deque()
+        self.total_requests = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    def allow_request(self) -> bool:
+        now = time.monotonic()
+
+        if self.state == "open":
+            if now - self.opened_at < product_breaker_open_seconds:
+                self.total_rejected += 1
+                return False
+            self.state = "half-open"
+
+        if self.state == "half-open":
+            if self.probes_in_flight >= product_breaker_half_open_probes:
+                self.total_rejected += 1
+                return False
+            self.probes_in_flight += 1
+
+        return True
+
+    def retry_after(self) -> int:
+        if self.state != "open":
+            return 0
+        return max(1, int(product_breaker_open_seconds - (time.monotonic() - self.opened_at)))
+
+    def record_success(self):
+        self._record(False)
+        if self.state == "half-open":
+            self.state = "closed"
+            self.probes_in_flight = 0
+            self.outcomes.clear()
+
+    def record_failure(self):
+        self._record(True)
+        if self.state == "half-open":
+            self._open()
+        elif self.state == "closed" and self._should_open():
+            self._open()
+
+    def record_cancelled(self):
+        """A request which was abandoned before it finished counts as neither."""
+        if self.state == "half-open":
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def metrics(self) -> dict:
+        self._trim(time.monotonic())
+        failures = sum(1 for _, failed in self.outcomes if failed)
+        return {
+            "state": self.state,
+            "windowRequests": len(self.outcomes),
+            "windowFailures": failures,
+            "failureRate": failures / len(self.outcomes) if self.outcomes else 0.0,
+            "retryAfter": self.retry_after(),
+            "totalRequests": self.total_requests,
+            "totalFailures": self.total_failures,
+            "totalRejected": self.total_rejected,
+        }
+
+    def _record(self, failed: bool):
+        now = time.monotonic()
+        self.outcomes.append((now, failed))
+        self._trim(now)
+        self.total_requests += 1
+        self.total_failures += failed
+
+    def _trim(self, now: float):
+        while self.outcomes and now - self.outcomes[0][0] > product_breaker_window_seconds:
+            self.outcomes.popleft()
+
+    def _should_open(self) -> bool:
+        if len(self.outcomes) < product_breaker_min_requests:
+            return False
+        failures = sum(1 for _, failed in self.outcomes if failed)
+        return failures / len(self.outcomes) >= product_breaker_failure_rate
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+
+
+# One breaker per domain
+circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(domain: str) -> CircuitBreaker:
+    breaker = circuit_breakers.get(domain)
+    if breaker is None:
+        breaker = circuit_breakers[domain] = CircuitBreaker(domain)
+    return breaker
+
+
+def circuit_breaker_metrics() -> dict[str, dict]:
+    return {domain: breaker.metrics() for domain, breaker in circuit_breakers.items()}
@@ -1,39 +1,179 @@
+# Local Imports
+from ..constants import product_head_max_bytes, product_domain_cache_size
+from .marketplaces import marketplace_extractors, find_json_ld_product
+
 # External Imports
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from functools import lru_cache
 
 import tldextract
+import json
+
+
+# Reads the public suffix list snapshot bundled with tldextract, rather than downloading it on first use
+domain_extractor = tldextract.TLDExtract(
+    suffix_list_urls=(), cache_dir=None, fallback_to_snapshot=True
+)
+
+
+class HeadFinished(Exception):
+    pass
+
+
+class HeadMetaParser(HTMLParser):
+    """
+    Collects the <title>, <meta> tags and JSON-LD blocks of a page, stopping at the end of the <head>.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: dict = {}
+        self.json_ld: list = []
+        self._in_title = False
+        self._in_json_ld = False
+        self._buffer: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list):
+        if tag == "body":
+            raise HeadFinished()
+
+        if tag == "title" and "title" not in self.meta:
+            self._in_title, self._buffer = True, []
 
+        elif tag == "meta":
+            attributes = dict(attrs)
+            # Determine key: prefer property over name
+            key = attributes.get("property") or attributes.get("name")
+            content = attributes.get("content")
+            if key and content and content.strip():
+                self.meta[key.strip()] = content.strip()
 
-def extract_meta(html: BeautifulSoup) -> dict:
-    meta = {}
+        elif tag == "script" and (dict(attrs).get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld, self._buffer = True, []
 
-    # 1. Page title
-    title_tag = html.find('title')
-    if title_tag and title_tag.string:
-        meta['title'] = title_tag.string.strip()
+    def handle_data(self, data: str):
+        if self._in_title or self._in_json_ld:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag: str):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            title = "".join(self._buffer).strip()
+            if title:
+                self.meta["title"] = title
+
+        elif tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            try:
+                block = json.loads("".join(self._buffer))
+            except ValueError:
+                return
+            self.json_ld.extend(block if isinstance(block, list) else [block])
+
+        elif tag == "head":
+            raise HeadFinished()
+
+
+def extract_meta(html: str, max_bytes: int = product_head_max_bytes) -> dict:
+    """
+    Read the page's metadata in a single pass over the <head>, without parsing the rest of the page.
+
+    At most max_bytes of the page (as UTF-8) are parsed.
+    """
+    parser = HeadMetaParser()
+    chunk_size = 16 * 1024
+    remaining = max_bytes
+
+    try:
+        for i in range(0, len(html), chunk_size):
+            chunk = html[i : i + chunk_size]
+            encoded = chunk.encode("utf-8", errors="replace")
+            if len(encoded) > remaining:
+                # Cut the last chunk on a character boundary
+                chunk = encoded[:remaining].decode("utf-8", errors="ignore")
+
+            parser.feed(chunk)
+            remaining -= len(encoded)
+            if remaining <= 0:
+                break
+    except HeadFinished:
+        pass
 
-    # 2. All <meta> tags
-    for tag in html.find_all('meta'):
-        # Determine key: prefer property over name
-        key = tag.get('property') or tag.get('name')
-        if not key:
-            continue
-        content = tag.get('content')
-        if not content:
-            continue
-        meta[key.strip()] = content.strip()
+    meta = parser.meta
+    if parser.json_ld:
+        meta["json-ld"] = parser.json_ld
 
     return meta
 
 
 def parse_product_data(meta: dict, url: str) -> dict:
+    marketplace = extract_domain_name(url)
+
+    # Known marketplaces read the fields they provide, anything else uses the generic path
+    extractor = marketplace_extractors.get(marketplace)
+    if extractor is None:
+        return parse_generic_product_data(meta, url, marketplace)
+
+    data = extractor.extract(meta, url, marketplace)
+    if not data["title"]:
+        return parse_generic_product_data(meta, url, marketplace)
+
+    # The extractors read every generic title, description and image source, only the price has
+    # generic sources they don't (e.g. a twitter:data price)
+    if data["price"] is None:
+        data["price"] = extract_generic_price(meta, find_json_ld_product(meta) or {})
+
+    return data
+
+
+def parse_generic_product_data(meta: dict, url: str, marketplace: str) -> dict:
+    # Structured product data, used where the meta tags are missing
+    product = find_json_ld_product(meta) or {}
+
     # Title: prefer Open Graph, fallback to title tag
-    title = meta.get('og:title') or meta.get('title')
+    title = meta.get('og:title') or product.get('name') or meta.get('title')
 
     # Description: prefer Open Graph, fallback to meta description
-    description = meta.get('og:description') or meta.get('description')
+    description = meta.get('og:description') or meta.get('description') or product.get('description')
+
+    price = extract_generic_price(meta, product)
+
+    # Images: collect og:image and twitter:image
+    image = []
+    if 'og:image' in meta:
+        image.append(meta['og:image'])
+    if 'twitter:image' in meta and meta['twitter:image'] not in image:
+        image.append(meta['twitter:image'])
+    # Fallback to any image tags in meta dict
+    for key, val in meta.items():
+        if key.startswith('og:image:') and val not in image:
+            image.append(val)
+
+    # JSON-LD images can be a single url or a list of them
+    json_ld_images = product.get('image') or []
+    for val in json_ld_images if isinstance(json_ld_images, list) else [json_ld_images]:
+        if isinstance(val, str) and val not in image:
+            image.append(val)
+
+    image = list(set(image))
+    
+
+    return {
+        "title": title,
+        "description": description,
+        "url": url,
+        "image": image,
+        "price": price,
+        "marketplace": marketplace
+    }
+
+
+def extract_generic_price(meta: dict, product: dict) -> dict | None:
+    offers = product.get('offers') or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers and isinstance(offers[0], dict) else {}
 
-    # Price
     price = None
     price_amount = meta.get('product:price:amount') or meta.get('og:price:amount')
     price_currency = meta.get('product:price:currency') or meta.get('og:price:currency')
@@ -61,30 +201,22 @@ def parse_product_data(meta: dict, url: str) -> dict:
                 price = {'amount': amt_val, 'currency': currency}
                 break
 
-    # Images: collect og:image and twitter:image
-    image = []
-    if 'og:image' in meta:
-        image.append(meta['og:image'])
-    if 'twitter:image' in meta and meta['twitter:image'] not in image:
-        image.append(meta['twitter:image'])
-    # Fallback to any image tags in meta dict
-    for key, val in meta.items():
-        if key.startswith('og:image:') and val not in image:
-            image.append(val)
-
-    image = list(set(image))
-    
+    if price is None and offers.get('price') is not None:
+        try:
+            price = {'amount': float(offers['price']), 'currency': offers.get('priceCurrency')}
+        except (TypeError, ValueError):
+            price = {'amount': offers['price'], 'currency': offers.get('priceCurrency')}
 
-    return {
-        "title": title,
-        "description": description,
-        "url": url,
-        "image": image,
-        "price": price,
-        "marketplace": extract_domain_name(url)
-    }
+    return price
 
 
 def extract_domain_name(url: str) -> str:
-    ext = tldextract.extract(url)
-    return ext.domain
\ No newline at end of file
+    # hostname drops any port or user info and is lowercase, a url without a scheme is read as host/path
+    host = urlsplit(url).hostname or urlsplit(f"//{url}").hostname or ""
+    return extract_host_domain(host)
+
+
+@lru_cache(maxsize=product_domain_cache_size)
+def extract_host_domain(host: str) -> str:
+    ext = domain_extractor(host)
+    return ext.domain
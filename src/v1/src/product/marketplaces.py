@@ -0,0 +1,163 @@
+# External Imports
+from typing import Callable
+
+
+def find_json_ld_product(meta: dict) -> dict | None:
+    for block in meta.get("json-ld", []):
+        if not isinstance(block, dict):
+            continue
+
+        # Products are sometimes nested inside an @graph
+        candidates = block.get("@graph") if isinstance(block.get("@graph"), list) else [block]
+        for candidate in candidates:
+            if not isinstance(candidate, dict):
+                continue
+            types = candidate.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if "Product" in types:
+                return candidate
+
+    return None
+
+
+def compile_json_ld_path(path: str) -> Callable[[dict], object]:
+    """
+    Turn a dotted path such as "offers.price" into a function reading it from a JSON-LD Product.
+    Lists along the way (e.g. several offers) resolve to their first entry.
+    """
+    keys = tuple(path.split("."))
+
+    def read(product: dict):
+        value = product
+        for key in keys:
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return read
+
+
+def parse_price_amount(amount):
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return amount
+
+
+class MarketplaceExtractor:
+    """
+    Reads one marketplace's product fields from its page metadata.
+
+    Each field has an ordered list of meta keys and JSON-LD paths, and the first one present is
+    used, so only the fields that marketplace is known to provide are looked at.
+    """
+
+    def __init__(
+        self,
+        title: list[str],
+        description: list[str],
+        price: list[str],
+        currency: list[str],
+        image: list[str],
+    ) -> None:
+        self.fields = {
+            "title": [self._compile(source) for source in title],
+            "description": [self._compile(source) for source in description],
+            "price": [self._compile(source) for source in price],
+            "currency": [self._compile(source) for source in currency],
+            "image": [self._compile(source) for source in image],
+        }
+
+    @staticmethod
+    def _compile(source: str) -> tuple[str, object]:
+        # "ld:" sources are JSON-LD paths, anything else is a meta key
+        if source.startswith("ld:"):
+            return "ld", compile_json_ld_path(source[3:])
+        return "meta", source
+
+    def _first(self, field: str, meta: dict, product: dict):
+        for kind, source in self.fields[field]:
+            value = meta.get(source) if kind == "meta" else source(product)
+            # A price of 0 is still a price
+            if value is not None and value != "":
+                return value
+        return None
+
+    def extract(self, meta: dict, url: str, marketplace: str) -> dict:
+        product = find_json_ld_product(meta) or {}
+
+        price = None
+        amount = self._first("price", meta, product)
+        if amount is not None:
+            price = {
+                "amount": parse_price_amount(amount),
+                "currency": self._first("currency", meta, product),
+            }
+
+        # Every image source is collected, JSON-LD can give a single url or a list of them
+        image = []
+        for kind, source in self.fields["image"]:
+            value = meta.get(source) if kind == "meta" else source(product)
+            for val in value if isinstance(value, list) else [value]:
+                if isinstance(val, str) and val and val not in image:
+                    image.append(val)
+
+        return {
+            "title": self._first("title", meta, product),
+            "description": self._first("description", meta, product),
+            "url": url,
+            "image": image,
+            "price": price,
+            "marketplace": marketplace,
+        }
+
+
+# Extractors keyed by the marketplace's registered domain name (e.g. "ebay" for ebay.co.uk and ebay.com)
+marketplace_extractors: dict[str, MarketplaceExtractor] = {
+    "ebay": MarketplaceExtractor(
+        title=["og:title", "ld:name", "title"],
+        description=["og:description", "ld:description", "description"],
+        price=["ld:offers.price", "product:price:amount", "og:price:amount"],
+        currency=["ld:offers.priceCurrency", "product:price:currency", "og:price:currency"],
+        image=["og:image", "og:image:secure_url", "og:image:url", "ld:image", "twitter:image"],
+    ),
+    "depop": MarketplaceExtractor(
+        title=["og:title", "ld:name", "title"],
+        description=["og:description", "ld:description", "description"],
+        price=["product:price:amount", "og:price:amount", "ld:offers.price"],
+        currency=["product:price:currency", "og:price:currency", "ld:offers.priceCurrency"],
+        image=["og:image", "og:image:secure_url", "og:image:url", "ld:image", "twitter:image"],
+    ),
+    "vinted": MarketplaceExtractor(
+        title=["og:title", "ld:name", "title"],
+        description=["og:description", "ld:description", "description"],
+        price=["ld:offers.price", "product:price:amount", "og:price:amount"],
+        currency=["ld:offers.priceCurrency", "product:price:currency", "og:price:currency"],
+        image=["og:image", "og:image:secure_url", "og:image:url", "ld:image", "twitter:image"],
+    ),
+    "stockx": MarketplaceExtractor(
+        title=["ld:name", "og:title", "title"],
+        description=["ld:description", "og:description", "description"],
+        # Listings are an AggregateOffer, the lowest ask is the price to buy now
+        price=["ld:offers.lowPrice", "ld:offers.price", "og:price:amount"],
+        currency=["ld:offers.priceCurrency", "og:price:currency"],
+        image=["ld:image", "og:image", "og:image:secure_url", "og:image:url", "twitter:image"],
+    ),
+    "etsy": MarketplaceExtractor(
+        title=["og:title", "ld:name", "title"],
+        description=["og:description", "ld:description", "description"],
+        price=["product:price:amount", "og:price:amount", "ld:offers.price", "ld:offers.lowPrice"],
+        currency=["product:price:currency", "og:price:currency", "ld:offers.priceCurrency"],
+        image=["og:image", "og:image:secure_url", "og:image:url", "ld:image", "twitter:image"],
+    ),
+    "grailed": MarketplaceExtractor(
+        title=["og:title", "ld:name", "title"],
+        description=["og:description", "ld:description", "description"],
+        price=["ld:offers.price", "product:price:amount", "og:price:amount"],
+        currency=["ld:offers.priceCurrency", "product:price:currency", "og:price:currency"],
+        image=["og:image", "og:image:secure_url", "og:image:url", "ld:image", "twitter:image"],
+    ),
+}
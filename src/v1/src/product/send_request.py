@@ -1,11 +1,22 @@
 # Local Imports
-from .tls_client import Session
+from ..constants import (
+    product_client_identifier,
+    product_request_timeout_seconds,
+    product_head_max_bytes,
+    product_range_retry_seconds,
+    product_breaker_failure_statuses,
+)
+from .circuit_breaker import get_circuit_breaker
+from .session_pool import session_pool
 
 # External Imports
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
 import traceback
+import mimetypes
+import codecs
+import asyncio
+import time
 import ssl
 
 HEADERS = {
@@ -15,26 +26,207 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
 
-def http_request(url: str):
+# domain -> when it last answered a range request with the whole page
+ranges_ignored: dict[str, float] = {}
+
+
+class ProductFetchError(Exception):
+    """
+    A product page couldn't be fetched, with enough detail to return a structured error.
+    """
+
+    def __init__(
+        self, code: str, message: str, domain: str, status: int | None = None, retry_after: int = 0
+    ) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.domain = domain
+        self.status = status
+        self.retry_after = retry_after
+
+    def to_dict(self) -> dict:
+        return {
+            "code": self.code,
+            "message": self.message,
+            "domain": self.domain,
+            "status": self.status,
+            "retryAfter": self.retry_after,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProductFetchError":
+        return cls(data["code"], data["message"], data["domain"], data.get("status"), data.get("retryAfter", 0))
+
+
+async def http_request(url: str, head_only: bool = False):
+    """
+    Fetch a page's HTML.
+
+    With head_only, only the start of the page is wanted (metadata lives in the <head>), so
+    servers which support ranges are asked for just those bytes, uncompressed so the partial body
+    can be decoded. A domain which ignores the range is remembered and sent compressed requests for
+    the whole page instead. Urls whose extension isn't a page are skipped without a request, and
+    only the first product_head_max_bytes of the body are parsed.
+    """
     try:
-        headers = {**HEADERS, "Referer": get_root(url)}
+        page = await fetch_page(url, head_only)
+    except ProductFetchError:
+        return None
+    return page.get("html") if page else None
 
-        session = Session(
-            client_identifier="chrome112", random_tls_extension_order=True
+
+async def fetch_page(
+    url: str,
+    head_only: bool = False,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> dict | None:
+    """
+    Fetch a page, returning its HTML along with the validators needed to revalidate it later.
+
+    If an etag or last_modified from an earlier fetch is given the request is conditional, and
+    "not_modified" is True when the server confirms the earlier copy is still current.
+
+    Raises a ProductFetchError if the page can't be fetched, straight away if the domain's
+    circuit breaker is open.
+    """
+    domain = urlparse(url).netloc.lower()
+    breaker = get_circuit_breaker(domain)
+
+    # Step 0: Links straight to an image, PDF etc. have nothing to parse
+    if head_only and not is_html_url(url):
+        print(f"fetch_page(): Skipping {url}, it doesn't link to a page")
+        return None
+
+    # Step 1: Don't send anything to a domain which is currently failing
+    if not breaker.allow_request():
+        raise ProductFetchError(
+            "circuit_open",
+            f"Requests to {domain} are paused after repeated failures",
+            domain,
+            retry_after=breaker.retry_after(),
         )
 
-        response = session.get(url, headers=headers)
+    try:
+        headers = {**HEADERS, "Referer": get_root(url)}
+        ranged = head_only and supports_ranges(domain)
+        if head_only:
+            headers["Accept"] = "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1"
+        if ranged:
+            headers["Range"] = f"bytes=0-{product_head_max_bytes - 1}"
+            # A range of a compressed body is a truncated stream which can't be decompressed
+            headers["Accept-Encoding"] = "identity"
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
 
-        if response.status_code != 200:
-            raise Exception(
-                f"Response returned {response.status_code} | {response.content}"
+        # Step 2: Reuse a warm session for this domain rather than handshaking on every request
+        with session_pool.session(url, product_client_identifier) as session:
+            response = await session.aget(
+                url, headers=headers, timeout=product_request_timeout_seconds
             )
 
-        return BeautifulSoup(response.text, "lxml")
+    except asyncio.CancelledError:
+        breaker.record_cancelled()
+        raise
 
-    except Exception:
+    except Exception as error:
+        # Timeouts and connection errors count against the domain
         print(traceback.format_exc())
+        breaker.record_failure()
+        raise ProductFetchError("upstream_error", f"Request to {domain} failed: {error}", domain)
+
+    # Step 3: Blocking and server errors count against the domain, anything else means it is responding
+    if response.status_code in product_breaker_failure_statuses:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+    page = {
+        "html": None,
+        "not_modified": response.status_code == 304,
+        "etag": get_header(response.headers, "etag") or etag,
+        "last_modified": get_header(response.headers, "last-modified") or last_modified,
+    }
+    if page["not_modified"]:
+        return page
+
+    # The product has been removed, which isn't the marketplace failing
+    if response.status_code in (404, 410):
+        raise ProductFetchError(
+            "not_found",
+            f"{domain} has no page at this url (status {response.status_code})",
+            domain,
+            status=response.status_code,
+        )
+
+    # 206 is a server honouring the range
+    if response.status_code not in (200, 206):
+        raise ProductFetchError(
+            "upstream_status",
+            f"{domain} responded with status {response.status_code}",
+            domain,
+            status=response.status_code,
+        )
+
+    if not head_only:
+        page["html"] = response.text
+        return page
+
+    # A whole page sent uncompressed in reply to a range, later requests keep compression instead
+    if ranged and response.status_code == 200:
+        ranges_ignored[domain] = time.monotonic()
+    elif response.status_code == 206:
+        ranges_ignored.pop(domain, None)
+
+    content_type = get_content_type(response.headers)
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        print(f"fetch_page(): Skipping {url}, content type {content_type} isn't HTML")
+        return None
+
+    # Only the start of the page is parsed, cut in bytes before it is decoded
+    body = (response.content or b"")[:product_head_max_bytes]
+    page["html"] = body.decode(get_charset(response.headers) or "utf-8", errors="ignore")
+    return page
+
+
+def supports_ranges(domain: str) -> bool:
+    ignored_at = ranges_ignored.get(domain)
+    return ignored_at is None or time.monotonic() - ignored_at > product_range_retry_seconds
+
+
+def is_html_url(url: str) -> bool:
+    # Urls without an extension, or with .php etc., are assumed to be pages
+    content_type, _ = mimetypes.guess_type(urlparse(url).path)
+    return content_type is None or content_type in HTML_CONTENT_TYPES
+
+
+def get_header(headers: dict, name: str) -> str | None:
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value[0] if isinstance(value, list) else value
+    return None
+
+
+def get_content_type(headers: dict) -> str | None:
+    content_type = get_header(headers, "content-type")
+    return content_type.split(";")[0].strip().lower() if content_type else None
+
+
+def get_charset(headers: dict) -> str | None:
+    content_type = get_header(headers, "content-type") or ""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            try:
+                return codecs.lookup(value.strip().strip('"')).name
+            except LookupError:
+                return None
+    return None
 
 
 def make_ssl_context():
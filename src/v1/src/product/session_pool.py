@@ -0,0 +1,135 @@
+# Local Imports
+from ..constants import (
+    product_session_pool_max_size,
+    product_session_pool_max_per_key,
+    product_session_idle_seconds,
+    product_session_max_age_seconds,
+    product_session_max_requests,
+)
+from .tls_client import AsyncSession
+
+# External Imports
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import traceback
+import threading
+import time
+
+
+class PooledSession:
+    """A tls_client session along with the details used to decide if it can be reused."""
+
+    def __init__(self, key: tuple[str, str], session: AsyncSession) -> None:
+        self.key = key
+        self.session = session
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.request_count = 0
+
+    def is_healthy(self, now: float) -> bool:
+        return (
+            now - self.created_at < product_session_max_age_seconds
+            and now - self.last_used < product_session_idle_seconds
+            and self.request_count < product_session_max_requests
+        )
+
+
+class SessionPool:
+    """
+    Reusable tls_client sessions keyed by domain and client identifier.
+
+    Each session keeps its Go-side connections open, so requests to a domain which was
+    requested recently skip the TCP and TLS handshake. A session is only used by one request
+    at a time. Idle, old or failed sessions are closed, which destroys the native session on the
+    executor once no request is running on it.
+    """
+
+    def __init__(self, max_size: int, max_per_key: int) -> None:
+        self.max_size = max_size
+        self.max_per_key = max_per_key
+
+        # Idle sessions, least recently used first
+        self._idle: OrderedDict[int, PooledSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str, client_identifier: str) -> PooledSession:
+        key = (urlparse(url).netloc.lower(), client_identifier)
+        now = time.monotonic()
+
+        with self._lock:
+            expired = self._evict_unhealthy(now)
+
+            # Use the most recently used idle session for this key, as it is the most likely to be warm
+            pooled = None
+            for session_id in reversed(self._idle):
+                if self._idle[session_id].key == key:
+                    pooled = self._idle.pop(session_id)
+                    break
+
+        self._close(expired)
+
+        if pooled is None:
+            pooled = PooledSession(
+                key,
+                AsyncSession(client_identifier=client_identifier, random_tls_extension_order=True),
+            )
+        return pooled
+
+    def release(self, pooled: PooledSession, healthy: bool = True):
+        now = time.monotonic()
+        pooled.last_used = now
+        pooled.request_count += 1
+
+        if not (healthy and pooled.is_healthy(now)):
+            self._close([pooled])
+            return
+
+        with self._lock:
+            self._idle[id(pooled)] = pooled
+
+            # Keep within the per key and overall limits, closing the least recently used first
+            same_key = [sid for sid, idle in self._idle.items() if idle.key == pooled.key]
+            evicted = [self._idle.pop(sid) for sid in same_key[: -self.max_per_key]]
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.popitem(last=False)[1])
+
+        self._close(evicted)
+
+    @contextmanager
+    def session(self, url: str, client_identifier: str):
+        """
+        Check a session out for the duration of a request, discarding it if the request fails.
+
+        A request which timed out or was cancelled may still be running on the executor, so the
+        session is discarded and only destroyed once that request finishes.
+        """
+        pooled = self.acquire(url, client_identifier)
+        healthy = False
+        try:
+            yield pooled.session
+            healthy = True
+        finally:
+            self.release(pooled, healthy)
+
+    def close_idle(self):
+        """Close every idle session, e.g. on shutdown."""
+        with self._lock:
+            idle = list(self._idle.values())
+            self._idle.clear()
+        self._close(idle)
+
+    def _evict_unhealthy(self, now: float) -> list[PooledSession]:
+        expired = [sid for sid, idle in self._idle.items() if not idle.is_healthy(now)]
+        return [self._idle.pop(sid) for sid in expired]
+
+    def _close(self, sessions: list[PooledSession]):
+        for pooled in sessions:
+            try:
+                pooled.session.close_when_idle()
+            except Exception:
+                print(traceback.format_exc())
+
+
+session_pool = SessionPool(product_session_pool_max_size, product_session_pool_max_per_key)
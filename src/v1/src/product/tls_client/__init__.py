@@ -12,4 +12,5 @@
 # tls-client: https://github.com/bogdanfinn/tls-client
 # requests: https://github.com/psf/requests
 
-from .sessions import Session
\ No newline at end of file
+from .sessions import Session
+from .async_sessions import AsyncSession
@@ -0,0 +1,159 @@
+from .response import Response
+from .sessions import Session
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Optional, Union
+import traceback
+import threading
+import asyncio
+import math
+import os
+
+# The native request call blocks its thread (ctypes releases the GIL while Go does the work), so
+# requests get their own threads rather than sharing the event loop's default executor.
+DEFAULT_MAX_WORKERS = int(os.getenv("TLS_CLIENT_MAX_WORKERS", 16))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="tls-client")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class AsyncSession(Session):
+    """
+    A Session whose requests can be awaited.
+
+    The blocking FFI call runs on a dedicated executor. Awaiting a request can be cancelled or
+    time out; the native request is given the same timeout, so an abandoned call doesn't keep
+    its thread for longer than the caller was willing to wait. The session keeps count of the
+    calls still running, so close_when_idle never destroys it under one of them.
+    """
+
+    def __init__(self, *args: Any, executor: Optional[ThreadPoolExecutor] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.executor = executor
+        self._running = 0
+        self._close_requested = False
+        self._running_lock = threading.Lock()
+
+    async def execute_request_async(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Response:
+        timeout = timeout or kwargs.get("timeout_seconds") or self.timeout_seconds
+        kwargs["timeout_seconds"] = max(1, math.ceil(timeout))
+
+        with self._running_lock:
+            self._running += 1
+        try:
+            future = (self.executor or get_executor()).submit(
+                self.execute_request, method=method, url=url, **kwargs
+            )
+        except BaseException:
+            self._request_finished(None)
+            raise
+        future.add_done_callback(self._request_finished)
+
+        # Cancelling the wrapper cancels the call if it hasn't started, otherwise it finishes on its own
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def _request_finished(self, future: Optional[Future]):
+        with self._running_lock:
+            self._running -= 1
+            close_now = self._close_requested and self._running == 0
+        if close_now:
+            self._submit_close()
+
+    @property
+    def running_requests(self) -> int:
+        return self._running
+
+    def close_when_idle(self):
+        """
+        Close the session on the executor, straight away or once the requests still running on
+        it finish. Destroying the native session blocks, so it is kept off the event loop.
+        """
+        with self._running_lock:
+            if self._close_requested:
+                return
+            self._close_requested = True
+            close_now = self._running == 0
+        if close_now:
+            self._submit_close()
+
+    def _submit_close(self):
+        try:
+            (self.executor or get_executor()).submit(self._close_quietly)
+        except RuntimeError:
+            # The executor has been shut down
+            self._close_quietly()
+
+    def _close_quietly(self):
+        try:
+            self.close()
+        except Exception:
+            print(traceback.format_exc())
+
+    async def aget(self, url: str, **kwargs: Any) -> Response:
+        """Sends a GET request"""
+        return await self.execute_request_async(method="GET", url=url, **kwargs)
+
+    async def aoptions(self, url: str, **kwargs: Any) -> Response:
+        """Sends a OPTIONS request"""
+        return await self.execute_request_async(method="OPTIONS", url=url, **kwargs)
+
+    async def ahead(self, url: str, **kwargs: Any) -> Response:
+        """Sends a HEAD request"""
+        return await self.execute_request_async(method="HEAD", url=url, **kwargs)
+
+    async def apost(
+        self,
+        url: str,
+        data: Optional[Union[str, dict]] = None,
+        json: Optional[dict] = None,
+        **kwargs: Any
+    ) -> Response:
+        """Sends a POST request"""
+        return await self.execute_request_async(method="POST", url=url, data=data, json=json, **kwargs)
+
+    async def aput(
+        self,
+        url: str,
+        data: Optional[Union[str, dict]] = None,
+        json: Optional[dict] = None,
+        **kwargs: Any
+    ) -> Response:
+        """Sends a PUT request"""
+        return await self.execute_request_async(method="PUT", url=url, data=data, json=json, **kwargs)
+
+    async def apatch(
+        self,
+        url: str,
+        data: Optional[Union[str, dict]] = None,
+        json: Optional[dict] = None,
+        **kwargs: Any
+    ) -> Response:
+        """Sends a PATCH request"""
+        return await self.execute_request_async(method="PATCH", url=url, data=data, json=json, **kwargs)
+
+    async def adelete(self, url: str, **kwargs: Any) -> Response:
+        """Sends a DELETE request"""
+        return await self.execute_request_async(method="DELETE", url=url, **kwargs)
+
+    async def aclose(self) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor or get_executor(), self.close)
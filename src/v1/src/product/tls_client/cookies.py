@@ -1,97 +1,14 @@
 from .structures import CaseInsensitiveDict
 
-from http.cookiejar import CookieJar, Cookie
+from http.cookiejar import CookieJar, Cookie, http2time
 from typing import MutableMapping, Union, Any
-from urllib.parse import urlparse, urlunparse
-from http.client import HTTPMessage
+from urllib.parse import urlparse
+from json import dumps
 import threading
+import time
 import copy
 
 
-class MockRequest:
-    """
-    Mimic a urllib2.Request to get the correct cookie string for the request.
-    """
-
-    def __init__(self, request_url: str, request_headers: CaseInsensitiveDict):
-        self.request_url = request_url
-        self.request_headers = request_headers
-        self._new_headers = {}
-        self.type = urlparse(self.request_url).scheme
-
-    def get_type(self):
-        return self.type
-
-    def get_host(self):
-        return urlparse(self.request_url).netloc
-
-    def get_origin_req_host(self):
-        return self.get_host()
-
-    def get_full_url(self):
-        # Only return the response's URL if the user hadn't set the Host
-        # header
-        if not self.request_headers.get("Host"):
-            return self.request_url
-        # If they did set it, retrieve it and reconstruct the expected domain
-        host = self.request_headers["Host"]
-        parsed = urlparse(self.request_url)
-        # Reconstruct the URL as we expect it
-        return urlunparse(
-            [
-                parsed.scheme,
-                host,
-                parsed.path,
-                parsed.params,
-                parsed.query,
-                parsed.fragment,
-            ]
-        )
-
-    def is_unverifiable(self):
-        return True
-
-    def has_header(self, name):
-        return name in self.request_headers or name in self._new_headers
-
-    def get_header(self, name, default=None):
-        return self.request_headers.get(name, self._new_headers.get(name, default))
-
-    def add_unredirected_header(self, name, value):
-        self._new_headers[name] = value
-
-    def get_new_headers(self):
-        return self._new_headers
-
-    @property
-    def unverifiable(self):
-        return self.is_unverifiable()
-
-    @property
-    def origin_req_host(self):
-        return self.get_origin_req_host()
-
-    @property
-    def host(self):
-        return self.get_host()
-
-
-class MockResponse:
-    """
-    Wraps a httplib.HTTPMessage to mimic a urllib.addinfourl.
-    The objective is to retrieve the response cookies correctly.
-    """
-
-    def __init__(self, headers):
-        self._headers = headers
-
-    def info(self):
-        return self._headers
-
-    def getheaders(self, name):
-        self._headers.getheaders(name)
-
-
 class CookieConflictError(RuntimeError):
     """There are two cookies that meet the criteria specified in the cookie jar.
     Use .get and .set and include domain and path args in order to be more specific.
@@ -114,9 +31,17 @@ class RequestsCookieJar(CookieJar, MutableMapping):
 
     Unlike a regular CookieJar, this class is pickleable.
 
-    .. warning:: dictionary operations that are normally O(1) may be O(n).
+    Lookups by name go through an index, and the cookie list sent with each request is cached
+    already serialised. Both are rebuilt only after the jar changes.
     """
 
+    def __init__(self, policy=None):
+        super().__init__(policy)
+        # Incremented whenever a cookie is set or cleared, the caches below are tied to a version
+        self._version = 0
+        self._name_index = None
+        self._request_cookies = None
+
     def get(self, name, default=None, domain=None, path=None):
         """Dict-like get() that also supports optional domain and path args in
         order to resolve naming collisions from using one cookie jar over
@@ -276,8 +201,33 @@ class RequestsCookieJar(CookieJar, MutableMapping):
             and cookie.value.endswith('"')
         ):
             cookie.value = cookie.value.replace('\\"', "")
+        self._version += 1
         return super().set_cookie(cookie, *args, **kwargs)
 
+    def clear(self, domain=None, path=None, name=None):
+        self._version += 1
+        return super().clear(domain, path, name)
+
+    def _cookies_named(self, name):
+        """All cookies with the given name, from an index built once per version of the jar."""
+        if self._name_index is None or self._name_index[0] != self._version:
+            index = {}
+            for cookie in iter(self):
+                index.setdefault(cookie.name, []).append(cookie)
+            self._name_index = (self._version, index)
+        return self._name_index[1].get(name, [])
+
+    def request_cookies_json(self) -> str:
+        """The jar's cookies serialised for the tls client's requestCookies field."""
+        if self._request_cookies is None or self._request_cookies[0] != self._version:
+            # in the cookie value the " gets removed, because the fhttp library in golang doesn't accept the character
+            request_cookies = [
+                {'domain': c.domain, 'expires': c.expires, 'name': c.name, 'path': c.path, 'value': c.value.replace('"', "")}
+                for c in self
+            ]
+            self._request_cookies = (self._version, dumps(request_cookies, separators=(",", ":")))
+        return self._request_cookies[1]
+
     def update(self, other):
         """Updates this jar with cookies from another CookieJar or dict-like"""
         if isinstance(other, CookieJar):
@@ -298,11 +248,10 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         :param path: (optional) string containing path of cookie
         :return: cookie.value
         """
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        return cookie.value
+        for cookie in self._cookies_named(name):
+            if domain is None or cookie.domain == domain:
+                if path is None or cookie.path == path:
+                    return cookie.value
 
         raise KeyError(f"name={name!r}, domain={domain!r}, path={path!r}")
 
@@ -319,17 +268,16 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         :return: cookie.value
         """
         toReturn = None
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        if toReturn is not None:
-                            # if there are multiple cookies that meet passed in criteria
-                            raise CookieConflictError(
-                                f"There are multiple cookies with name, {name!r}"
-                            )
-                        # we will eventually return this as long as no cookie conflict
-                        toReturn = cookie.value
+        for cookie in self._cookies_named(name):
+            if domain is None or cookie.domain == domain:
+                if path is None or cookie.path == path:
+                    if toReturn is not None:
+                        # if there are multiple cookies that meet passed in criteria
+                        raise CookieConflictError(
+                            f"There are multiple cookies with name, {name!r}"
+                        )
+                    # we will eventually return this as long as no cookie conflict
+                    toReturn = cookie.value
 
         if toReturn:
             return toReturn
@@ -420,6 +368,9 @@ def cookiejar_from_dict(cookie_dict: dict) -> RequestsCookieJar:
 
 def merge_cookies(cookiejar: RequestsCookieJar, cookies: Union[dict, RequestsCookieJar]) -> RequestsCookieJar:
     """Merge cookies in session and cookies provided in request"""
+    if not cookies:
+        return cookiejar
+
     if type(cookies) is dict:
         cookies = cookiejar_from_dict(cookies)
 
@@ -428,6 +379,73 @@ def merge_cookies(cookiejar: RequestsCookieJar, cookies: Union[dict, RequestsCoo
 
     return cookiejar
 
+def parse_set_cookie(header_value: str, request_host: str, request_path: str, now: float):
+    """
+    Parse one Set-Cookie header.
+
+    Returns (cookie, None) for a cookie to store, (None, (domain, path, name)) for a cookie the
+    server expired, or (None, None) if the header is invalid or its domain doesn't match the host.
+    """
+    parts = header_value.split(";")
+    name, sep, value = parts[0].partition("=")
+    name = name.strip()
+    if not sep or not name:
+        return None, None
+
+    attributes = {}
+    for part in parts[1:]:
+        key, _, attribute_value = part.partition("=")
+        attributes[key.strip().lower()] = attribute_value.strip()
+
+    # Domain, only accepted if the request host is within it
+    domain = attributes.get("domain", "").lower()
+    if domain:
+        bare_domain = domain.lstrip(".")
+        if "." not in bare_domain or not (
+            request_host == bare_domain or request_host.endswith("." + bare_domain)
+        ):
+            return None, None
+        domain_initial_dot = domain.startswith(".")
+        domain = "." + bare_domain
+    else:
+        domain_initial_dot = False
+        domain = request_host if "." in request_host else request_host + ".local"
+
+    # Path, defaulting to the request path without its last segment
+    path = attributes.get("path", "")
+    path_specified = path.startswith("/")
+    if not path_specified:
+        path = request_path[: request_path.rfind("/")] or "/"
+
+    # Expiry, Max-Age takes priority over Expires
+    expires = None
+    if "max-age" in attributes:
+        try:
+            expires = int(now + int(attributes["max-age"]))
+        except ValueError:
+            pass
+    if expires is None and attributes.get("expires"):
+        expires = http2time(attributes["expires"])
+
+    if expires is not None and expires <= now:
+        return None, (domain, path, name)
+
+    cookie = create_cookie(
+        name=name,
+        value=value.strip(),
+        domain=domain,
+        path=path,
+        secure="secure" in attributes,
+        expires=expires,
+        discard=expires is None,
+        rest={"HttpOnly": None} if "httponly" in attributes else {},
+    )
+    cookie.domain_initial_dot = domain_initial_dot
+    cookie.domain_specified = bool(attributes.get("domain"))
+    cookie.path_specified = path_specified
+    return cookie, None
+
+
 def extract_cookies_to_jar(
         request_url: str,
         request_headers: CaseInsensitiveDict,
@@ -436,17 +454,25 @@ def extract_cookies_to_jar(
     ) -> RequestsCookieJar:
     response_cookie_jar = cookiejar_from_dict({})
 
-    req = MockRequest(request_url, request_headers)
-    # mimic HTTPMessage
-    http_message = HTTPMessage()
-    http_message._headers = []
+    # The Host header overrides the url's host, as a browser would use it
+    parsed = urlparse(request_url)
+    request_host = ((request_headers or {}).get("Host") or parsed.netloc).split(":")[0].lower()
+    request_path = parsed.path or "/"
+    now = time.time()
+
     for header_name, header_values in response_headers.items():
+        if header_name.lower() != "set-cookie":
+            continue
         for header_value in header_values:
-            http_message._headers.append(
-                (header_name, header_value)
-            )
-    res = MockResponse(http_message)
-    response_cookie_jar.extract_cookies(res, req)
+            cookie, expired = parse_set_cookie(header_value, request_host, request_path, now)
+            if cookie is not None:
+                response_cookie_jar.set_cookie(cookie)
+            elif expired is not None:
+                # An expiry in the past is the server deleting the cookie
+                try:
+                    cookie_jar.clear(*expired)
+                except KeyError:
+                    pass
 
     merge_cookies(cookie_jar, response_cookie_jar)
-    return response_cookie_jar
\ No newline at end of file
+    return response_cookie_jar
@@ -1,7 +1,9 @@
 from .cookies import cookiejar_from_dict, RequestsCookieJar
 from .structures import CaseInsensitiveDict
 
-from typing import Union
+from typing import Optional, Union
+import base64
+import codecs
 import json
 
 
@@ -16,16 +18,16 @@ class Response:
         # Integer Code of responded HTTP Status, e.g. 404 or 200.
         self.status_code = None
 
-        # String of responded HTTP Body.
-        self.text = None
+        # Body of the response, kept as the bytes the server sent and decoded when text is first read
+        self._text = None
+        self._content = None
+        # Used to decode the body, the charset of the Content-Type header (or utf-8) unless it is set
+        self.encoding = None
 
-        # Case-insensitive Dictionary of Response Headers.
-        self.headers = CaseInsensitiveDict()
-
-        # A CookieJar of Cookies the server sent back.
-        self.cookies = cookiejar_from_dict({})
-        
-        self._content = False
+        # Headers and cookies as the server sent them, only built into objects when first read
+        self._raw_headers = None
+        self._headers = None
+        self._cookies = None
 
     def __enter__(self):
         return self
@@ -37,23 +39,66 @@ class Response:
         """parse response body to json (dict/list)"""
         return json.loads(self.text, **kwargs)
     
+    @property
+    def headers(self) -> CaseInsensitiveDict:
+        """Case-insensitive Dictionary of Response Headers."""
+        if self._headers is None:
+            self._headers = CaseInsensitiveDict()
+            for header_key, header_value in (self._raw_headers or {}).items():
+                if len(header_value) == 1:
+                    self._headers[header_key] = header_value[0]
+                else:
+                    self._headers[header_key] = header_value
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = CaseInsensitiveDict(value)
+
+    @property
+    def cookies(self) -> RequestsCookieJar:
+        """A CookieJar of Cookies the server sent back."""
+        if self._cookies is None:
+            self._cookies = cookiejar_from_dict({})
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value):
+        self._cookies = value
+
+    @property
+    def text(self):
+        """String of responded HTTP Body."""
+        if self._text is None and self._content is not None:
+            self._text = self._content.decode(self.encoding or self._charset() or "utf-8", errors="replace")
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text, self._content = value, None
+
     @property
     def content(self):
         """Content of the response, in bytes."""
-        
-        if self._content is False:
-            if self._content_consumed:
-                raise RuntimeError("The content for this response was already consumed")
-
-            if self.status_code == 0:
-                self._content = None
-            else:
-                self._content = b"".join(self.iter_content(10 * 1024)) or b""
-        self._content_consumed = True
+        if self._content is None and self._text is not None:
+            self._content = self._text.encode(self.encoding or "utf-8")
         return self._content
 
+    def _charset(self) -> Optional[str]:
+        content_type = self.headers.get("content-type") or ""
+        if isinstance(content_type, list):
+            content_type = content_type[0]
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "charset":
+                try:
+                    return codecs.lookup(value.strip().strip('"')).name
+                except LookupError:
+                    return None
+        return None
+
 
-def build_response(res: Union[dict, list], res_cookies: RequestsCookieJar) -> Response:
+def build_response(res: Union[dict, list], res_cookies: Optional[RequestsCookieJar] = None) -> Response:
     """Builds a Response object """
     response = Response()
     # Add target / url
@@ -61,18 +106,14 @@ def build_response(res: Union[dict, list], res_cookies: RequestsCookieJar) -> Re
     # Add status code
     response.status_code = res["status"]
     # Add headers
-    response_headers = {}
-    if res["headers"] is not None:
-        for header_key, header_value in res["headers"].items():
-            if len(header_value) == 1:
-                response_headers[header_key] = header_value[0]
-            else:
-                response_headers[header_key] = header_value
-    response.headers = response_headers
-    # Add cookies
-    response.cookies = res_cookies
-    # Add response body
-    response.text = res["body"]
-    # Add response content (bytes)
-    response._content = res["body"].encode()
-    return response
\ No newline at end of file
+    response._raw_headers = res["headers"]
+    # Add cookies, an empty jar is created on first access if the server didn't set any
+    response._cookies = res_cookies
+    # Add response body, requests are sent with isByteResponse so it arrives as a base64 data url
+    body = res["body"] or ""
+    header, separator, data = body.partition(",")
+    if separator and header.startswith("data:") and header.endswith(";base64"):
+        response._content = base64.b64decode(data)
+    else:
+        response._text = body
+    return response
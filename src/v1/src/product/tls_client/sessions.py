@@ -8,12 +8,39 @@ from .__version__ import __version__
 
 from typing import Any, Dict, List, Optional, Union
 from json import dumps, loads
+from copy import deepcopy
 import urllib.parse
 import base64
-import ctypes
 import uuid
 
 
+# Session settings which are sent unchanged with every request. Their serialised JSON is cached
+# with a copy of the settings it was built from, so changing one, even in place, rebuilds it.
+STATIC_PAYLOAD_ATTRIBUTES = (
+    "_session_id",
+    "force_http1",
+    "debug",
+    "catch_panics",
+    "header_order",
+    "additional_decode",
+    "certificate_pinning",
+    "client_identifier",
+    "random_tls_extension_order",
+    "ja3_string",
+    "h2_settings",
+    "h2_settings_order",
+    "pseudo_header_order",
+    "connection_flow",
+    "priority_frames",
+    "header_priority",
+    "cert_compression_algo",
+    "supported_versions",
+    "supported_signature_algorithms",
+    "supported_delegated_credentials_algorithms",
+    "key_share_curves",
+)
+
+
 class Session:
 
     def __init__(
@@ -289,9 +316,8 @@ class Session:
             "sessionId": self._session_id
         }
 
-        destroy_session_response = destroySession(dumps(destroy_session_payload).encode('utf-8'))
-        # we dereference the pointer to a byte array
-        destroy_session_response_bytes = ctypes.string_at(destroy_session_response)
+        # the library returns the response json as bytes (restype c_char_p)
+        destroy_session_response_bytes = destroySession(dumps(destroy_session_payload).encode('utf-8'))
         # convert our byte array to a string (tls client returns json)
         destroy_session_response_string = destroy_session_response_bytes.decode('utf-8')
         # convert response string to json
@@ -301,6 +327,47 @@ class Session:
 
         return destroy_session_response_string
 
+    def _get_static_payload(self) -> str:
+        """The serialised fields of the request payload which only depend on the session's settings."""
+        settings = tuple(getattr(self, name) for name in STATIC_PAYLOAD_ATTRIBUTES)
+        cached = self.__dict__.get("_static_payload")
+        if cached is not None and cached[0] == settings:
+            return cached[1]
+
+        payload = {
+            "sessionId": self._session_id,
+            "forceHttp1": self.force_http1,
+            "withDebug": self.debug,
+            "catchPanics": self.catch_panics,
+            "headerOrder": self.header_order,
+            "additionalDecode": self.additional_decode,
+        }
+        # pins a certificate so that it restricts which certificates are considered valid
+        if self.certificate_pinning:
+            payload["certificatePinningHosts"] = self.certificate_pinning
+        if self.client_identifier is None:
+            payload["customTlsClient"] = {
+                "ja3String": self.ja3_string,
+                "h2Settings": self.h2_settings,
+                "h2SettingsOrder": self.h2_settings_order,
+                "pseudoHeaderOrder": self.pseudo_header_order,
+                "connectionFlow": self.connection_flow,
+                "priorityFrames": self.priority_frames,
+                "headerPriority": self.header_priority,
+                "certCompressionAlgo": self.cert_compression_algo,
+                "supportedVersions": self.supported_versions,
+                "supportedSignatureAlgorithms": self.supported_signature_algorithms,
+                "supportedDelegatedCredentialsAlgorithms": self.supported_delegated_credentials_algorithms ,
+                "keyShareCurves": self.key_share_curves,
+            }
+        else:
+            payload["tlsClientIdentifier"] = self.client_identifier
+            payload["withRandomTLSExtensionOrder"] = self.random_tls_extension_order
+
+        static_payload = dumps(payload, separators=(",", ":"))[1:-1]
+        self.__dict__["_static_payload"] = (deepcopy(settings), static_payload)
+        return static_payload
+
     def execute_request(
         self,
         method: str,
@@ -355,15 +422,10 @@ class Session:
             headers = merged_headers
 
         # --- Cookies --------------------------------------------------------------------------------------------------
-        cookies = cookies or {}
         # Merge with session cookies
         cookies = merge_cookies(self.cookies, cookies)
-        # turn cookie jar into dict
-        # in the cookie value the " gets removed, because the fhttp library in golang doesn't accept the character
-        request_cookies = [
-            {'domain': c.domain, 'expires': c.expires, 'name': c.name, 'path': c.path, 'value': c.value.replace('"', "")}
-            for c in cookies
-        ]
+        # the jar caches its cookies already serialised, until it next changes
+        request_cookies = cookies.request_cookies_json()
 
         # --- Proxy ----------------------------------------------------------------------------------------------------
         proxy = proxy or self.proxies
@@ -380,73 +442,48 @@ class Session:
 
         timeout_seconds = timeout_seconds or self.timeout_seconds
 
-        # --- Certificate pinning --------------------------------------------------------------------------------------
-        # pins a certificate so that it restricts which certificates are considered valid
-
-        certificate_pinning = self.certificate_pinning
-        
         # --- Request --------------------------------------------------------------------------------------------------
         is_byte_request = isinstance(request_body, (bytes, bytearray))
         request_payload = {
-            "sessionId": self._session_id,
             "followRedirects": allow_redirects,
-            "forceHttp1": self.force_http1,
-            "withDebug": self.debug,
-            "catchPanics": self.catch_panics,
             "headers": dict(headers),
-            "headerOrder": self.header_order,
             "insecureSkipVerify": insecure_skip_verify,
             "isByteRequest": is_byte_request,
-            "additionalDecode": self.additional_decode,
+            # the body is sent back base64 encoded, as the bytes the server sent
+            "isByteResponse": True,
             "proxyUrl": proxy,
             "requestUrl": url,
             "requestMethod": method,
             "requestBody": base64.b64encode(request_body).decode() if is_byte_request else request_body,
-            "requestCookies": request_cookies,
             "timeoutSeconds": timeout_seconds,
         }
-        if certificate_pinning:
-            request_payload["certificatePinningHosts"] = certificate_pinning
-        if self.client_identifier is None:
-            request_payload["customTlsClient"] = {
-                "ja3String": self.ja3_string,
-                "h2Settings": self.h2_settings,
-                "h2SettingsOrder": self.h2_settings_order,
-                "pseudoHeaderOrder": self.pseudo_header_order,
-                "connectionFlow": self.connection_flow,
-                "priorityFrames": self.priority_frames,
-                "headerPriority": self.header_priority,
-                "certCompressionAlgo": self.cert_compression_algo,
-                "supportedVersions": self.supported_versions,
-                "supportedSignatureAlgorithms": self.supported_signature_algorithms,
-                "supportedDelegatedCredentialsAlgorithms": self.supported_delegated_credentials_algorithms ,
-                "keyShareCurves": self.key_share_curves,
-            }
-        else:
-            request_payload["tlsClientIdentifier"] = self.client_identifier
-            request_payload["withRandomTLSExtensionOrder"] = self.random_tls_extension_order
 
-        # this is a pointer to the response
-        response = request(dumps(request_payload).encode('utf-8'))
-        # dereference the pointer to a byte array
-        response_bytes = ctypes.string_at(response)
-        # convert our byte array to a string (tls client returns json)
-        response_string = response_bytes.decode('utf-8')
-        # convert response string to json
-        response_object = loads(response_string)
+        # The static settings and cookies are serialised ahead of time, and joined with the per request fields
+        payload = '{%s,%s,"requestCookies":%s}' % (
+            self._get_static_payload(),
+            dumps(request_payload, separators=(",", ":"))[1:-1],
+            request_cookies,
+        )
+
+        # the library returns the response json as bytes (restype c_char_p), which json can parse directly
+        response_bytes = request(payload.encode('utf-8'))
+        response_object = loads(response_bytes)
         # free the memory
         freeMemory(response_object['id'].encode('utf-8'))
         # --- Response -------------------------------------------------------------------------------------------------
         # Error handling
         if response_object["status"] == 0:
             raise TLSClientExeption(response_object["body"])
-        # Set response cookies
-        response_cookie_jar = extract_cookies_to_jar(
-            request_url=url,
-            request_headers=headers,
-            cookie_jar=cookies,
-            response_headers=response_object["headers"]
-        )
+        # Set response cookies, parsing them is skipped entirely when the server didn't set any
+        response_cookie_jar = None
+        response_headers = response_object["headers"] or {}
+        if any(header_name.lower() == "set-cookie" for header_name in response_headers):
+            response_cookie_jar = extract_cookies_to_jar(
+                request_url=url,
+                request_headers=headers,
+                cookie_jar=cookies,
+                response_headers=response_headers
+            )
         # build response class
         return build_response(response_object, response_cookie_jar)
 
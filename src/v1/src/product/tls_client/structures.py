@@ -1,5 +1,4 @@
 from typing import MutableMapping, Mapping
-from collections import OrderedDict
 
 
 class CaseInsensitiveDict(MutableMapping):
@@ -31,8 +30,11 @@ class CaseInsensitiveDict(MutableMapping):
     behavior is undefined.
     """
 
+    # A plain dict keeps insertion order, and slots avoid a per-instance __dict__
+    __slots__ = ("_store",)
+
     def __init__(self, data=None, **kwargs):
-        self._store = OrderedDict()
+        self._store = {}
         if data is None:
             data = {}
         self.update(data, **kwargs)
@@ -6,13 +6,20 @@ from ..db_firebase import FirebaseDB, get_db
 from google.cloud.firestore_v1 import AsyncDocumentReference
 from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException, Request
-from typing import Dict, Any
 
 import traceback
+import asyncio
 import httpx
 import os
 
 
+# Refreshes currently running, keyed by uid, so concurrent callers share a single refresh
+refreshes_in_flight: dict[str, asyncio.Task] = {}
+
+# Tokens refreshed by this process, keyed by uid: (access_token, expiry_timestamp)
+token_cache: dict[str, tuple[str, int]] = {}
+
+
 # --------------------------------------------------- #
 # StockX Token Refresh                                  #
 # --------------------------------------------------- #
@@ -40,21 +47,25 @@ async def check_and_refresh_stock_token(
         if account.stockxTokenExpiry > current_timestamp:
             return {"success": True, "user": user}
 
-        # Step 5: Refresh the stockx access token using the refresh token
-        token_data = await refresh_stockx_access_token(account.stockxRefreshToken)
-        if token_data.get("error"):
-            return {"success": False, "error": token_data.get("error")}
-
-        # Step 6: Store the new token and expiry date in the database
-        await db.update_user_token(user_ref, token_data)
+        # Step 5: Use a token this process has already refreshed, if it hasn't expired
+        cached_token = token_cache.get(user.id)
+        if cached_token and cached_token[1] > current_timestamp:
+            user.connectedAccounts.stockx.stockxAccessToken = cached_token[0]
+            user.connectedAccounts.stockx.stockxTokenExpiry = cached_token[1]
+            return {"success": True, "user": user}
 
-        # Step 7: Get the current time and calculate the expiration timestamp
-        expiry_time = current_time + timedelta(seconds=token_data.data.expires_in)
-        expiry_timestamp = int(expiry_time.timestamp())  # Convert to Unix timestamp in seconds
+        # Step 6: Refresh the stockx access token, joining a refresh already in flight for this user
+        token_data = await refresh_stockx_token_once(
+            user.id, account.stockxRefreshToken, db, user_ref,
+            (account.stockxAccessToken, account.stockxTokenExpiry),
+        )
+        if token_data.data is None:
+            return {"success": False, "error": token_data.error}
 
-        # Step 8: Update user token data
-        user.connectedAccounts.stockx.stockxAccessToken = token_data.data.access_token
-        user.connectedAccounts.stockx.stockxTokenExpiry = token_data.data.refresh_token
+        # Step 7: Update user token data
+        access_token, expiry_timestamp = token_cache[user.id]
+        user.connectedAccounts.stockx.stockxAccessToken = access_token
+        user.connectedAccounts.stockx.stockxRefreshToken = token_data.data.refresh_token
         user.connectedAccounts.stockx.stockxTokenExpiry = expiry_timestamp
 
         return {"success": True, "user": user}
@@ -63,7 +74,54 @@ async def check_and_refresh_stock_token(
         return {"success": False, "error": f"check_and_refresh_stockx_token(): {str(e)}"}
 
 
-async def refresh_stockx_access_token(refresh_token: str) -> Dict[str, Any]:
+async def refresh_stockx_token_once(
+    uid: str,
+    refresh_token: str,
+    db: FirebaseDB,
+    user_ref: AsyncDocumentReference,
+    previous_token: tuple[str, int] | None = None,
+) -> RefreshEbayTokenData:
+    """
+    Refresh a user's StockX token, collapsing concurrent refreshes for the same user into one.
+    previous_token (access_token, expiry_timestamp) is the token being replaced.
+    """
+    task = refreshes_in_flight.get(uid)
+    if task is None:
+        task = asyncio.create_task(
+            refresh_and_store_stockx_token(uid, refresh_token, db, user_ref, previous_token)
+        )
+        refreshes_in_flight[uid] = task
+        task.add_done_callback(lambda _: refreshes_in_flight.pop(uid, None))
+
+    # Shield the shared refresh so a cancelled caller doesn't cancel it for everyone else
+    return await asyncio.shield(task)
+
+
+async def refresh_and_store_stockx_token(
+    uid: str,
+    refresh_token: str,
+    db: FirebaseDB,
+    user_ref: AsyncDocumentReference,
+    previous_token: tuple[str, int] | None = None,
+) -> RefreshEbayTokenData:
+    current_time = datetime.now(timezone.utc)
+
+    # Step 1: Refresh the stockx access token using the refresh token
+    token_data = await refresh_stockx_access_token(refresh_token)
+    if token_data.data is None:
+        return token_data
+
+    # Step 2: Store the new token and expiry date in the database
+    await db.update_user_token(user_ref, token_data.data, "stockx", previous_token)
+
+    # Step 3: Cache the token until it expires
+    expiry_time = current_time + timedelta(seconds=token_data.data.expires_in)
+    token_cache[uid] = (token_data.data.access_token, int(expiry_time.timestamp()))
+
+    return token_data
+
+
+async def refresh_stockx_access_token(refresh_token: str) -> RefreshEbayTokenData:
     CLIENT_ID = os.getenv("STOCKX_CLIENT_ID")
     CLIENT_SECRET = os.getenv("STOCKX_CLIENT_SECRET")
     REDIRECT_URI = os.getenv("STOCKX_REDIRECT_URI")
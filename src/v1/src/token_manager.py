@@ -0,0 +1,173 @@
+# Local Imports
+from .db_firebase import get_db
+from .constants import (
+    token_refresh_margin_seconds,
+    token_refresh_jitter_seconds,
+    token_refresh_max_concurrency,
+    token_refresh_retry_seconds,
+    token_manager_interval_seconds,
+    token_tracking_ttl_seconds,
+    token_tracking_max_users,
+)
+from .models import IUser, StoreType
+from .ebay.tokens import (
+    refresh_ebay_token_once,
+    token_cache as ebay_token_cache,
+)
+from .stockx.tokens import (
+    refresh_stockx_token_once,
+    token_cache as stockx_token_cache,
+)
+
+# External Imports
+from google.cloud.firestore_v1 import AsyncDocumentReference
+from datetime import datetime, timezone
+
+import traceback
+import asyncio
+import random
+
+
+refresh_functions = {
+    "ebay": refresh_ebay_token_once,
+    "stockx": refresh_stockx_token_once,
+}
+
+token_caches = {
+    "ebay": ebay_token_cache,
+    "stockx": stockx_token_cache,
+}
+
+# Tokens seen by this process, keyed by (store_type, uid)
+tracked_tokens: dict[tuple[StoreType, str], dict] = {}
+
+# Background task refreshing tracked tokens before they expire, started and stopped with the app.
+# Without it (e.g. on a serverless deployment) tokens are still refreshed when a request finds them expired.
+token_manager_task: asyncio.Task | None = None
+
+
+def current_timestamp() -> int:
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+def schedule_refresh(expiry: int) -> int:
+    """
+    Pick when to refresh a token, jittered so tokens with the same expiry don't refresh at once.
+    """
+    jitter = random.uniform(0, token_refresh_jitter_seconds)
+    return int(expiry - token_refresh_margin_seconds - jitter)
+
+
+def track_user_token(
+    store_type: StoreType, user: IUser, user_ref: AsyncDocumentReference
+):
+    """
+    Record the token expiry of a user's connected account so it can be refreshed in the background.
+    """
+    match store_type:
+        case "ebay":
+            account = user.connectedAccounts.ebay
+            access_token, refresh_token, expiry = (
+                account.ebayAccessToken, account.ebayRefreshToken, account.ebayTokenExpiry
+            )
+        case "stockx":
+            account = user.connectedAccounts.stockx
+            access_token, refresh_token, expiry = (
+                account.stockxAccessToken, account.stockxRefreshToken, account.stockxTokenExpiry
+            )
+        case _:
+            return
+
+    # Tokens may be stored as milliseconds
+    if len(str(expiry)) > 10:
+        expiry = int(expiry) // 1000
+
+    key = (store_type, user.id)
+    entry = tracked_tokens.get(key)
+    if entry is None or entry["expiry"] != expiry:
+        entry = {
+            "uid": user.id,
+            "store_type": store_type,
+            "user_ref": user_ref,
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "expiry": expiry,
+            "refresh_at": schedule_refresh(expiry),
+        }
+        tracked_tokens[key] = entry
+    entry["last_seen"] = current_timestamp()
+
+    # Keep to the most recently seen users
+    if len(tracked_tokens) > token_tracking_max_users:
+        oldest = min(tracked_tokens, key=lambda key: tracked_tokens[key]["last_seen"])
+        tracked_tokens.pop(oldest, None)
+
+
+def start_token_manager():
+    global token_manager_task
+    if token_manager_task is None or token_manager_task.done():
+        token_manager_task = asyncio.create_task(run_token_manager())
+
+
+async def stop_token_manager():
+    global token_manager_task
+    if token_manager_task is None:
+        return
+
+    token_manager_task.cancel()
+    try:
+        await token_manager_task
+    except asyncio.CancelledError:
+        pass
+    token_manager_task = None
+
+
+async def run_token_manager():
+    semaphore = asyncio.Semaphore(token_refresh_max_concurrency)
+
+    while True:
+        try:
+            now = current_timestamp()
+
+            # Step 1: Stop tracking users who haven't been seen recently
+            for key, entry in list(tracked_tokens.items()):
+                if now - entry["last_seen"] > token_tracking_ttl_seconds:
+                    tracked_tokens.pop(key, None)
+
+            # Step 2: Refresh every token which is due, limited by the semaphore
+            due = [entry for entry in tracked_tokens.values() if entry["refresh_at"] <= now]
+            if due:
+                await asyncio.gather(
+                    *(refresh_tracked_token(entry, semaphore) for entry in due)
+                )
+
+        except Exception:
+            print(traceback.format_exc())
+
+        await asyncio.sleep(token_manager_interval_seconds)
+
+
+async def refresh_tracked_token(entry: dict, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        store_type, uid = entry["store_type"], entry["uid"]
+        try:
+            # The token being replaced stays valid for clients until it expires
+            token_data = await refresh_functions[store_type](
+                uid,
+                entry["refresh_token"],
+                get_db(),
+                entry["user_ref"],
+                (entry["access_token"], entry["expiry"]),
+            )
+            if token_data.data is None:
+                raise Exception(token_data.error)
+
+            access_token, expiry = token_caches[store_type][uid]
+            entry["access_token"] = access_token
+            entry["expiry"] = expiry
+            entry["refresh_at"] = schedule_refresh(expiry)
+
+        except Exception:
+            print(traceback.format_exc())
+            # Try again later rather than on every pass of the manager
+            entry["refresh_at"] = current_timestamp() + token_refresh_retry_seconds
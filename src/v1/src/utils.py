@@ -68,6 +68,14 @@ def format_date_to_iso(date: datetime) -> str:
     return date.strftime("%Y-%m-%dT%H:%M:%S.000Z")
 
 
+def parse_iso_date(date: str) -> datetime:
+    """Parse an ISO 8601 date string (e.g., 2024-11-01T17:12:26.000Z) into a UTC datetime."""
+    parsed = datetime.fromisoformat(date.replace("Z", "+00:00").replace(" ", ""))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
 def was_order_created_in_current_month(order: dict):
     current_date = datetime.now()
     current_month = current_date.month
@@ -0,0 +1,353 @@
+# External Imports
+from pathlib import Path
+
+import threading
+import hashlib
+import asyncio
+import base64
+import types
+import json
+import sys
+import os
+import re
+
+import pytest
+import httpx
+
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Settings the modules read on import, the tests never talk to Firebase or eBay
+os.environ.setdefault("FIREBASE_PRIVATE_KEY", "test-private-key")
+os.environ.setdefault("MAX_WHILE_LOOP_DEPTH", "50")
+os.environ.setdefault("DEV_ID", "test-dev-id")
+os.environ.setdefault("CLIENT_ID", "test-client-id")
+os.environ.setdefault("CLIENT_SECRET", "test-client-secret")
+
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def run_from_root(monkeypatch):
+    # Subscription limits are read from sub-limits.json relative to the working directory
+    monkeypatch.chdir(ROOT)
+
+
+# --------------------------------------------------- #
+# Fake Firestore                                      #
+# --------------------------------------------------- #
+
+
+class FakeSnapshot:
+    def __init__(self, data: dict | None) -> None:
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return self._data
+
+
+class FakeUserRef:
+    """A user document, updates use Firestore's dotted field paths."""
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+        self.updates: list[dict] = []
+
+    async def get(self):
+        return FakeSnapshot(self.data)
+
+    async def update(self, fields: dict):
+        self.updates.append(fields)
+        for path, value in fields.items():
+            target = self.data
+            *parents, key = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[key] = value
+
+
+class FakeFirebaseDB:
+    """Implements the FirebaseDB methods the sync and notification code calls, in memory."""
+
+    def __init__(self) -> None:
+        # (item_type, store_type) -> {doc_id: item}
+        self.collections: dict[tuple[str, str], dict[str, dict]] = {}
+        self.users_by_ebay_id: dict[str, FakeUserRef] = {}
+        self.tokens: list = []
+        self.reads = 0
+
+    def collection(self, item_type: str, store_type: str) -> dict[str, dict]:
+        return self.collections.setdefault((item_type, store_type), {})
+
+    async def query_user_ref_by_ebay_user_id(self, ebay_user_id: str):
+        return self.users_by_ebay_id.get(ebay_user_id)
+
+    async def set_ebay_user_id(self, user_ref: FakeUserRef, ebay_user_id: str):
+        await user_ref.update({"connectedAccounts.ebay.ebayUserId": ebay_user_id})
+
+    async def update_user_token(self, user_ref, token_data, store_type="ebay", previous_token=None):
+        self.tokens.append((store_type, token_data.access_token))
+        return {"success": True}
+
+    async def retrieve_item(self, uid, item_id, item_type, store_type):
+        self.reads += 1
+        return {"item": self.collection(item_type, store_type).get(item_id), "error": None}
+
+    async def get_items_by_ids(self, uid, item_ids, item_type, store, id_key):
+        self.reads += 1
+        return {
+            item[id_key]: item
+            for item in self.collection(item_type, store).values()
+            if item.get(id_key) in item_ids
+        }
+
+    async def add_items(self, uid, items, item_type, store_type, id_key):
+        for item in items:
+            if item.get(id_key):
+                self.collection(item_type, store_type)[item[id_key]] = item
+        return {"success": True, "message": f"{item_type}s added successfully"}
+
+    async def remove_item(self, uid, item_id, item_type, store_type):
+        self.collection(item_type, store_type).pop(item_id, None)
+        return {"success": True}
+
+    async def remove_items(self, uid, item_ids, item_type, store_type):
+        for item_id in item_ids:
+            self.collection(item_type, store_type).pop(item_id, None)
+        return {"success": True}
+
+    async def get_automatic_item_ids(self, uid, item_type, store_type):
+        return {
+            doc_id
+            for doc_id, item in self.collection(item_type, store_type).items()
+            if item.get("recordType") == "automatic"
+        }
+
+    async def set_last_fetched_date(self, user_ref, data_type, date, store_type):
+        await user_ref.update({f"store.storeMeta.{store_type}.lastFetchedDate.{data_type}": date})
+
+    async def set_high_watermark(self, user_ref, data_type, date, store_type):
+        await user_ref.update({f"store.storeMeta.{store_type}.highWatermark.{data_type}": date})
+
+    async def set_offset(self, user_ref, data_type, offset, store_type):
+        await user_ref.update({f"store.storeMeta.{store_type}.offset.{data_type}": offset})
+
+    async def set_current_no_listings(self, user_ref, automatic_count, new_listings, manual_count):
+        await user_ref.update(
+            {"store.numListings": {"automatic": automatic_count + new_listings, "manual": manual_count}}
+        )
+
+    async def set_current_no_orders(self, user_ref, numOrders, new_orders, new_older_orders):
+        await user_ref.update(
+            {
+                "store.numOrders.automatic": (numOrders.automatic or 0) + new_orders,
+                "store.numOrders.totalAutomatic": (numOrders.totalAutomatic or 0)
+                + new_orders
+                + new_older_orders,
+            }
+        )
+
+    async def reset_current_no_orders(self, user_ref, store_type):
+        pass
+
+
+@pytest.fixture
+def fake_db():
+    return FakeFirebaseDB()
+
+
+def make_user_doc(uid: str = "user-1", **connected_accounts) -> dict:
+    return {
+        "id": uid,
+        "connectedAccounts": connected_accounts,
+        "email": f"{uid}@example.com",
+        "stripeCustomerId": "cus_test",
+        "subscriptions": [
+            {"id": "sub-1", "name": "Standard - member", "override": False, "createdAt": "2025-01-01"}
+        ],
+        "referral": {},
+        "store": {
+            "numListings": {"automatic": 0, "manual": 0},
+            "numOrders": {"resetDate": "2999-01-01", "automatic": 0, "manual": 0, "totalAutomatic": 0, "totalManual": 0},
+            "storeMeta": {},
+        },
+        "preferences": {},
+        "authentication": {"emailVerified": "verified"},
+        "metaData": {"createdAt": "2025-01-01T00:00:00.000Z"},
+    }
+
+
+@pytest.fixture
+def user_doc_factory():
+    return make_user_doc
+
+
+@pytest.fixture
+def fake_user_ref_factory():
+    return FakeUserRef
+
+
+# --------------------------------------------------- #
+# eBay Notification Replayer                          #
+# --------------------------------------------------- #
+
+
+def sign_ebay_notification(timestamp: str) -> str:
+    raw = f"{timestamp}{os.getenv('DEV_ID')}{os.getenv('CLIENT_ID')}{os.getenv('CLIENT_SECRET')}"
+    return base64.b64encode(hashlib.md5(raw.encode("utf-8")).digest()).decode("utf-8")
+
+
+def replay_ebay_notification(name: str, timestamp: str, signature: str | None = None) -> bytes:
+    """
+    Return a captured notification as eBay would send it at `timestamp`, re-signed for the test
+    credentials unless a signature is given.
+    """
+    body = (FIXTURES / "ebay" / f"{name}.xml").read_text()
+    body = re.sub(r"<Timestamp>[^<]*</Timestamp>", f"<Timestamp>{timestamp}</Timestamp>", body, count=1)
+    body = re.sub(
+        r"(<ebl:NotificationSignature[^>]*>)[^<]*(</ebl:NotificationSignature>)",
+        rf"\g<1>{signature or sign_ebay_notification(timestamp)}\g<2>",
+        body,
+    )
+    return body.encode("utf-8")
+
+
+@pytest.fixture
+def replay_notification():
+    return replay_ebay_notification
+
+
+# --------------------------------------------------- #
+# Depop Stand-in                                      #
+# --------------------------------------------------- #
+
+
+class DepopStandIn:
+    """
+    Serves the shop and sold product lists in tests/fixtures/depop the way the Depop API pages
+    them, following the offset id cursor. Product ids are prefixed with the shop id so several
+    shops can be synced into one database.
+    """
+
+    def __init__(self, max_page_size: int = 200, delay_seconds: float = 0.01) -> None:
+        self.max_page_size = max_page_size
+        self.delay_seconds = delay_seconds
+        self.inventory = json.loads((FIXTURES / "depop" / "shop_products.json").read_text())["products"]
+        self.sold = json.loads((FIXTURES / "depop" / "sold_products.json").read_text())["products"]
+        self.set_cookie: str | None = None
+        # The request (counting from 1) that fails with a server error
+        self.failing_request: int | None = None
+        self.requests: list[httpx.URL] = []
+        self.request_cookies: list[str | None] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url)
+        self.request_cookies.append(request.headers.get("cookie"))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_seconds)
+            if len(self.requests) == self.failing_request:
+                return httpx.Response(500)
+            return self.respond(request.url)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, url: httpx.URL) -> httpx.Response:
+        match = re.fullmatch(r"/api/v\d/shop/([^/]+)/(products|filteredProducts/sold)/", url.path)
+        if match is None:
+            return httpx.Response(404)
+
+        shop_id, kind = match.groups()
+        products = self.inventory if kind == "products" else self.sold
+        # The sold list is ordered by when each product was last updated
+        if kind != "products":
+            products = sorted(products, key=lambda product: product["date_updated"], reverse=True)
+        products = [{**product, "id": f"{shop_id}-{product['id']}"} for product in products]
+
+        # Step 1: Resume after the cursor
+        cursor = url.params.get("after") or url.params.get("offset_id")
+        start = 0
+        if cursor:
+            start = next(index for index, product in enumerate(products) if product["id"] == cursor) + 1
+
+        # Step 2: Serve a page
+        limit = min(int(url.params.get("limit", 24)), self.max_page_size)
+        page = products[start : start + limit]
+        end = start + limit >= len(products)
+        meta = {"last_offset_id": page[-1]["id"] if page else None, "end": end}
+        headers = {"set-cookie": self.set_cookie} if self.set_cookie else {}
+        return httpx.Response(200, json={"products": page, "meta": meta}, headers=headers)
+
+
+@pytest.fixture
+def depop_stand_in(monkeypatch, tmp_path):
+    from src.v1.src.depop import web_req
+    from src.v1.src.depop.cookies import CookieStore
+
+    stand_in = DepopStandIn()
+    monkeypatch.setattr(
+        web_req, "client", web_req.create_client(transport=httpx.MockTransport(stand_in.handle))
+    )
+    monkeypatch.setattr(web_req, "cookie_store", CookieStore(str(tmp_path / "cookies.db")))
+    monkeypatch.setattr(web_req, "host_semaphores", {})
+    return stand_in
+
+
+# --------------------------------------------------- #
+# TLS Client Library Stand-in                         #
+# --------------------------------------------------- #
+
+
+class FakeTLSLibrary:
+    """
+    Stands in for the tls-client shared library, which isn't built for the tests. Requests are
+    answered by respond(payload), which returns the status, headers and body of the response.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.requests: list[dict] = []
+        self.destroyed: list[tuple[str, threading.Thread]] = []
+        self.respond = lambda payload: {"status": 200, "headers": {}, "body": ""}
+
+    def request(self, payload: bytes) -> bytes:
+        payload = json.loads(payload)
+        self.requests.append(payload)
+        response = {"id": "response-id", "target": payload["requestUrl"], **self.respond(payload)}
+        # The library sends the body back as a base64 data url when isByteResponse is set
+        body = response["body"]
+        if payload.get("isByteResponse"):
+            body = body.encode() if isinstance(body, str) else body
+            response["body"] = "data:text/html;base64," + base64.b64encode(body).decode()
+        return json.dumps(response).encode()
+
+    def free_memory(self, response_id: bytes) -> bytes:
+        return b""
+
+    def destroy_session(self, payload: bytes) -> bytes:
+        self.destroyed.append((json.loads(payload)["sessionId"], threading.current_thread()))
+        return json.dumps({"id": "destroy-id", "success": True}).encode()
+
+
+tls_library = FakeTLSLibrary()
+
+# Installed in place of the ctypes bindings before anything imports tls_client
+tls_cffi = types.ModuleType("src.v1.src.product.tls_client.cffi")
+tls_cffi.request = lambda payload: tls_library.request(payload)
+tls_cffi.freeMemory = lambda response_id: tls_library.free_memory(response_id)
+tls_cffi.destroySession = lambda payload: tls_library.destroy_session(payload)
+sys.modules[tls_cffi.__name__] = tls_cffi
+
+
+@pytest.fixture
+def tls_library_stand_in():
+    tls_library.reset()
+    yield tls_library
+    tls_library.reset()
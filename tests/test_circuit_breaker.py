@@ -0,0 +1,113 @@
+# Local Imports
+from src.v1.src.product import circuit_breaker
+from src.v1.src.product.circuit_breaker import CircuitBreaker
+
+# External Imports
+from types import SimpleNamespace
+
+import pytest
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=clock.monotonic))
+    # 5 requests in a 60 second window, half failing, opens the breaker for 30 seconds
+    monkeypatch.setattr(circuit_breaker, "product_breaker_window_seconds", 60)
+    monkeypatch.setattr(circuit_breaker, "product_breaker_min_requests", 5)
+    monkeypatch.setattr(circuit_breaker, "product_breaker_failure_rate", 0.5)
+    monkeypatch.setattr(circuit_breaker, "product_breaker_open_seconds", 30)
+    monkeypatch.setattr(circuit_breaker, "product_breaker_half_open_probes", 1)
+    return clock
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(5):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_breaker_opens_once_enough_requests_fail(clock):
+    # Too few requests to judge
+    breaker = CircuitBreaker("www.etsy.com")
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    # Under the failure rate, then at it
+    breaker = CircuitBreaker("www.depop.com")
+    for _ in range(3):
+        breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == 30
+    assert breaker.metrics()["totalRejected"] == 1
+
+
+def test_failures_outside_the_window_are_forgotten(clock):
+    breaker = CircuitBreaker("www.depop.com")
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 61
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+    assert breaker.metrics()["windowRequests"] == 1
+
+
+def test_half_open_probe_success_closes_the_breaker(clock):
+    breaker = CircuitBreaker("www.depop.com")
+    open_breaker(breaker)
+
+    clock.now += 30
+    # One probe is let through, anything else waits for its outcome
+    assert breaker.allow_request()
+    assert breaker.state == "half-open"
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.metrics()["windowRequests"] == 0
+    assert breaker.allow_request()
+
+
+def test_half_open_probe_failure_reopens_the_breaker(clock):
+    breaker = CircuitBreaker("www.depop.com")
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    # The cooldown starts again from the failed probe
+    assert breaker.state == "open"
+    assert breaker.retry_after() == 30
+    clock.now += 29
+    assert not breaker.allow_request()
+
+
+def test_cancelled_probe_lets_another_through(clock):
+    breaker = CircuitBreaker("www.depop.com")
+    open_breaker(breaker)
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_cancelled()
+
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
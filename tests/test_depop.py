@@ -0,0 +1,171 @@
+# Local Imports
+from src.v1.src.depop import handler, web_req
+from src.v1.src.handlers import add_and_update_store, update_items
+from src.v1.src.models import IUser
+
+# External Imports
+import threading
+import asyncio
+import pytest
+
+
+def depop_user(user_doc_factory, uid: str = "user-1", shop_id: str = "shop-1", watermark: str | None = None) -> IUser:
+    doc = user_doc_factory(uid, depop={"shopId": shop_id})
+    if watermark:
+        doc["store"]["storeMeta"]["depop"] = {
+            "lastFetchedDate": {"orders": "2025-03-08T00:00:00.000Z"},
+            "highWatermark": {"orders": watermark},
+        }
+    return add_and_update_store(IUser(**doc), "depop")
+
+
+def test_listing_sync_follows_the_cursor(fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory):
+    depop_stand_in.max_page_size = 2
+    user = depop_user(user_doc_factory)
+
+    res = asyncio.run(
+        handler.fetch_depop_listings(100, fake_db, user, fake_user_ref_factory({}), id_key="itemId")
+    )
+
+    # Five products over three pages, the sold one is skipped
+    assert len(depop_stand_in.requests) == 3
+    assert depop_stand_in.requests[1].params["after"] == "shop-1-310000001"
+    assert res["new"] == 4
+    reduced = next(item for item in res["content"] if item["itemId"] == "shop-1-310000001")
+    assert reduced["price"] == 20.0
+    assert reduced["depop"]["discountedPrice"] == 15.0
+    assert reduced["image"] == ["https://media-photos.depop.com/b1/310000001/P0_640.jpg"]
+
+
+def test_first_order_sync_reads_every_page(fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory):
+    depop_stand_in.max_page_size = 3
+    user = depop_user(user_doc_factory)
+
+    res = asyncio.run(handler.fetch_depop_orders(100, fake_db, user, fake_user_ref_factory({})))
+
+    assert len(res["content"]) == 10
+    assert res["watermark"] == "2025-03-10T12:00:00.000Z"
+
+
+def test_resumed_order_sync_stops_below_the_watermark(
+    fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory
+):
+    depop_stand_in.max_page_size = 2
+    user = depop_user(user_doc_factory, watermark="2025-03-07T12:00:00.000Z")
+
+    asyncio.run(handler.fetch_depop_orders(100, fake_db, user, fake_user_ref_factory({})))
+
+    # The second page (08, 07) still overlaps the watermark, the third (06, 05) is entirely below it
+    assert len(depop_stand_in.requests) == 3
+
+
+def test_resumed_order_sync_picks_up_refunds_without_new_orders(
+    fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory
+):
+    depop_stand_in.max_page_size = 2
+    first = asyncio.run(
+        handler.fetch_depop_orders(100, fake_db, depop_user(user_doc_factory), fake_user_ref_factory({}))
+    )
+    asyncio.run(fake_db.add_items("user-1", first["content"], "orders", "depop", "transactionId"))
+
+    # An order sold a week ago is refunded, which moves it to the top of the sold list
+    refunded = next(order for order in depop_stand_in.sold if order["id"] == 300000007)
+    refunded.update({"status": "Refunded", "date_updated": "2025-03-11T09:00:00.000Z"})
+    depop_stand_in.requests.clear()
+    user = depop_user(user_doc_factory, watermark=first["watermark"])
+
+    res = asyncio.run(handler.fetch_depop_orders(100, fake_db, user, fake_user_ref_factory({})))
+
+    # The first page has no new orders, but a changed one, so the sync reads on to the second page,
+    # which is entirely below the watermark
+    assert res["new"] == 0
+    assert [order["status"] for order in res["content"]] == ["Refunded"]
+    assert res["watermark"] == "2025-03-11T09:00:00.000Z"
+    assert len(depop_stand_in.requests) == 2
+
+
+def test_failed_page_fails_the_sync_and_keeps_the_watermark(
+    fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory
+):
+    depop_stand_in.max_page_size = 2
+    depop_stand_in.failing_request = 2
+    user = depop_user(user_doc_factory, watermark="2025-03-07T12:00:00.000Z")
+    user_ref = fake_user_ref_factory({})
+
+    with pytest.raises(Exception):
+        asyncio.run(
+            update_items("depop", "orders", "transactionId", fake_db, user, user_ref, {"automatic": 100}, None)
+        )
+
+    # The first page was newer than the watermark, but the sync didn't read down to it
+    assert len(depop_stand_in.requests) == 2
+    assert not any("highWatermark" in path for update in user_ref.updates for path in update)
+
+
+def test_many_shops_sync_under_the_host_limit(
+    fake_db, depop_stand_in, monkeypatch, user_doc_factory, fake_user_ref_factory
+):
+    monkeypatch.setattr(web_req, "depop_max_requests_per_host", 2)
+    depop_stand_in.max_page_size = 2
+    users = [depop_user(user_doc_factory, f"user-{index}", f"shop-{index}") for index in range(4)]
+
+    async def sync_shops():
+        return await asyncio.gather(
+            *(
+                handler.fetch_depop_listings(100, fake_db, user, fake_user_ref_factory({}), id_key="itemId")
+                for user in users
+            )
+        )
+
+    results = asyncio.run(sync_shops())
+
+    assert [res["new"] for res in results] == [4] * 4
+    # The shops were synced side by side, but never more than two requests were sent to Depop at once
+    assert depop_stand_in.peak_in_flight == 2
+
+
+def test_cookies_come_from_the_store_not_the_client(
+    fake_db, depop_stand_in, user_doc_factory, fake_user_ref_factory
+):
+    depop_stand_in.max_page_size = 2
+    depop_stand_in.set_cookie = "session=abc; Domain=webapi.depop.com; Path=/"
+
+    asyncio.run(
+        handler.fetch_depop_listings(
+            100, fake_db, depop_user(user_doc_factory), fake_user_ref_factory({}), id_key="itemId"
+        )
+    )
+
+    # The cookie is kept by the store and sent from there, the shared client never holds it
+    assert depop_stand_in.request_cookies == [None, "session=abc", "session=abc"]
+    assert len(web_req.client.cookies) == 0
+
+
+def test_persisted_cookies_load_off_the_event_loop(tmp_path, monkeypatch):
+    from src.v1.src.depop.cookies import CookieStore
+
+    path = str(tmp_path / "cookies.db")
+    writer = CookieStore(path)
+
+    async def persist():
+        writer.update("webapi.depop.com", {"session": "abc"})
+        await writer.flush()
+
+    asyncio.run(persist())
+    reader = CookieStore(path)
+    loaded_on = []
+    load = reader._load
+
+    def record_load(domain):
+        loaded_on.append(threading.current_thread())
+        load(domain)
+
+    monkeypatch.setattr(reader, "_load", record_load)
+
+    async def get_twice():
+        return await reader.aget("webapi.depop.com"), await reader.aget("webapi.depop.com")
+
+    assert asyncio.run(get_twice()) == ({"session": "abc"}, {"session": "abc"})
+    # Loaded once, in a worker thread
+    assert len(loaded_on) == 1
+    assert loaded_on[0] is not threading.main_thread()
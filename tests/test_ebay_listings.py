@@ -0,0 +1,118 @@
+# Local Imports
+from src.v1.src.ebay import handler
+from src.v1.src.handlers import add_and_update_store
+from src.v1.src.models import IUser
+
+# External Imports
+import asyncio
+
+import pytest
+
+
+def make_listing(item_id: str, quantity: int = 1) -> dict:
+    """A listing in the GetMyeBaySelling ActiveList shape."""
+    return {
+        "ItemID": item_id,
+        "QuantityAvailable": str(quantity),
+        "Quantity": str(quantity),
+        "BuyItNowPrice": {"_currencyID": "GBP", "value": "10.0"},
+        "ListingDetails": {
+            "StartTime": "2025-02-20T09:14:03.000Z",
+            "ViewItemURL": f"https://www.ebay.co.uk/itm/{item_id}",
+        },
+        "PictureDetails": {"GalleryURL": f"https://i.ebayimg.com/{item_id}.jpg"},
+        "Title": f"Listing {item_id}",
+        "SellingStatus": {"CurrentPrice": {"_currencyID": "GBP", "value": "10.0"}},
+        "ListingType": "FixedPriceItem",
+    }
+
+
+def page_of(listings: list[dict], total_pages: int, total_entries: int, has_errors: bool = False):
+    return listings, {"total_pages": total_pages, "total_entries": total_entries, "has_errors": has_errors}
+
+
+@pytest.fixture
+def active_list(monkeypatch):
+    """Stand in for GetMyeBaySelling, returning the given pages in turn."""
+    pages = []
+
+    async def fetch_listings_from_ebay(oauth_token, page_size, page):
+        return pages[page - 1] if page <= len(pages) else page_of([], 0, 0)
+
+    monkeypatch.setattr(handler, "fetch_listings_from_ebay", fetch_listings_from_ebay)
+    return pages
+
+
+@pytest.fixture
+def stored(fake_db):
+    """Two listings stored by an earlier sync, "stale" has since ended on eBay."""
+    listings = fake_db.collection("inventory", "ebay")
+    for item_id in ("live", "stale"):
+        listings[item_id] = {"itemId": item_id, "recordType": "automatic"}
+    return listings
+
+
+def sweep(fake_db, user_doc_factory, fake_user_ref_factory):
+    doc = user_doc_factory(ebay={"ebayAccessToken": "token", "ebayRefreshToken": "r", "ebayTokenExpiry": 0})
+    user = add_and_update_store(IUser(**doc), "ebay")
+    return asyncio.run(
+        handler.fetch_ebay_listings(48, fake_db, user, fake_user_ref_factory(doc), id_key="itemId")
+    )
+
+
+def test_complete_sweep_removes_ended_listings(
+    fake_db, stored, active_list, user_doc_factory, fake_user_ref_factory
+):
+    active_list.extend([
+        page_of([make_listing("live"), make_listing("new-1")], 2, 3),
+        page_of([make_listing("new-2")], 2, 3),
+    ])
+
+    res = sweep(fake_db, user_doc_factory, fake_user_ref_factory)
+
+    assert "stale" not in stored
+    assert "live" in stored
+    assert res["full_sweep"]
+    # Two new listings, one removed
+    assert res["new"] == 1
+
+
+@pytest.mark.parametrize(
+    "pages",
+    [
+        # The second page came back empty
+        [page_of([make_listing("live")], 2, 2), page_of([], 2, 2)],
+        # eBay returned fewer listings than it counted
+        [page_of([make_listing("live")], 1, 2)],
+        # A listing ended mid-sweep and the pages shifted
+        [page_of([make_listing("live")], 2, 3), page_of([make_listing("new-1")], 1, 2)],
+        # The response carried an error
+        [page_of([make_listing("live")], 1, 1, has_errors=True)],
+    ],
+    ids=["empty-page", "short-count", "shifted-pages", "errors"],
+)
+def test_incomplete_sweep_removes_nothing(
+    pages, fake_db, stored, active_list, user_doc_factory, fake_user_ref_factory
+):
+    active_list.extend(pages)
+
+    res = sweep(fake_db, user_doc_factory, fake_user_ref_factory)
+
+    assert set(stored) >= {"live", "stale"}
+    assert not res["full_sweep"]
+
+
+def test_failed_sweep_removes_nothing(
+    fake_db, stored, monkeypatch, user_doc_factory, fake_user_ref_factory
+):
+    async def fetch_listings_from_ebay(oauth_token, page_size, page):
+        if page == 2:
+            raise ConnectionError("GetMyeBaySelling failed")
+        return page_of([make_listing("live")], 2, 2)
+
+    monkeypatch.setattr(handler, "fetch_listings_from_ebay", fetch_listings_from_ebay)
+
+    with pytest.raises(ConnectionError):
+        sweep(fake_db, user_doc_factory, fake_user_ref_factory)
+
+    assert set(stored) == {"live", "stale"}
@@ -0,0 +1,225 @@
+# Local Imports
+from src.v1.src.ebay import notifications, tokens, account
+from src.v1.src.models import EbayTokenData, RefreshEbayTokenData
+from src.v1.src.utils import format_date_to_iso
+
+# External Imports
+from datetime import datetime, timezone, timedelta
+
+import asyncio
+
+import pytest
+
+
+def now_iso(offset_minutes: int = 0) -> str:
+    return format_date_to_iso(datetime.now(timezone.utc) + timedelta(minutes=offset_minutes))
+
+
+def ebay_account(expiry_offset_seconds: int = 3600, ebay_user_id: str | None = "test_seller_uk") -> dict:
+    return {
+        "ebayAccessToken": "stored-access-token",
+        "ebayRefreshToken": "stored-refresh-token",
+        "ebayTokenExpiry": int(datetime.now(timezone.utc).timestamp()) + expiry_offset_seconds,
+        "ebayUserId": ebay_user_id,
+    }
+
+
+@pytest.fixture
+def seller(fake_db, user_doc_factory, fake_user_ref_factory):
+    """A user with a connected eBay account and the notification's listing stored."""
+    user_ref = fake_user_ref_factory(user_doc_factory(ebay=ebay_account()))
+    fake_db.users_by_ebay_id["test_seller_uk"] = user_ref
+    fake_db.collection("inventory", "ebay")["226154890123"] = {
+        "itemId": "226154890123",
+        "name": "Nike Air Max 90 UK 9 White",
+        "currency": "GBP",
+        "dateListed": "2025-02-20T09:14:03.000Z",
+        "image": ["https://i.ebayimg.com/images/g/abcAAOSw1234/s-l140.jpg"],
+        "initialQuantity": 3,
+        "price": 24.99,
+        "quantity": 3,
+        "recordType": "automatic",
+        "url": "https://www.ebay.co.uk/itm/226154890123",
+        "purchase": {"platform": "Vinted", "price": 12.0},
+    }
+    return user_ref
+
+
+def replay(replay_notification, name: str) -> dict:
+    notification = notifications.parse_ebay_notification(replay_notification(name, now_iso()))
+    assert notifications.verify_ebay_notification_signature(notification)
+    return notification
+
+
+# --------------------------------------------------- #
+# Parsing and Verification                            #
+# --------------------------------------------------- #
+
+
+def test_parse_order_notification(replay_notification):
+    notification = notifications.parse_ebay_notification(
+        replay_notification("fixed_price_transaction", "2025-03-04T18:22:41.172Z")
+    )
+
+    assert notification["event"] == "FixedPriceTransaction"
+    assert notification["recipient"] == "test_seller_uk"
+    assert notification["timestamp"] == "2025-03-04T18:22:41.172Z"
+
+    transaction = notification["payload"]["TransactionArray"]["Transaction"]
+    assert transaction["TransactionID"] == "2937486015"
+    assert transaction["TransactionPrice"] == {"_currencyID": "GBP", "value": "24.99"}
+
+
+def test_parse_rejects_malformed_body():
+    assert notifications.parse_ebay_notification(b"<soapenv:Envelope>") is None
+
+
+def test_verify_accepts_replayed_signature(replay_notification):
+    notification = notifications.parse_ebay_notification(
+        replay_notification("fixed_price_transaction", now_iso())
+    )
+    assert notifications.verify_ebay_notification_signature(notification)
+
+
+def test_verify_rejects_wrong_signature(replay_notification):
+    notification = notifications.parse_ebay_notification(
+        replay_notification("fixed_price_transaction", now_iso(), signature="bm90IGVCYXk=")
+    )
+    assert not notifications.verify_ebay_notification_signature(notification)
+
+
+def test_verify_rejects_old_notification(replay_notification):
+    notification = notifications.parse_ebay_notification(
+        replay_notification("fixed_price_transaction", now_iso(offset_minutes=-60))
+    )
+    assert not notifications.verify_ebay_notification_signature(notification)
+
+
+# --------------------------------------------------- #
+# Applying Notifications                              #
+# --------------------------------------------------- #
+
+
+def test_apply_order_notification_adds_the_transaction(fake_db, seller, replay_notification):
+    notification = replay(replay_notification, "fixed_price_transaction")
+
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+
+    order = fake_db.collection("orders", "ebay")["2937486015"]
+    assert order["orderId"] == "17-12873-40566"
+    assert order["status"] == "Completed"
+    assert order["sale"]["price"] == 24.99
+    assert order["sale"]["buyerUsername"] == "test_buyer_42"
+    assert order["purchase"]["platform"] == "Vinted"
+    assert order["shipping"]["fees"] == 3.99
+
+    # The order counts are updated, but the polled sync cursor is left alone
+    assert seller.data["store"]["numOrders"]["totalAutomatic"] == 1
+    assert not any("lastFetchedDate" in path for update in seller.updates for path in update)
+
+
+def test_apply_order_notification_twice_writes_once(fake_db, seller, replay_notification):
+    notification = replay(replay_notification, "fixed_price_transaction")
+
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+
+    assert len(fake_db.collection("orders", "ebay")) == 1
+    assert seller.data["store"]["numOrders"]["totalAutomatic"] == 1
+
+
+def test_apply_listing_notification_updates_the_listing(fake_db, seller, replay_notification):
+    notification = replay(replay_notification, "item_revised")
+
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+
+    listing = fake_db.collection("inventory", "ebay")["226154890123"]
+    assert listing["price"] == 21.5
+    assert listing["quantity"] == 2
+
+
+def test_apply_ignores_unknown_recipient(fake_db, replay_notification):
+    notification = replay(replay_notification, "fixed_price_transaction")
+
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+
+    assert fake_db.collection("orders", "ebay") == {}
+
+
+def test_apply_refreshes_an_expired_token(
+    fake_db, seller, replay_notification, monkeypatch
+):
+    seller.data["connectedAccounts"]["ebay"] = ebay_account(expiry_offset_seconds=-60)
+    notification = replay(replay_notification, "fixed_price_transaction")
+
+    async def refresh_ebay_access_token(refresh_token, client_id, client_secret):
+        return RefreshEbayTokenData(
+            data=EbayTokenData(access_token="fresh-access-token", expires_in=7200, refresh_token=refresh_token),
+            error=None,
+        )
+
+    used_tokens = []
+    process_orders = notifications.process_orders
+
+    async def record_process_orders(orders, db, uid, oauth_token, *args):
+        used_tokens.append(oauth_token)
+        return await process_orders(orders, db, uid, oauth_token, *args)
+
+    monkeypatch.setattr(tokens, "refresh_ebay_access_token", refresh_ebay_access_token)
+    monkeypatch.setattr(notifications, "process_orders", record_process_orders)
+
+    asyncio.run(notifications.apply_ebay_notification(notification, fake_db))
+
+    assert used_tokens == ["fresh-access-token"]
+    assert fake_db.tokens == [("ebay", "fresh-access-token")]
+
+
+# --------------------------------------------------- #
+# Worker and Registration                             #
+# --------------------------------------------------- #
+
+
+def test_worker_applies_queued_notifications_before_stopping(monkeypatch):
+    applied = []
+
+    async def apply_ebay_notification(notification, db):
+        await asyncio.sleep(0)
+        applied.append(notification["event"])
+
+    monkeypatch.setattr(notifications, "apply_ebay_notification", apply_ebay_notification)
+    monkeypatch.setattr(notifications, "get_db", lambda: None)
+
+    async def run():
+        notifications.start_notification_worker()
+        await notifications.enqueue_ebay_notification({"event": "FixedPriceTransaction"})
+        await notifications.enqueue_ebay_notification({"event": "ItemRevised"})
+        await notifications.stop_notification_worker()
+
+    asyncio.run(run())
+
+    assert applied == ["FixedPriceTransaction", "ItemRevised"]
+    assert not notifications.notification_worker_running()
+
+
+def test_enqueue_without_worker_is_refused():
+    with pytest.raises(RuntimeError):
+        asyncio.run(notifications.enqueue_ebay_notification({"event": "ItemRevised"}))
+
+
+def test_register_stores_the_ebay_user_id_and_subscribes(
+    fake_db, user_doc_factory, fake_user_ref_factory, monkeypatch
+):
+    from src.v1.src.models import IUser
+
+    user_ref = fake_user_ref_factory(user_doc_factory(ebay=ebay_account(ebay_user_id=None)))
+    subscribed = []
+    monkeypatch.setattr(account, "fetch_ebay_user_id", lambda token: "test_seller_uk")
+    monkeypatch.setattr(account, "subscribe_to_ebay_notifications", subscribed.append)
+
+    user = asyncio.run(
+        account.register_ebay_account(fake_db, user_ref, IUser(**user_ref.data))
+    )
+
+    assert user.connectedAccounts.ebay.ebayUserId == "test_seller_uk"
+    assert user_ref.data["connectedAccounts"]["ebay"]["ebayUserId"] == "test_seller_uk"
+    assert subscribed == ["stored-access-token"]
@@ -0,0 +1,242 @@
+# Local Imports
+from src.v1.src.ebay import handler
+from src.v1.src.cache import TTLCache
+
+# External Imports
+import asyncio
+
+import pytest
+
+
+def make_order(transaction_id: str, item_id: str, modified: str = "2025-03-04T18:22:39.000Z") -> dict:
+    """An order in the GetOrders shape, with a single transaction."""
+    return {
+        "OrderID": f"order-{transaction_id}",
+        "OrderStatus": "Completed",
+        "Subtotal": {"_currencyID": "GBP", "value": "10.0"},
+        "Total": {"_currencyID": "GBP", "value": "12.0"},
+        "AmountPaid": {"_currencyID": "GBP", "value": "12.0"},
+        "CheckoutStatus": {"LastModifiedTime": modified},
+        "CreatedTime": "2025-03-04T18:21:57.000Z",
+        "BuyerUserID": "test_buyer",
+        "ShippingDetails": {"ShippingServiceOptions": {"ShippingServiceCost": {"value": "2.0"}}},
+        "TransactionArray": {
+            "Transaction": {
+                "Item": {"ItemID": item_id, "Title": "Test item"},
+                "TransactionID": transaction_id,
+                "QuantityPurchased": "1",
+                "TransactionPrice": {"_currencyID": "GBP", "value": "10.0"},
+            }
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_listing_cache(monkeypatch):
+    monkeypatch.setattr(handler, "listing_details_cache", TTLCache(100, 60))
+
+
+@pytest.fixture
+def get_item_calls(monkeypatch):
+    """Stand in for GetItem, item ids starting with "missing" aren't found."""
+    calls = []
+
+    def fetch_listing_details_from_ebay(item_id, oauth_token):
+        calls.append(item_id)
+        if item_id.startswith("missing"):
+            return {}
+        return {"image": f"https://i.ebayimg.com/{item_id}.jpg", "dateListed": "2025-01-01T00:00:00.000Z"}
+
+    monkeypatch.setattr(handler, "fetch_listing_details_from_ebay", fetch_listing_details_from_ebay)
+    return calls
+
+
+def process(orders, fake_db, available_slots=10):
+    return asyncio.run(
+        handler.process_orders(orders, fake_db, "user-1", "token", 0, 0, available_slots)
+    )
+
+
+def test_orders_for_the_same_listing_look_it_up_once(fake_db, get_item_calls):
+    orders = [make_order(str(index), "1001") for index in range(3)]
+
+    items, *_ = process(orders, fake_db)
+
+    assert get_item_calls == ["1001"]
+    assert [item["image"] for item in items] == [["https://i.ebayimg.com/1001.jpg"]] * 3
+
+
+def test_stored_listings_are_read_in_one_query(fake_db, get_item_calls):
+    for item_id in ("2001", "2002"):
+        fake_db.collection("inventory", "ebay")[item_id] = {
+            "itemId": item_id, "image": [f"stored-{item_id}.jpg"], "purchase": {"price": 4.0}
+        }
+    orders = [make_order("1", "2001"), make_order("2", "2002"), make_order("3", "2001")]
+
+    items, *_ = process(orders, fake_db)
+
+    # One read for the orders on the page, one for the listings they reference
+    assert fake_db.reads == 2
+    assert get_item_calls == []
+    assert [item["image"] for item in items] == [["stored-2001.jpg"], ["stored-2002.jpg"], ["stored-2001.jpg"]]
+    assert all(item["purchase"]["price"] == 4.0 for item in items)
+
+
+def test_slots_stay_correct_when_new_orders_are_built_concurrently(fake_db, monkeypatch):
+    built, running = [], {"now": 0, "peak": 0}
+
+    async def handle_new_order(db, uid, oauth_token, order, transaction, listings=None):
+        transaction_id = transaction["TransactionID"]
+        built.append(transaction_id)
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        # Later orders finish first, and "failed" can't be built
+        await asyncio.sleep(0.01 * (10 - int(transaction_id[-1])))
+        running["now"] -= 1
+        if transaction_id.startswith("failed"):
+            return None
+        return {"transactionId": transaction_id, "sale": {"date": handler.format_date_to_iso(handler.datetime.now(handler.timezone.utc))}}
+
+    monkeypatch.setattr(handler, "handle_new_order", handle_new_order)
+    fake_db.collection("orders", "ebay")["stored-4"] = {
+        "transactionId": "stored-4", "status": "Completed", "sale": {"price": 10.0, "quantity": 1}
+    }
+    orders = [
+        make_order("failed-1", "1001"),
+        make_order("new-2", "1002"),
+        make_order("new-3", "1003"),
+        make_order("stored-4", "1004"),
+        make_order("new-5", "1005"),
+    ]
+
+    items, new_count, old_count, available_slots = process(orders, fake_db, available_slots=2)
+
+    # The failed order's slot goes to the next new order, and nothing after the cutoff is built
+    assert built == ["failed-1", "new-2", "new-3"]
+    assert running["peak"] == 2
+    assert [item["transactionId"] for item in items] == ["new-2", "new-3"]
+    assert (new_count, old_count, available_slots) == (2, 0, 0)
+    # The stored and modified orders were read in one query
+    assert fake_db.reads == 2
+
+
+def test_failed_lookups_are_not_cached(fake_db, get_item_calls):
+    asyncio.run(handler.get_listing_details("missing-1", "token"))
+    asyncio.run(handler.get_listing_details("missing-1", "token"))
+
+    assert get_item_calls == ["missing-1", "missing-1"]
+    assert handler.listing_details_cache.get("missing-1") is None
+
+
+def test_sqlite_tier_is_used_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = TTLCache(10, 60, path, "listings")
+
+    asyncio.run(cache.aset("1001", {"image": "a.jpg"}))
+
+    # A new cache on the same file only has the entry on disk
+    reopened = TTLCache(10, 60, path, "listings")
+    assert asyncio.run(reopened.aget("1001")) == {"image": "a.jpg"}
+    assert reopened.get("1001") == {"image": "a.jpg"}
+
+
+# --------------------------------------------------- #
+# Resuming Order Syncs                                #
+# --------------------------------------------------- #
+
+
+def resumed_user(user_doc_factory, watermark: str):
+    from src.v1.src.handlers import add_and_update_store
+    from src.v1.src.models import IUser
+
+    doc = user_doc_factory(ebay={"ebayAccessToken": "token", "ebayRefreshToken": "r", "ebayTokenExpiry": 0})
+    doc["store"]["storeMeta"]["ebay"] = {
+        "lastFetchedDate": {"orders": handler.format_date_to_iso(handler.datetime.now(handler.timezone.utc))},
+        "highWatermark": {"orders": watermark},
+    }
+    return add_and_update_store(IUser(**doc), "ebay")
+
+
+@pytest.fixture
+def get_orders_pages(monkeypatch):
+    """Stand in for GetOrders, returning the given pages in turn and recording each request."""
+    requests, pages = [], []
+
+    async def fetch_orders_from_ebay(oauth_token, time_from, key, page_size, page):
+        requests.append({"time_from": time_from, "key": key, "page": page})
+        return pages[page - 1], page < len(pages)
+
+    monkeypatch.setattr(handler, "fetch_orders_from_ebay", fetch_orders_from_ebay)
+    return requests, pages
+
+
+def test_resumed_order_sync_is_bounded_by_the_watermark(
+    fake_db, user_doc_factory, fake_user_ref_factory, get_item_calls, get_orders_pages
+):
+    requests, pages = get_orders_pages
+    watermark = handler.format_date_to_iso(
+        handler.datetime.now(handler.timezone.utc) - handler.timedelta(hours=2)
+    )
+    pages.append([make_order("1", "1001", modified=watermark)])
+    user = resumed_user(user_doc_factory, watermark)
+
+    asyncio.run(handler.fetch_ebay_orders(10, fake_db, user, fake_user_ref_factory({})))
+
+    expected_from = handler.parse_iso_date(watermark) - handler.timedelta(
+        minutes=handler.ebay_order_watermark_overlap_minutes
+    )
+    assert requests[0]["key"] == "ModTimeFrom"
+    assert handler.parse_iso_date(requests[0]["time_from"]) == expected_from
+
+
+def test_stale_watermark_is_clamped_to_the_mod_time_window(
+    fake_db, user_doc_factory, fake_user_ref_factory, get_item_calls, get_orders_pages
+):
+    requests, pages = get_orders_pages
+    pages.append([])
+    now = handler.datetime.now(handler.timezone.utc)
+    # A quiet seller, nothing has been modified for two months
+    user = resumed_user(user_doc_factory, handler.format_date_to_iso(now - handler.timedelta(days=60)))
+
+    asyncio.run(handler.fetch_ebay_orders(10, fake_db, user, fake_user_ref_factory({})))
+
+    assert requests[0]["key"] == "ModTimeFrom"
+    time_from = handler.parse_iso_date(requests[0]["time_from"])
+    window_start = now - handler.timedelta(days=handler.ebay_order_mod_time_window_days)
+    assert window_start < time_from < window_start + handler.timedelta(hours=1)
+
+
+def test_order_sync_keeps_paging_past_orders_below_the_watermark(
+    fake_db, user_doc_factory, fake_user_ref_factory, get_item_calls, get_orders_pages
+):
+    requests, pages = get_orders_pages
+    watermark = "2025-03-04T18:00:00.000Z"
+    stored_order = make_order("1", "1001", modified="2025-03-04T17:00:00.000Z")
+    # An older order, sorted onto a later page, which was refunded after the watermark
+    refunded_order = make_order("2", "1002", modified="2025-03-05T09:00:00.000Z")
+    refunded_order["OrderStatus"] = "Cancelled"
+    pages.extend([[stored_order], [refunded_order]])
+
+    items, *_ = process([stored_order, make_order("2", "1002")], fake_db)
+    asyncio.run(fake_db.add_items("user-1", items, "orders", "ebay", "transactionId"))
+    user = resumed_user(user_doc_factory, watermark)
+
+    res = asyncio.run(handler.fetch_ebay_orders(10, fake_db, user, fake_user_ref_factory({})))
+
+    assert [request["page"] for request in requests] == [1, 2]
+    updated = {item["transactionId"]: item for item in res["content"]}
+    assert updated["2"]["status"] == "Cancelled"
+    assert res["watermark"] == "2025-03-05T09:00:00.000Z"
+
+
+def test_watermark_is_kept_when_the_slots_run_out(
+    fake_db, user_doc_factory, fake_user_ref_factory, get_item_calls, get_orders_pages
+):
+    requests, pages = get_orders_pages
+    pages.extend([[make_order("1", "1001", modified="2025-03-05T09:00:00.000Z")], [make_order("2", "1002")]])
+    user = resumed_user(user_doc_factory, "2025-03-04T18:00:00.000Z")
+
+    res = asyncio.run(handler.fetch_ebay_orders(1, fake_db, user, fake_user_ref_factory({})))
+
+    assert len(requests) == 1
+    assert res["watermark"] is None
@@ -0,0 +1,39 @@
+# Local Imports
+from src.v1.src.pagination import PaginationPolicy
+
+
+def test_page_size_follows_the_slots_left():
+    pagination = PaginationPolicy(min_page_size=5, max_page_size=200)
+
+    # 3 slots with the default headroom is 4 items, which is raised to the provider's minimum
+    assert pagination.next_page_size(3) == 5
+    assert pagination.next_page_size(40) == 50
+    assert pagination.next_page_size(1000) == 200
+    assert pagination.next_page_size(0) == 5
+
+
+def test_page_size_grows_when_few_fetched_items_are_new():
+    pagination = PaginationPolicy(min_page_size=5, max_page_size=200)
+    pagination.record_page(fetched_count=20, new_count=5)
+
+    # A quarter were new, so 4 times as many are requested to fill 10 slots
+    assert pagination.new_ratio == 0.25
+    assert pagination.next_page_size(10) == 50
+
+
+def test_new_ratio_has_a_floor():
+    pagination = PaginationPolicy(min_page_size=5, max_page_size=200)
+    pagination.record_page(fetched_count=50, new_count=0)
+
+    # Nothing new yet, but the page size is capped by the minimum ratio rather than unbounded
+    assert pagination.next_page_size(10) == 125
+
+
+def test_fixed_page_size_is_chosen_once():
+    pagination = PaginationPolicy.for_provider("ebay", "orders")
+
+    first = pagination.next_page_size(10)
+    pagination.record_page(fetched_count=first, new_count=first)
+
+    assert first == 25
+    assert pagination.next_page_size(1) == first
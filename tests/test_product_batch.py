@@ -0,0 +1,105 @@
+# Local Imports
+from src.v1.src.product import batch
+from src.v1.src.product.send_request import ProductFetchError
+
+# External Imports
+from urllib.parse import urlsplit
+
+import asyncio
+import pytest
+import json
+
+
+class ProductStandIn:
+    """Stands in for retrieve_product_data, tracking how many fetches run at once."""
+
+    def __init__(self) -> None:
+        self.delays: dict[str, float] = {}
+        self.failures: dict[str, ProductFetchError] = {}
+        self.fetched: list[str] = []
+        self.in_flight: dict[str, int] = {}
+        self.peak_per_domain: dict[str, int] = {}
+        self.peak_in_flight = 0
+
+    async def retrieve_product_data(self, url: str) -> dict:
+        domain = urlsplit(url).netloc
+        self.fetched.append(url)
+        self.in_flight[domain] = self.in_flight.get(domain, 0) + 1
+        self.peak_per_domain[domain] = max(self.peak_per_domain.get(domain, 0), self.in_flight[domain])
+        self.peak_in_flight = max(self.peak_in_flight, sum(self.in_flight.values()))
+        try:
+            await asyncio.sleep(self.delays.get(url, 0.01))
+            if url in self.failures:
+                raise self.failures[url]
+            return {"title": f"Product at {url}", "url": url}
+        finally:
+            self.in_flight[domain] -= 1
+
+
+@pytest.fixture
+def products(monkeypatch):
+    stand_in = ProductStandIn()
+    monkeypatch.setattr(batch, "retrieve_product_data", stand_in.retrieve_product_data)
+    monkeypatch.setattr(batch, "global_semaphore", None)
+    monkeypatch.setattr(batch, "domain_semaphores", {})
+    return stand_in
+
+
+def stream(urls: list[str]) -> list[dict]:
+    async def read_lines():
+        return [line async for line in batch.stream_product_results(urls)]
+
+    lines = asyncio.run(read_lines())
+    assert all(line.endswith("\n") for line in lines)
+    return [json.loads(line) for line in lines]
+
+
+def test_urls_for_the_same_product_are_fetched_once(products):
+    results = stream(
+        [
+            "https://www.depop.com/products/a/",
+            "https://www.depop.com/products/a/",
+            "https://www.depop.com/products/a/?utm_source=ig",
+            "https://www.depop.com/products/b/",
+        ]
+    )
+
+    # Exact duplicates get one result, links which only differ by tracking parameters get one each
+    assert sorted(result["url"] for result in results) == [
+        "https://www.depop.com/products/a/",
+        "https://www.depop.com/products/a/?utm_source=ig",
+        "https://www.depop.com/products/b/",
+    ]
+    assert all(result["success"] for result in results)
+    assert sorted(products.fetched) == ["https://www.depop.com/products/a/", "https://www.depop.com/products/b/"]
+    tracked = next(result for result in results if "utm_source" in result["url"])
+    assert tracked["product"]["url"] == "https://www.depop.com/products/a/?utm_source=ig"
+
+
+def test_fetches_stay_under_the_domain_and_global_limits(products, monkeypatch):
+    monkeypatch.setattr(batch, "product_batch_max_per_domain", 2)
+    monkeypatch.setattr(batch, "product_batch_max_concurrency", 3)
+    urls = [f"https://{domain}/products/{i}/" for domain in ("www.depop.com", "www.etsy.com") for i in range(6)]
+
+    results = stream(urls)
+
+    assert len(results) == 12
+    assert products.peak_per_domain == {"www.depop.com": 2, "www.etsy.com": 2}
+    assert products.peak_in_flight == 3
+
+
+def test_results_stream_as_they_complete_with_error_lines(products):
+    slow, fast, failing = (
+        "https://www.depop.com/products/slow/",
+        "https://www.etsy.com/listing/fast",
+        "https://www.vinted.co.uk/items/gone",
+    )
+    products.delays = {slow: 0.1, fast: 0.01, failing: 0.05}
+    products.failures[failing] = ProductFetchError("not_found", "gone", "www.vinted.co.uk", status=404)
+
+    results = stream([slow, fast, failing])
+
+    assert [result["url"] for result in results] == [fast, failing, slow]
+    assert results[1]["success"] is False
+    assert results[1]["details"]["code"] == "not_found"
+    assert results[2]["success"] is True
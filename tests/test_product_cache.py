@@ -0,0 +1,127 @@
+# Local Imports
+from src.v1.src.cache import TTLCache
+from src.v1.src.constants import product_cache_fresh_seconds
+from src.v1.src.product import cache
+from src.v1.src.product.send_request import ProductFetchError
+
+# External Imports
+import asyncio
+import pytest
+import time
+
+
+URL = "https://www.depop.com/products/seller-jacket/"
+
+
+class ProductPages:
+    """Stands in for fetch_page, serving a product page whose title can be changed."""
+
+    def __init__(self) -> None:
+        self.title = "Jacket"
+        self.error: ProductFetchError | None = None
+        self.calls: list[dict] = []
+
+    async def fetch_page(self, url: str, head_only: bool = False, etag=None, last_modified=None):
+        self.calls.append({"url": url, "etag": etag})
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        html = f"<head><meta property='og:title' content='{self.title}'></head>"
+        return {"html": html, "not_modified": False, "etag": '"v1"', "last_modified": None}
+
+
+@pytest.fixture
+def product_pages(monkeypatch):
+    pages = ProductPages()
+    monkeypatch.setattr(cache, "fetch_page", pages.fetch_page)
+    monkeypatch.setattr(cache, "product_cache", TTLCache(10, 60))
+    monkeypatch.setattr(cache, "negative_cache", TTLCache(10, 60))
+    monkeypatch.setattr(cache, "fetches_in_flight", {})
+    return pages
+
+
+def cached_entry(title: str, age_seconds: float) -> dict:
+    return {
+        "data": {"title": title, "url": URL},
+        "etag": '"v0"',
+        "lastModified": None,
+        "fetchedAt": time.time() - age_seconds,
+    }
+
+
+def test_canonical_urls_drop_tracking_parameters_only():
+    assert (
+        cache.canonicalise_url("HTTPS://WWW.Depop.com/products/a/?utm_source=ig&size=M&fbclid=1&colour=red#photos")
+        == "https://www.depop.com/products/a/?colour=red&size=M"
+    )
+    # ref is a real parameter on some sites, e.g. a variant or listing reference
+    assert cache.canonicalise_url("https://shop.example/item?ref=blue") == "https://shop.example/item?ref=blue"
+
+
+def test_fresh_entries_are_served_without_a_request(product_pages):
+    key = cache.canonicalise_url(URL)
+    cache.product_cache.set(key, cached_entry("Cached jacket", age_seconds=10))
+
+    data = asyncio.run(cache.retrieve_product_data(URL + "?utm_source=ig"))
+
+    assert data == {"title": "Cached jacket", "url": URL + "?utm_source=ig"}
+    assert product_pages.calls == []
+
+
+def test_stale_entries_are_served_and_revalidated_in_the_background(product_pages):
+    key = cache.canonicalise_url(URL)
+    cache.product_cache.set(key, cached_entry("Old jacket", age_seconds=product_cache_fresh_seconds + 1))
+    product_pages.title = "New jacket"
+
+    async def retrieve_then_wait():
+        data = await cache.retrieve_product_data(URL)
+        await asyncio.gather(*cache.fetches_in_flight.values())
+        return data
+
+    # The stale entry is returned straight away, the refresh is conditional on its etag
+    assert asyncio.run(retrieve_then_wait())["title"] == "Old jacket"
+    assert product_pages.calls == [{"url": URL, "etag": '"v0"'}]
+    assert cache.product_cache.get(key)["data"]["title"] == "New jacket"
+
+
+def test_expired_entries_are_fetched_again(product_pages):
+    key = cache.canonicalise_url(URL)
+    cache.product_cache.set(key, cached_entry("Old jacket", age_seconds=0), ttl_seconds=0.01)
+    time.sleep(0.02)
+
+    data = asyncio.run(cache.retrieve_product_data(URL))
+
+    assert data["title"] == "Jacket"
+    assert product_pages.calls == [{"url": URL, "etag": None}]
+
+
+def test_concurrent_callers_share_one_fetch(product_pages):
+    async def retrieve_together():
+        waiters = [asyncio.create_task(cache.retrieve_product_data(URL + f"?utm_source={i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        # One caller giving up doesn't cancel the fetch the others are waiting on
+        waiters[0].cancel()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    cancelled, *results = asyncio.run(retrieve_together())
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert [data["title"] for data in results] == ["Jacket", "Jacket"]
+    assert len(product_pages.calls) == 1
+
+
+def test_caller_joining_a_failed_revalidation_gets_the_error(product_pages):
+    key = cache.canonicalise_url(URL)
+    cache.product_cache.set(key, cached_entry("Old jacket", age_seconds=product_cache_fresh_seconds + 1))
+    product_pages.error = ProductFetchError("upstream_status", "blocked", "www.depop.com", status=403)
+
+    async def retrieve_as_the_entry_expires():
+        stale = await cache.retrieve_product_data(URL)
+        cache.product_cache.delete(key)
+        # The entry has gone, so this caller joins the revalidation which is still running
+        with pytest.raises(ProductFetchError):
+            await cache.retrieve_product_data(URL)
+        return stale
+
+    assert asyncio.run(retrieve_as_the_entry_expires())["title"] == "Old jacket"
+    assert len(product_pages.calls) == 1
@@ -0,0 +1,72 @@
+# Local Imports
+from src.v1.src.product import circuit_breaker, send_request
+
+# External Imports
+import asyncio
+import pytest
+
+
+PAGE = "<html><head><title>Café jacket</title></head><body>" + "x" * 100 + "</body></html>"
+
+
+@pytest.fixture
+def product_site(tls_library_stand_in, monkeypatch):
+    monkeypatch.setattr(send_request, "product_head_max_bytes", 16)
+    monkeypatch.setattr(send_request, "ranges_ignored", {})
+    monkeypatch.setattr(circuit_breaker, "circuit_breakers", {})
+    return tls_library_stand_in
+
+
+def serve(site, honour_range: bool, content_type: str = "text/html; charset=utf-8"):
+    def respond(payload):
+        headers = {"Content-Type": [content_type]}
+        if honour_range and "Range" in payload["headers"]:
+            body = PAGE.encode()[:16]
+            return {"status": 206, "headers": headers, "body": body}
+        return {"status": 200, "headers": headers, "body": PAGE}
+
+    site.respond = respond
+
+
+def test_ranged_page_is_requested_uncompressed(product_site):
+    serve(product_site, honour_range=True)
+
+    page = asyncio.run(send_request.fetch_page("https://shop.example/products/1", head_only=True))
+
+    headers = product_site.requests[0]["headers"]
+    assert headers["Range"] == "bytes=0-15"
+    assert headers["Accept-Encoding"] == "identity"
+    # The server sent only the requested 16 bytes
+    assert page["html"] == "<html><head><tit"
+
+
+def test_domain_ignoring_ranges_keeps_compression(product_site):
+    serve(product_site, honour_range=False)
+    url = "https://shop.example/products/1"
+
+    first = asyncio.run(send_request.fetch_page(url, head_only=True))
+    second = asyncio.run(send_request.fetch_page(url, head_only=True))
+
+    # The whole page came back, only its first 16 bytes are parsed
+    assert first["html"] == second["html"] == "<html><head><tit"
+    assert "Range" in product_site.requests[0]["headers"]
+    assert "Range" not in product_site.requests[1]["headers"]
+    assert product_site.requests[1]["headers"]["Accept-Encoding"] == "gzip, deflate, br"
+
+
+def test_page_is_cut_in_bytes_before_it_is_decoded(product_site, monkeypatch):
+    monkeypatch.setattr(send_request, "product_head_max_bytes", 23)
+    serve(product_site, honour_range=False)
+
+    page = asyncio.run(send_request.fetch_page("https://shop.example/products/1", head_only=True))
+
+    # "é" is two bytes and the 23rd byte is the first of them
+    assert page["html"] == "<html><head><title>Caf"
+
+
+def test_links_to_files_are_skipped_without_a_request(product_site):
+    serve(product_site, honour_range=True, content_type="image/jpeg")
+
+    assert asyncio.run(send_request.fetch_page("https://shop.example/photo.jpg", head_only=True)) is None
+    assert asyncio.run(send_request.fetch_page("https://shop.example/products/1", head_only=True)) is None
+    assert len(product_site.requests) == 1
@@ -0,0 +1,81 @@
+# Local Imports
+from src.v1.src.product.session_pool import SessionPool
+
+# External Imports
+import threading
+import asyncio
+import time
+
+
+def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.01)
+
+
+def test_sessions_are_reused_per_domain_and_client(tls_library_stand_in):
+    pool = SessionPool(max_size=8, max_per_key=2)
+
+    first = pool.acquire("https://www.depop.com/products/a", "chrome_120")
+    pool.release(first)
+
+    assert pool.acquire("https://www.depop.com/products/b", "chrome_120") is first
+    assert pool.acquire("https://www.depop.com/products/c", "chrome_120") is not first
+    assert pool.acquire("https://www.etsy.com/listing/1", "chrome_120").key == ("www.etsy.com", "chrome_120")
+
+
+def test_least_recently_used_sessions_are_evicted_off_the_event_loop(tls_library_stand_in):
+    pool = SessionPool(max_size=2, max_per_key=1)
+    url = "https://www.depop.com/products/a"
+
+    async def check_out_two():
+        first, second = pool.acquire(url, "chrome_120"), pool.acquire(url, "chrome_120")
+        pool.release(first)
+        pool.release(second)
+        return first, second
+
+    first, second = asyncio.run(check_out_two())
+
+    # Only one idle session is kept per key, the older one is destroyed in an executor thread
+    wait_until(lambda: len(tls_library_stand_in.destroyed) == 1)
+    session_id, thread = tls_library_stand_in.destroyed[0]
+    assert session_id == first.session._session_id
+    assert thread is not threading.main_thread()
+    assert pool.acquire(url, "chrome_120") is second
+
+
+def test_cancelled_request_is_only_closed_once_it_finishes(tls_library_stand_in):
+    pool = SessionPool(max_size=8, max_per_key=2)
+    url = "https://www.depop.com/products/a"
+    started, finish = threading.Event(), threading.Event()
+
+    def respond(payload):
+        started.set()
+        finish.wait(2)
+        return {"status": 200, "headers": {}, "body": "<html></html>"}
+
+    tls_library_stand_in.respond = respond
+    used = []
+
+    async def fetch():
+        with pool.session(url, "chrome_120") as session:
+            used.append(session)
+            return await session.aget(url)
+
+    async def cancel_while_in_use():
+        task = asyncio.create_task(fetch())
+        await asyncio.to_thread(started.wait, 2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancel_while_in_use())
+
+    # The session was discarded, but the request is still running on it so it isn't destroyed yet
+    assert tls_library_stand_in.destroyed == []
+    assert used[0].running_requests == 1
+    assert pool.acquire(url, "chrome_120").session is not used[0]
+
+    finish.set()
+    wait_until(lambda: len(tls_library_stand_in.destroyed) == 1)
+    assert tls_library_stand_in.destroyed[0][0] == used[0]._session_id
@@ -0,0 +1,145 @@
+# Local Imports
+from src.v1.src.product.tls_client import AsyncSession, Session
+
+# External Imports
+from concurrent.futures import ThreadPoolExecutor
+
+import threading
+import asyncio
+import pytest
+
+
+def blocking_library(tls_library_stand_in):
+    """Make each request block until the returned event is set."""
+    started, finish = threading.Event(), threading.Event()
+
+    def respond(payload):
+        started.set()
+        finish.wait(2)
+        return {"status": 200, "headers": {}, "body": "done"}
+
+    tls_library_stand_in.respond = respond
+    return started, finish
+
+
+def test_timed_out_request_frees_its_thread_and_session(tls_library_stand_in):
+    started, finish = blocking_library(tls_library_stand_in)
+    executor = ThreadPoolExecutor(max_workers=1)
+    session = AsyncSession(client_identifier="chrome_120", executor=executor)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(session.aget("https://example.com/a", timeout=0.05))
+
+    # The native call is given the caller's timeout, rounded up to whole seconds
+    assert tls_library_stand_in.requests[0]["timeoutSeconds"] == 1
+    assert session.running_requests == 1
+
+    # Once the abandoned call returns, the thread and session can be used again
+    finish.set()
+    response = asyncio.run(session.aget("https://example.com/b", timeout=1))
+    assert response.text == "done"
+    assert session.running_requests == 0
+    executor.shutdown()
+
+
+def test_cancelled_queued_request_never_reaches_the_library(tls_library_stand_in):
+    started, finish = blocking_library(tls_library_stand_in)
+    executor = ThreadPoolExecutor(max_workers=1)
+    session = AsyncSession(client_identifier="chrome_120", executor=executor)
+
+    async def cancel_queued():
+        running = asyncio.create_task(session.aget("https://example.com/a"))
+        await asyncio.to_thread(started.wait, 2)
+        # The only thread is busy, so this request waits in the executor's queue
+        queued = asyncio.create_task(session.aget("https://example.com/b"))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert session.running_requests == 1
+
+        finish.set()
+        return await running
+
+    assert asyncio.run(cancel_queued()).text == "done"
+    assert [payload["requestUrl"] for payload in tls_library_stand_in.requests] == ["https://example.com/a"]
+    assert session.running_requests == 0
+    executor.shutdown()
+
+
+def test_close_when_idle_waits_for_running_requests(tls_library_stand_in):
+    started, finish = blocking_library(tls_library_stand_in)
+    executor = ThreadPoolExecutor(max_workers=2)
+    session = AsyncSession(client_identifier="chrome_120", executor=executor)
+
+    async def close_while_running():
+        running = asyncio.create_task(session.aget("https://example.com/a"))
+        await asyncio.to_thread(started.wait, 2)
+        session.close_when_idle()
+        assert tls_library_stand_in.destroyed == []
+
+        finish.set()
+        return await running
+
+    assert asyncio.run(close_while_running()).text == "done"
+    executor.shutdown(wait=True)
+    assert [session_id for session_id, _ in tls_library_stand_in.destroyed] == [session._session_id]
+
+
+def test_body_is_kept_as_the_bytes_sent(tls_library_stand_in):
+    body = "Café".encode("iso-8859-1") + b"\x00\xff"
+    tls_library_stand_in.respond = lambda payload: {
+        "status": 200,
+        "headers": {"Content-Type": ["text/html; charset=ISO-8859-1"]},
+        "body": body,
+    }
+
+    response = Session(client_identifier="chrome_120").get("https://example.com/a")
+
+    assert tls_library_stand_in.requests[0]["isByteResponse"] is True
+    assert response.content == body
+    assert response.text == "Café\x00ÿ"
+
+
+def test_settings_changed_in_place_reach_the_next_request(tls_library_stand_in):
+    session = Session(client_identifier="chrome_120", header_order=["accept", "user-agent"])
+    session.get("https://example.com/a")
+
+    session.header_order.append("cookie")
+    session.headers["X-Test"] = "1"
+    session.get("https://example.com/b")
+
+    first, second = tls_library_stand_in.requests
+    assert first["headerOrder"] == ["accept", "user-agent"]
+    assert second["headerOrder"] == ["accept", "user-agent", "cookie"]
+    assert "X-Test" not in first["headers"] and second["headers"]["X-Test"] == "1"
+
+
+def test_headers_are_parsed_on_first_access(tls_library_stand_in):
+    tls_library_stand_in.respond = lambda payload: {
+        "status": 200,
+        "headers": {
+            "Content-Type": ["text/html"],
+            "Set-Cookie": ["a=1; Path=/", "b=2; Path=/"],
+            "Vary": ["Accept", "Accept-Encoding"],
+        },
+        "body": "",
+    }
+
+    response = Session(client_identifier="chrome_120").get("https://example.com/a")
+
+    assert response._headers is None
+    # A header sent once is a string, a repeated one keeps every value
+    assert response.headers["content-type"] == "text/html"
+    assert response.headers["VARY"] == ["Accept", "Accept-Encoding"]
+    assert response.headers["set-cookie"] == ["a=1; Path=/", "b=2; Path=/"]
+    assert response.headers is response.headers
+    assert response.cookies.get_dict() == {"a": "1", "b": "2"}
+
+
+def test_responses_without_headers_or_cookies(tls_library_stand_in):
+    tls_library_stand_in.respond = lambda payload: {"status": 204, "headers": None, "body": ""}
+
+    response = Session(client_identifier="chrome_120").get("https://example.com/a")
+
+    assert dict(response.headers) == {}
+    assert len(response.cookies) == 0
@@ -0,0 +1,94 @@
+# Local Imports
+from src.v1.src.product.tls_client.cookies import (
+    CookieConflictError,
+    cookiejar_from_dict,
+    extract_cookies_to_jar,
+    parse_set_cookie,
+)
+
+# External Imports
+import calendar
+import pytest
+
+
+NOW = 1_750_000_000.0
+NEW_YEAR_2031 = calendar.timegm((2031, 1, 1, 0, 0, 0))
+
+
+def parse(header_value: str, host: str = "shop.example.com", path: str = "/products/a"):
+    return parse_set_cookie(header_value, host, path, NOW)
+
+
+def test_domain_cookies_must_cover_the_request_host():
+    cookie, _ = parse("sid=1; Domain=Example.com")
+    assert (cookie.domain, cookie.domain_initial_dot, cookie.domain_specified) == (".example.com", False, True)
+
+    cookie, _ = parse("sid=1; Domain=.shop.example.com")
+    assert (cookie.domain, cookie.domain_initial_dot) == (".shop.example.com", True)
+
+    # Another site, or a bare public suffix
+    assert parse("sid=1; Domain=other.com") == (None, None)
+    assert parse("sid=1; Domain=com") == (None, None)
+
+
+def test_host_only_cookies_keep_the_request_host():
+    cookie, _ = parse("sid=1")
+    assert (cookie.domain, cookie.domain_specified) == ("shop.example.com", False)
+
+    cookie, _ = parse("sid=1", host="localhost")
+    assert cookie.domain == "localhost.local"
+
+
+def test_path_defaults_to_the_request_directory():
+    assert parse("sid=1", path="/products/a/photos")[0].path == "/products/a"
+    assert parse("sid=1", path="/products")[0].path == "/"
+    assert parse("sid=1; Path=/basket")[0].path == "/basket"
+    # A path which isn't absolute is ignored
+    cookie, _ = parse("sid=1; Path=basket")
+    assert (cookie.path, cookie.path_specified) == ("/products", False)
+
+
+def test_max_age_takes_priority_over_expires():
+    cookie, _ = parse("sid=1; Max-Age=60; Expires=Wed, 01 Jan 2020 00:00:00 GMT")
+    assert cookie.expires == int(NOW + 60)
+
+    cookie, _ = parse("sid=1; Expires=Wed, 01 Jan 2031 00:00:00 GMT")
+    assert cookie.expires == NEW_YEAR_2031
+
+    # An unparseable Max-Age falls back to Expires, no expiry at all is a session cookie
+    cookie, _ = parse("sid=1; Max-Age=soon; Expires=Wed, 01 Jan 2031 00:00:00 GMT")
+    assert cookie.expires == NEW_YEAR_2031
+    cookie, _ = parse("sid=1")
+    assert (cookie.expires, cookie.discard) == (None, True)
+
+
+def test_expired_cookies_delete_the_stored_one():
+    assert parse("sid=; Max-Age=0; Path=/") == (None, ("shop.example.com", "/", "sid"))
+    assert parse("sid=; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Domain=example.com; Path=/") == (
+        None,
+        (".example.com", "/", "sid"),
+    )
+
+    jar = cookiejar_from_dict({})
+    extract_cookies_to_jar(
+        "https://shop.example.com/products/a", {}, jar, {"Set-Cookie": ["sid=1; Path=/", "cart=2; Path=/"]}
+    )
+    extract_cookies_to_jar("https://shop.example.com/basket", {}, jar, {"Set-Cookie": ["sid=; Max-Age=0; Path=/"]})
+
+    assert jar.get_dict() == {"cart": "2"}
+    assert jar.get("sid") is None
+
+
+def test_same_name_on_different_domains():
+    jar = cookiejar_from_dict({})
+    extract_cookies_to_jar("https://www.depop.com/", {}, jar, {"Set-Cookie": ["sid=depop; Domain=depop.com; Path=/"]})
+    extract_cookies_to_jar("https://www.etsy.com/", {}, jar, {"Set-Cookie": ["sid=etsy; Domain=etsy.com; Path=/"]})
+
+    assert jar.get("sid", domain=".depop.com") == "depop"
+    assert jar.get("sid", domain=".etsy.com") == "etsy"
+    with pytest.raises(CookieConflictError):
+        jar.get("sid")
+
+    # The name index is rebuilt once the jar changes
+    jar.clear(".depop.com", "/", "sid")
+    assert jar.get("sid") == "etsy"
@@ -0,0 +1,164 @@
+# Local Imports
+from src.v1.src.ebay import tokens
+from src.v1.src.models import IUser
+from src.v1.src import token_manager
+
+# External Imports
+from datetime import datetime, timezone
+
+import asyncio
+
+import pytest
+import httpx
+
+
+def now() -> int:
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+class FakeRequest:
+    def __init__(self, token: str) -> None:
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+def make_user(user_doc_factory, uid: str = "user-1", **ebay) -> IUser:
+    account = {
+        "ebayAccessToken": "new-token",
+        "ebayRefreshToken": "refresh-token",
+        "ebayTokenExpiry": now() + 7200,
+        **ebay,
+    }
+    return IUser(**user_doc_factory(uid, ebay=account))
+
+
+def check(user: IUser, token: str, fake_db, fake_user_ref_factory):
+    return asyncio.run(
+        tokens.check_and_refresh_ebay_token(
+            FakeRequest(token), fake_db, fake_user_ref_factory({}), user
+        )
+    )
+
+
+def test_previous_token_is_accepted_until_it_expires(
+    fake_db, user_doc_factory, fake_user_ref_factory
+):
+    user = make_user(
+        user_doc_factory, ebayPreviousAccessToken="old-token", ebayPreviousTokenExpiry=now() + 300
+    )
+
+    res = check(user, "old-token", fake_db, fake_user_ref_factory)
+
+    assert res["success"]
+    assert res["user"].connectedAccounts.ebay.ebayAccessToken == "new-token"
+
+
+def test_expired_previous_token_is_rejected(fake_db, user_doc_factory, fake_user_ref_factory):
+    user = make_user(
+        user_doc_factory, ebayPreviousAccessToken="old-token", ebayPreviousTokenExpiry=now() - 1
+    )
+
+    res = check(user, "old-token", fake_db, fake_user_ref_factory)
+
+    assert res.status_code == 401
+
+
+def test_unknown_token_is_rejected(fake_db, user_doc_factory, fake_user_ref_factory):
+    res = check(make_user(user_doc_factory), "someone-elses-token", fake_db, fake_user_ref_factory)
+
+    assert res.status_code == 401
+
+
+def test_tracking_keeps_the_most_recently_seen_users(
+    user_doc_factory, fake_user_ref_factory, monkeypatch
+):
+    monkeypatch.setattr(token_manager, "tracked_tokens", {})
+    monkeypatch.setattr(token_manager, "token_tracking_max_users", 2)
+
+    for index in range(3):
+        monkeypatch.setattr(token_manager, "current_timestamp", lambda index=index: 1000 + index)
+        user = make_user(user_doc_factory, f"user-{index}")
+        token_manager.track_user_token("ebay", user, fake_user_ref_factory({}))
+
+    assert set(token_manager.tracked_tokens) == {("ebay", "user-1"), ("ebay", "user-2")}
+
+
+# --------------------------------------------------- #
+# Single-flight Refresh                               #
+# --------------------------------------------------- #
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    """Stand in for eBay's token endpoint, answering each refresh in turn from `responses`."""
+    endpoint = {"requests": 0, "responses": [], "release": None}
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        endpoint["requests"] += 1
+        # Hold the response until the test lets it through, so callers can pile up behind it
+        if endpoint["release"] is not None:
+            await endpoint["release"].wait()
+        status, body = endpoint["responses"].pop(0) if endpoint["responses"] else (200, None)
+        return httpx.Response(
+            status, json=body or {"access_token": "refreshed-token", "expires_in": 7200}
+        )
+
+    monkeypatch.setattr(
+        tokens, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    )
+    monkeypatch.setattr(tokens, "token_cache", {})
+    monkeypatch.setattr(tokens, "refreshes_in_flight", {})
+    return endpoint
+
+
+def refresh(fake_db, fake_user_ref_factory):
+    return tokens.refresh_ebay_token_once(
+        "user-1", "refresh-token", fake_db, fake_user_ref_factory({}), ("old-token", now())
+    )
+
+
+def test_concurrent_refreshes_share_one_request(token_endpoint, fake_db, fake_user_ref_factory):
+    async def run():
+        return await asyncio.gather(*(refresh(fake_db, fake_user_ref_factory) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert token_endpoint["requests"] == 1
+    assert fake_db.tokens == [("ebay", "refreshed-token")]
+    assert all(result is results[0] for result in results)
+    assert tokens.token_cache["user-1"][0] == "refreshed-token"
+    assert tokens.refreshes_in_flight == {}
+
+
+def test_cancelled_waiter_leaves_the_refresh_running(token_endpoint, fake_db, fake_user_ref_factory):
+    async def run():
+        token_endpoint["release"] = asyncio.Event()
+        waiters = [asyncio.create_task(refresh(fake_db, fake_user_ref_factory)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        waiters[0].cancel()
+        token_endpoint["release"].set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    cancelled, *results = asyncio.run(run())
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert [result.data.access_token for result in results] == ["refreshed-token"] * 2
+    assert token_endpoint["requests"] == 1
+    assert fake_db.tokens == [("ebay", "refreshed-token")]
+
+
+def test_failed_refresh_is_not_cached(token_endpoint, fake_db, fake_user_ref_factory):
+    token_endpoint["responses"].append((400, {"error": "invalid_grant"}))
+
+    failed = asyncio.run(refresh(fake_db, fake_user_ref_factory))
+
+    assert failed.data is None
+    assert tokens.token_cache == {}
+    assert tokens.refreshes_in_flight == {}
+    assert fake_db.tokens == []
+
+    # The next caller refreshes again rather than getting the failure back
+    retried = asyncio.run(refresh(fake_db, fake_user_ref_factory))
+
+    assert retried.data.access_token == "refreshed-token"
+    assert token_endpoint["requests"] == 2